@@ -2,7 +2,9 @@
 from .models import Preference, RestaurantRecord
 from .loader import load_dataset_from_hf
 from .data_store import RestaurantDataStore
-from .retrieval import retrieve
+from .retrieval import retrieve, retrieve_refined
+from .refinement import ResultHandle, ResultHandleCache
+from .similarity import SimilarityIndex
 
 __all__ = [
     "Preference",
@@ -10,4 +12,8 @@ __all__ = [
     "load_dataset_from_hf",
     "RestaurantDataStore",
     "retrieve",
+    "retrieve_refined",
+    "ResultHandle",
+    "ResultHandleCache",
+    "SimilarityIndex",
 ]
@@ -0,0 +1,50 @@
+"""Sorted-array prefix index for area / city / cuisine autocomplete."""
+
+from __future__ import annotations
+
+import heapq
+import re
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+AUTOCOMPLETE_FIELDS = ("area", "city", "cuisine")
+
+# Characters that start a new word inside a value ("Koramangala 5th Block",
+# "Fast Food/Street Food", "Old Airport Road (HAL)").
+_WORD_BREAK = re.compile(r"[\s,/&()\-]+")
+# Sorts after every character that can follow a prefix.
+_PREFIX_END = "\U0010ffff"
+
+
+class PrefixIndex:
+    """
+    Completes a prefix against the start of any word of a value.
+
+    Every word-start suffix of every value is kept in one sorted array, so a
+    lookup is two binary searches plus a top-N over the matching slice.
+    """
+
+    def __init__(self, counts: Sequence[Tuple[str, int]]):
+        self._count: Dict[str, int] = {value: count for value, count in counts}
+        entries: List[Tuple[str, str]] = []
+        for value in self._count:
+            lowered = value.lower()
+            starts = [0] + [m.end() for m in _WORD_BREAK.finditer(lowered)]
+            for start in dict.fromkeys(starts):
+                if start < len(lowered):
+                    entries.append((lowered[start:], value))
+        entries.sort()
+        self._keys = [k for k, _ in entries]
+        self._values = [v for _, v in entries]
+
+    def __len__(self) -> int:
+        return len(self._count)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Top ``limit`` (value, count) pairs matching ``prefix``, most frequent first."""
+        needle = " ".join(prefix.lower().split())
+        lo = bisect_left(self._keys, needle)
+        hi = bisect_left(self._keys, needle + _PREFIX_END, lo)
+        matches = dict.fromkeys(self._values[lo:hi])
+        best = heapq.nsmallest(limit, matches, key=lambda v: (-self._count[v], v.lower()))
+        return [(v, self._count[v]) for v in best]
@@ -0,0 +1,114 @@
+"""Materialized "best of" views: ranked top-N rows per locality and per (locality, cuisine).
+
+The views are built from a ColumnIndex with one global sort and a stable
+group-by, and stored in CSR form (sorted group keys, offsets, row ids), so a
+lookup is a binary search and a slice.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columns import ColumnIndex
+
+BEST_OF_SIZE = 50
+
+
+class _GroupedRows:
+    """Top ``size`` rows per integer group key, in the order given."""
+
+    def __init__(self, keys: np.ndarray, rows: np.ndarray, size: int):
+        # ``keys``/``rows`` are already in rank order; a stable sort on the
+        # key keeps that order inside every group.
+        by_key = np.argsort(keys, kind="stable")
+        keys, rows = keys[by_key], rows[by_key]
+        self.keys, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        rank = np.arange(len(keys)) - np.repeat(starts, counts)
+        keep = rank < size
+        self.rows = rows[keep].astype(np.int32)
+        self.offsets = np.concatenate(([0], np.cumsum(np.minimum(counts, size))))
+        self.totals = counts
+
+    def lookup(self, key: int) -> Tuple[np.ndarray, int]:
+        """Stored rows for ``key`` in rank order, and the group's full size."""
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or self.keys[i] != key:
+            return np.empty(0, dtype=np.int32), 0
+        return self.rows[self.offsets[i]:self.offsets[i + 1]], int(self.totals[i])
+
+
+class BestOfViews:
+    """
+    Ranked top-``size`` record ids per locality and per (locality, cuisine name).
+
+    Ranking matches ``retrieve(sort_by_rating=True)``: rating, then votes,
+    both descending (missing counts as 0), ties in store order.
+    """
+
+    def __init__(self, index: ColumnIndex, size: int = BEST_OF_SIZE):
+        self.size = size
+        self._index = index
+
+        rating = np.nan_to_num(index.rating, nan=0.0)
+        votes = np.maximum(index.votes, 0)
+        order = np.lexsort((np.arange(index.size), -votes, -rating))
+
+        loc = index.location.codes[order]
+        has_loc = loc >= 0
+        self._by_location = _GroupedRows(loc[has_loc], order[has_loc], size)
+
+        # One (row, cuisine name) pair per cuisine listed on each row, in rank order.
+        offsets, name_ids = index.cuisine_tokens.names_by_value()
+        lengths = np.append(np.diff(offsets), 0)  # code -1 (no cuisines) picks the trailing 0
+        ranked = order[has_loc]
+        codes = index.cuisines.codes[ranked]
+        repeat = lengths[codes]
+        first = np.repeat(offsets[:-1][np.maximum(codes, 0)] - np.cumsum(repeat) + repeat, repeat)
+        pair_name = name_ids[first + np.arange(int(repeat.sum()))]
+        pair_rows = np.repeat(ranked, repeat)
+        pair_loc = np.repeat(loc[has_loc], repeat)
+
+        self._n_names = max(1, len(index.cuisine_tokens.names))
+        self._by_pair = _GroupedRows(pair_loc * self._n_names + pair_name, pair_rows, size)
+
+    def lookup(self, location: str, cuisine: Optional[str] = None, limit: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Ranked record ids for a location (and cuisine) filter, or None when no
+        view answers it exactly.
+
+        ``location`` and ``cuisine`` follow the store's substring semantics, so
+        a view is used only when each needle selects exactly one locality and
+        one cuisine name. ``limit`` of None asks for every match.
+        """
+        loc_code = _single_match(self._index.location.values, location)
+        if loc_code is None:
+            return None
+        if cuisine is None:
+            group, key = self._by_location, loc_code
+        else:
+            if "," in cuisine or cuisine != cuisine.strip():
+                return None  # could match across names in a cuisines string
+            name_id = _single_match(self._index.cuisine_tokens.names, cuisine)
+            if name_id is None:
+                return None
+            group, key = self._by_pair, loc_code * self._n_names + name_id
+
+        rows, total = group.lookup(key)
+        wanted = total if limit is None else min(limit, total)
+        if wanted > len(rows):
+            return None  # view was truncated below what was asked
+        return rows[:wanted]
+
+
+def _single_match(values: Sequence[str], needle: str) -> Optional[int]:
+    """Index of the only value containing ``needle`` (case-insensitive), else None."""
+    needle = needle.lower()
+    found = None
+    for i, v in enumerate(values):
+        if needle in v.lower():
+            if found is not None:
+                return None
+            found = i
+    return found
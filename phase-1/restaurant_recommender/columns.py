@@ -0,0 +1,380 @@
+"""Columnar index over store records: dictionary-encoded strings and numeric arrays.
+
+Filters never compare strings per row. A substring filter is evaluated once
+per distinct value and gathered through the code array. Each filter yields a
+packed bitmap (one bit per record), so combining filters is a word-wise AND
+and counting matches is a popcount.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import RestaurantRecord
+
+# Upper bounds (exclusive) of the approx. cost-for-two bands, in rupees.
+COST_BAND_EDGES = (300, 500, 800, 1200, 2000)
+# Upper bounds (exclusive) of the rating buckets.
+RATING_BUCKET_EDGES = (3.0, 3.5, 4.0, 4.5)
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+def _band_labels(edges: Sequence[float], fmt: str) -> List[str]:
+    labels = []
+    lower = None
+    for upper in edges:
+        labels.append(f"<{fmt.format(upper)}" if lower is None else f"{fmt.format(lower)}-{fmt.format(upper)}")
+        lower = upper
+    labels.append(f"{fmt.format(lower)}+")
+    return labels
+
+
+PRICE_BUCKETS = _band_labels(COST_BAND_EDGES, "{}")
+RATING_BUCKETS = _band_labels(RATING_BUCKET_EDGES, "{:.1f}")
+
+
+def cost_band(cost: Optional[int]) -> Optional[str]:
+    """Map a numeric cost for two to its price bucket label (e.g. '300-500')."""
+    if cost is None:
+        return None
+    return PRICE_BUCKETS[int(np.searchsorted(COST_BAND_EDGES, cost, side="right"))]
+
+
+def popcount(bits: np.ndarray) -> int:
+    """Number of set bits in a packed bitmap."""
+    return int(_POPCOUNT[bits].sum())
+
+
+def parse_flag(value: Optional[str]) -> Optional[bool]:
+    """Dataset yes/no column ('Yes' / 'No') to a bool; anything else is unknown."""
+    if value is None:
+        return None
+    v = value.strip().lower()
+    if v == "yes":
+        return True
+    if v == "no":
+        return False
+    return None
+
+
+def split_names(value: Optional[str]) -> List[str]:
+    """Split a comma-separated field (cuisines, rest_type) into stripped, non-empty names."""
+    if not value:
+        return []
+    return [c.strip() for c in value.split(",") if c.strip()]
+
+
+class DictColumn:
+    """Dictionary-encoded string column; missing values have code -1."""
+
+    def __init__(self, values: Sequence[Optional[str]]):
+        vocab: Dict[str, int] = {}
+        codes = np.full(len(values), -1, dtype=np.int32)
+        for i, v in enumerate(values):
+            if v:
+                codes[i] = vocab.setdefault(v, len(vocab))
+        self.values: List[str] = list(vocab)
+        self.codes = codes
+        self._lowered = [v.lower() for v in self.values]
+
+    def matches(self, needle: str) -> np.ndarray:
+        """Per-value hit table for ``needle`` (case-insensitive substring), indexable by code."""
+        needle = needle.lower()
+        # The extra trailing slot is what code -1 (missing) gathers: never a match.
+        hit = np.zeros(len(self.values) + 1, dtype=bool)
+        for i, v in enumerate(self._lowered):
+            if needle in v:
+                hit[i] = True
+        return hit
+
+    def contains(self, needle: str) -> np.ndarray:
+        """Row mask for values containing ``needle`` (case-insensitive)."""
+        return self.matches(needle)[self.codes]
+
+    def value_counts(self, mask: np.ndarray) -> np.ndarray:
+        """Count of masked rows per vocabulary entry."""
+        codes = self.codes[mask]
+        return np.bincount(codes[codes >= 0], minlength=len(self.values))
+
+
+class TokenColumn:
+    """
+    Individual names inside a comma-separated DictColumn ("North Indian, Chinese").
+
+    Names are linked to the distinct strings that contain them, so counting
+    works on a few thousand strings rather than tens of thousands of rows.
+    """
+
+    def __init__(self, column: DictColumn):
+        self._column = column
+        ids: Dict[str, int] = {}
+        pair_string: List[int] = []
+        pair_name: List[int] = []
+        for s_id, value in enumerate(column.values):
+            for name in dict.fromkeys(split_names(value)):
+                pair_string.append(s_id)
+                pair_name.append(ids.setdefault(name, len(ids)))
+        self.names: List[str] = list(ids)
+        self._pair_string = np.asarray(pair_string, dtype=np.int64)
+        self._pair_name = np.asarray(pair_name, dtype=np.int64)
+
+    def names_by_value(self) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR view (offsets, name ids): names of value ``i`` are ids[offsets[i]:offsets[i + 1]]."""
+        counts = np.bincount(self._pair_string, minlength=len(self._column.values))
+        return np.concatenate(([0], np.cumsum(counts))), self._pair_name
+
+    def matches(self, name: str) -> np.ndarray:
+        """Per-value hit table for values listing ``name`` (case-insensitive), indexable by code."""
+        name = name.strip().lower()
+        hit = np.zeros(len(self._column.values) + 1, dtype=bool)
+        ids = [i for i, n in enumerate(self.names) if n.lower() == name]
+        if ids:
+            hit[self._pair_string[np.isin(self._pair_name, ids)]] = True
+        return hit
+
+    def has(self, name: str) -> np.ndarray:
+        """Row mask for values listing ``name`` as one of their names (case-insensitive)."""
+        return self.matches(name)[self._column.codes]
+
+    def value_counts(self, mask: np.ndarray) -> np.ndarray:
+        """Count of masked rows per individual name."""
+        string_counts = self._column.value_counts(mask)
+        return np.bincount(
+            self._pair_name,
+            weights=string_counts[self._pair_string],
+            minlength=len(self.names),
+        ).astype(np.int64)
+
+
+@dataclass
+class FacetCounts:
+    """Live match counts for a partial filter selection.
+
+    Counts are matching records (listings). Each facet ignores its own
+    filter, so the UI can show how many results every alternative would give.
+    """
+
+    total: int
+    location: List[Tuple[str, int]] = field(default_factory=list)
+    cuisine: List[Tuple[str, int]] = field(default_factory=list)
+    price: List[Tuple[str, int]] = field(default_factory=list)
+    rating: List[Tuple[str, int]] = field(default_factory=list)
+
+
+class ColumnIndex:
+    """Read-only columnar view of a snapshot of records."""
+
+    def __init__(self, records: Sequence[RestaurantRecord]):
+        self.size = len(records)
+        self.city = DictColumn([r.listed_in_city for r in records])
+        self.location = DictColumn([r.location for r in records])
+        self.cuisines = DictColumn([r.cuisines for r in records])
+
+        self.cost = np.array(
+            [np.nan if r.cost_numeric is None else r.cost_numeric for r in records], dtype=np.float64
+        )
+        self.rating = np.array(
+            [np.nan if r.rating_numeric is None else r.rating_numeric for r in records], dtype=np.float64
+        )
+
+        self.cuisine_tokens = TokenColumn(self.cuisines)
+        self.rest_type = DictColumn([r.rest_type for r in records])
+        self.rest_type_tokens = TokenColumn(self.rest_type)
+        # Only names that occur are cached, so request values cannot grow it.
+        self._rest_type_bits: Dict[str, np.ndarray] = {}
+        self._rest_type_names = {n.lower() for n in self.rest_type_tokens.names}
+
+        self.votes = np.array([-1 if r.votes is None else r.votes for r in records], dtype=np.int64)
+
+        # Yes/no flags live as packed bit columns (and byte masks for filter_rows);
+        # unknown is neither value.
+        self._flags: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._flag_bits: Dict[Tuple[str, bool], np.ndarray] = {}
+        for name in ("online_order", "book_table"):
+            flags = [parse_flag(getattr(r, name)) for r in records]
+            for wanted in (True, False):
+                mask = np.array([f is wanted for f in flags], dtype=bool)
+                self._flags[(name, wanted)] = mask
+                self._flag_bits[(name, wanted)] = np.packbits(mask)
+
+        with np.errstate(invalid="ignore"):
+            self._price_bucket = np.where(
+                np.isnan(self.cost), -1, np.searchsorted(COST_BAND_EDGES, self.cost, side="right")
+            )
+            self._rating_bucket = np.where(
+                np.isnan(self.rating), -1, np.searchsorted(RATING_BUCKET_EDGES, self.rating, side="right")
+            )
+
+        self._all = np.packbits(np.ones(self.size, dtype=bool))
+
+    # ── Filters ───────────────────────────────────────────────────────
+
+    def filter_bits(
+        self,
+        city: Optional[str] = None,
+        location: Optional[str] = None,
+        price_min: Optional[int] = None,
+        price_max: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        cuisine: Optional[str] = None,
+        online_order: Optional[bool] = None,
+        book_table: Optional[bool] = None,
+        rest_type: Optional[str] = None,
+        min_votes: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Packed bitmap per active filter dimension, keyed by facet name."""
+        bits: Dict[str, np.ndarray] = {}
+        if city is not None:
+            bits["city"] = np.packbits(self.city.contains(city))
+        if location is not None:
+            bits["location"] = np.packbits(self.location.contains(location))
+        if price_min is not None or price_max is not None:
+            with np.errstate(invalid="ignore"):
+                mask = ~np.isnan(self.cost)
+                if price_min is not None:
+                    mask &= self.cost >= price_min
+                if price_max is not None:
+                    mask &= self.cost <= price_max
+            bits["price"] = np.packbits(mask)
+        if min_rating is not None:
+            with np.errstate(invalid="ignore"):
+                bits["rating"] = np.packbits(self.rating >= min_rating)
+        if cuisine is not None:
+            bits["cuisine"] = np.packbits(self.cuisines.contains(cuisine))
+        if online_order is not None:
+            bits["online_order"] = self._flag_bits[("online_order", bool(online_order))]
+        if book_table is not None:
+            bits["book_table"] = self._flag_bits[("book_table", bool(book_table))]
+        if rest_type is not None:
+            bits["rest_type"] = self.rest_type_bits(rest_type)
+        if min_votes is not None:
+            bits["votes"] = np.packbits(self.votes >= min_votes)
+        return bits
+
+    def rest_type_bits(self, rest_type: str) -> np.ndarray:
+        """Packed bitmap of records listing ``rest_type``; built once per known name."""
+        key = rest_type.strip().lower()
+        if key not in self._rest_type_names:
+            return np.packbits(np.zeros(self.size, dtype=bool))
+        bits = self._rest_type_bits.get(key)
+        if bits is None:
+            bits = np.packbits(self.rest_type_tokens.has(key))
+            self._rest_type_bits[key] = bits
+        return bits
+
+    def filter_rows(
+        self,
+        rows: np.ndarray,
+        city: Optional[str] = None,
+        location: Optional[str] = None,
+        price_min: Optional[int] = None,
+        price_max: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        cuisine: Optional[str] = None,
+        online_order: Optional[bool] = None,
+        book_table: Optional[bool] = None,
+        rest_type: Optional[str] = None,
+        min_votes: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Subset of ``rows`` (record ids) passing every non-None filter.
+
+        Same semantics as ``filter_bits``, but the work is proportional to
+        ``len(rows)`` (plus one pass over each string vocabulary).
+        """
+        keep = np.ones(len(rows), dtype=bool)
+        if city is not None:
+            keep &= self.city.matches(city)[self.city.codes[rows]]
+        if location is not None:
+            keep &= self.location.matches(location)[self.location.codes[rows]]
+        if price_min is not None or price_max is not None:
+            cost = self.cost[rows]
+            with np.errstate(invalid="ignore"):
+                keep &= ~np.isnan(cost)
+                if price_min is not None:
+                    keep &= cost >= price_min
+                if price_max is not None:
+                    keep &= cost <= price_max
+        if min_rating is not None:
+            with np.errstate(invalid="ignore"):
+                keep &= self.rating[rows] >= min_rating
+        if cuisine is not None:
+            keep &= self.cuisines.matches(cuisine)[self.cuisines.codes[rows]]
+        if online_order is not None:
+            keep &= self._flags[("online_order", bool(online_order))][rows]
+        if book_table is not None:
+            keep &= self._flags[("book_table", bool(book_table))][rows]
+        if rest_type is not None:
+            keep &= self.rest_type_tokens.matches(rest_type)[self.rest_type.codes[rows]]
+        if min_votes is not None:
+            keep &= self.votes[rows] >= min_votes
+        return rows[keep]
+
+    def combine(self, bits: Dict[str, np.ndarray], exclude: Optional[str] = None) -> np.ndarray:
+        """AND together all filter bitmaps except ``exclude``."""
+        out = self._all.copy()
+        for name, b in bits.items():
+            if name != exclude:
+                np.bitwise_and(out, b, out=out)
+        return out
+
+    def unpack(self, bits: np.ndarray) -> np.ndarray:
+        """Boolean row mask from a packed bitmap."""
+        return np.unpackbits(bits, count=self.size).view(bool)
+
+    def rows(self, bits: np.ndarray) -> np.ndarray:
+        """Indices of the records set in a packed bitmap, in store order."""
+        return np.flatnonzero(np.unpackbits(bits, count=self.size))
+
+    # ── Counts ────────────────────────────────────────────────────────
+
+    def vocabulary(self, field: str) -> List[Tuple[str, int]]:
+        """(value, record count) pairs for 'area', 'city', 'cuisine' or 'rest_type', most frequent first."""
+        everything = np.ones(self.size, dtype=bool)
+        if field == "area":
+            return _ranked(self.location.values, self.location.value_counts(everything))
+        if field == "city":
+            return _ranked(self.city.values, self.city.value_counts(everything))
+        if field == "cuisine":
+            return _ranked(self.cuisine_tokens.names, self.cuisine_tokens.value_counts(everything))
+        if field == "rest_type":
+            return _ranked(self.rest_type_tokens.names, self.rest_type_tokens.value_counts(everything))
+        raise ValueError(f"Unknown vocabulary field: {field}")
+
+    # ── Facets ────────────────────────────────────────────────────────
+
+    def facets(self, bits: Dict[str, np.ndarray]) -> FacetCounts:
+        """Counts per locality, cuisine, price bucket and rating bucket."""
+        total = popcount(self.combine(bits))
+
+        loc_counts = self.location.value_counts(self.unpack(self.combine(bits, exclude="location")))
+
+        cuisine_counts = self.cuisine_tokens.value_counts(self.unpack(self.combine(bits, exclude="cuisine")))
+
+        price_mask = self.unpack(self.combine(bits, exclude="price"))
+        price_codes = self._price_bucket[price_mask]
+        price_counts = np.bincount(price_codes[price_codes >= 0], minlength=len(PRICE_BUCKETS))
+
+        rating_mask = self.unpack(self.combine(bits, exclude="rating"))
+        rating_codes = self._rating_bucket[rating_mask]
+        rating_counts = np.bincount(rating_codes[rating_codes >= 0], minlength=len(RATING_BUCKETS))
+
+        return FacetCounts(
+            total=total,
+            location=_ranked(self.location.values, loc_counts),
+            cuisine=_ranked(self.cuisine_tokens.names, cuisine_counts),
+            price=list(zip(PRICE_BUCKETS, (int(c) for c in price_counts))),
+            rating=list(zip(RATING_BUCKETS, (int(c) for c in rating_counts))),
+        )
+
+
+def _ranked(values: Sequence[str], counts: np.ndarray) -> List[Tuple[str, int]]:
+    """Non-zero (value, count) pairs, most frequent first, then alphabetical."""
+    nz = np.flatnonzero(counts)
+    pairs = [(values[i], int(counts[i])) for i in nz]
+    pairs.sort(key=lambda p: (-p[1], p[0].lower()))
+    return pairs
@@ -1,29 +1,108 @@
 """In-memory Restaurant Data Store with filtering by preference."""
 
-from typing import List, Optional
+from dataclasses import asdict, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
+
+from .autocomplete import AUTOCOMPLETE_FIELDS, PrefixIndex
+from .best_of import BestOfViews
+from .columns import ColumnIndex, FacetCounts
 from .models import Preference, RestaurantRecord
+from .refinement import ResultHandle, is_narrower
+from .relaxation import Relaxation, best_relaxation, relaxation_ladder
+from .similarity import SimilarityIndex
 
 
 class RestaurantDataStore:
     """
     Holds restaurant records and supports filtering by price, location, rating, cuisine.
+
+    Every mutation bumps ``generation``; derived indexes are cached per
+    generation and rebuilt lazily on first use after a change.
     """
 
     def __init__(self, records: Optional[List[RestaurantRecord]] = None):
         self._records: List[RestaurantRecord] = list(records) if records else []
+        self._generation = 0
+        self._derived: Dict[str, Any] = {}
 
     def load(self, records: List[RestaurantRecord]) -> None:
         """Replace current records with the given list."""
         self._records = list(records)
+        self._bump_generation()
 
     def add(self, record: RestaurantRecord) -> None:
         """Append a single record."""
         self._records.append(record)
+        self._bump_generation()
 
     def __len__(self) -> int:
         return len(self._records)
 
+    @property
+    def generation(self) -> int:
+        """Monotonic counter identifying the current snapshot of records."""
+        return self._generation
+
+    def _bump_generation(self) -> None:
+        self._generation += 1
+        self._derived = {}
+
+    def _derived_index(self, name: str, build: Callable[[], Any]) -> Any:
+        """Return the cached derived structure ``name``, building it if stale."""
+        if name not in self._derived:
+            self._derived[name] = build()
+        return self._derived[name]
+
+    def column_index(self) -> ColumnIndex:
+        """Columnar filter index for the current generation."""
+        return self._derived_index("columns", lambda: ColumnIndex(self._records))
+
+    def prefix_index(self, field: str) -> PrefixIndex:
+        """Autocomplete index over ``field`` ('area', 'city' or 'cuisine')."""
+        if field not in AUTOCOMPLETE_FIELDS:
+            raise ValueError(f"field must be one of: {', '.join(AUTOCOMPLETE_FIELDS)}")
+        return self._derived_index(
+            f"prefix:{field}", lambda: PrefixIndex(self.column_index().vocabulary(field))
+        )
+
+    def autocomplete(self, field: str, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Top ``limit`` completions of ``prefix`` as (value, record count) pairs."""
+        return self.prefix_index(field).complete(prefix, limit=limit)
+
+    def best_of_views(self) -> BestOfViews:
+        """Ranked top-N views per locality and per (locality, cuisine) for the current generation."""
+        return self._derived_index("best_of", lambda: BestOfViews(self.column_index()))
+
+    def best_of(self, pref: Preference, limit: Optional[int] = None) -> Optional[List[RestaurantRecord]]:
+        """
+        Best-rated matches for a location (+ cuisine) only preference, read
+        from the materialized views.
+
+        Returns None when ``pref`` uses other filters or no view answers it;
+        callers then fall back to ``query_by_preference``.
+        """
+        filters = {k: v for k, v in asdict(pref).items() if v is not None}
+        if "location" not in filters or set(filters) - {"location", "cuisine"}:
+            return None
+        rows = self.best_of_views().lookup(pref.location, pref.cuisine, limit=limit)
+        if rows is None:
+            return None
+        return [self._records[i] for i in rows]
+
+    def similarity_index(self) -> SimilarityIndex:
+        """Nearest-neighbour index for the current generation."""
+        return self._derived_index("similarity", lambda: SimilarityIndex(self._records))
+
+    def similar(self, name: str, top_n: int = 5) -> List[Tuple[RestaurantRecord, float]]:
+        """
+        Return restaurants most similar to ``name`` as (record, score) pairs.
+
+        Raises KeyError if no restaurant with that name is loaded.
+        """
+        return self.similarity_index().similar(name, top_n=top_n)
+
     def query(
         self,
         city: Optional[str] = None,
@@ -32,37 +111,70 @@ class RestaurantDataStore:
         price_max: Optional[int] = None,
         min_rating: Optional[float] = None,
         cuisine: Optional[str] = None,
+        online_order: Optional[bool] = None,
+        book_table: Optional[bool] = None,
+        rest_type: Optional[str] = None,
+        min_votes: Optional[int] = None,
     ) -> List[RestaurantRecord]:
         """
         Return records matching all non-None filters.
-        String filters are case-insensitive substring/equality.
+        String filters are case-insensitive substring/equality; rest_type must
+        equal one of the record's comma-separated rest types.
         """
-        result = []
-        for r in self._records:
-            if city is not None and (not r.listed_in_city or city.lower() not in r.listed_in_city.lower()):
-                continue
-            if location is not None and (not r.location or location.lower() not in r.location.lower()):
-                continue
-            cn = r.cost_numeric
-            if price_min is not None and (cn is None or cn < price_min):
-                continue
-            if price_max is not None and (cn is None or cn > price_max):
-                continue
-            rn = r.rating_numeric
-            if min_rating is not None and (rn is None or rn < min_rating):
-                continue
-            if cuisine is not None and (not r.cuisines or cuisine.lower() not in r.cuisines.lower()):
-                continue
-            result.append(r)
-        return result
+        index = self.column_index()
+        bits = index.filter_bits(
+            city=city,
+            location=location,
+            price_min=price_min,
+            price_max=price_max,
+            min_rating=min_rating,
+            cuisine=cuisine,
+            online_order=online_order,
+            book_table=book_table,
+            rest_type=rest_type,
+            min_votes=min_votes,
+        )
+        return [self._records[i] for i in index.rows(index.combine(bits))]
 
     def query_by_preference(self, pref: Preference) -> List[RestaurantRecord]:
         """Apply a Preference object to filter records."""
-        return self.query(
-            city=pref.city,
-            location=pref.location,
-            price_min=pref.price_min,
-            price_max=pref.price_max,
-            min_rating=pref.min_rating,
-            cuisine=pref.cuisine,
-        )
+        return self.query(**asdict(pref))  # fields mirror query()'s keywords
+
+    def query_handle(self, pref: Preference, previous: Optional[ResultHandle] = None) -> ResultHandle:
+        """
+        Match ``pref`` and return a handle on the result set.
+
+        If ``previous`` comes from the current generation and ``pref`` is no
+        wider than its preference, only the previous rows are re-filtered, so
+        the cost follows the previous result size rather than the store size.
+        """
+        index = self.column_index()
+        filters = asdict(pref)
+        if (
+            previous is not None
+            and previous.generation == self._generation
+            and is_narrower(pref, previous.preference)
+        ):
+            rows = index.filter_rows(previous.rows, **filters)
+        else:
+            rows = index.rows(index.combine(index.filter_bits(**filters)))
+        return ResultHandle(generation=self._generation, preference=replace(pref), rows=rows.astype(np.int32, copy=False))
+
+    def records(self, handle: ResultHandle) -> List[RestaurantRecord]:
+        """Records behind a handle from the current generation."""
+        if handle.generation != self._generation:
+            raise ValueError("Result handle is from an older store generation")
+        return [self._records[i] for i in handle.rows]
+
+    def relaxations(self, pref: Preference) -> List[Relaxation]:
+        """Match counts for ``pref`` and each step of the relaxation ladder."""
+        return relaxation_ladder(self.column_index(), pref)
+
+    def relax(self, pref: Preference) -> Optional[Relaxation]:
+        """Least relaxed version of ``pref`` that matches something, or None."""
+        return best_relaxation(self.column_index(), pref)
+
+    def facets(self, pref: Preference) -> FacetCounts:
+        """Match counts per locality, cuisine, price and rating bucket for ``pref``."""
+        index = self.column_index()
+        return index.facets(index.filter_bits(**asdict(pref)))
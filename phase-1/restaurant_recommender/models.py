@@ -14,6 +14,10 @@ class Preference:
     city: Optional[str] = None      # dataset: listed_in(city)
     min_rating: Optional[float] = None  # e.g. 4.0
     cuisine: Optional[str] = None   # substring match on cuisines
+    online_order: Optional[bool] = None  # dataset online_order is Yes/No
+    book_table: Optional[bool] = None    # dataset book_table is Yes/No
+    rest_type: Optional[str] = None  # one rest type name, e.g. "Cafe" (exact, case-insensitive)
+    min_votes: Optional[int] = None  # e.g. 100
 
 
 @dataclass
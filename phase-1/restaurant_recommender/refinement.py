@@ -0,0 +1,129 @@
+"""Per-session result handles so a refined search only re-filters the previous result set."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .models import Preference
+
+# Filters where a larger value is stricter / a smaller value is stricter.
+_LOWER_BOUNDS = ("price_min", "min_rating", "min_votes")
+_UPPER_BOUNDS = ("price_max",)
+# Substring filters: a needle containing the old needle matches a subset.
+_SUBSTRING = ("city", "location", "cuisine")
+# Filters that must be unchanged.
+_EXACT = ("online_order", "book_table")
+
+
+@dataclass(frozen=True)
+class ResultHandle:
+    """Record ids matching ``preference`` in one store generation, in store order."""
+
+    generation: int
+    preference: Preference
+    rows: np.ndarray  # int32
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.rows.nbytes)
+
+
+def is_narrower(new: Preference, old: Preference) -> bool:
+    """True if every record matching ``new`` also matches ``old`` (equal counts as narrower)."""
+    n, o = asdict(new), asdict(old)
+    for key, old_value in o.items():
+        if old_value is None:
+            continue
+        new_value = n[key]
+        if new_value is None:
+            return False
+        if key in _LOWER_BOUNDS:
+            if new_value < old_value:
+                return False
+        elif key in _UPPER_BOUNDS:
+            if new_value > old_value:
+                return False
+        elif key in _SUBSTRING:
+            if old_value.lower() not in new_value.lower():
+                return False
+        elif key in _EXACT:
+            if bool(new_value) != bool(old_value):
+                return False
+        elif key == "rest_type":
+            if new_value.strip().lower() != old_value.strip().lower():
+                return False
+        else:
+            return False  # unknown filter: never assume it narrows
+    return True
+
+
+class ResultHandleCache:
+    """
+    Short-lived ResultHandle per session id.
+
+    Session ids are chosen by clients, so memory is bounded twice: least
+    recently used sessions are dropped beyond ``max_sessions`` or once the
+    stored rows exceed ``max_bytes``, and a handle larger than ``max_bytes``
+    on its own is not kept. A handle older than ``ttl_s`` seconds is
+    treated as missing. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 256,
+        ttl_s: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: int = 16 * 1024 * 1024,
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()  # session -> (stored_at, handle)
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, session_id: str) -> Optional[ResultHandle]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            stored_at, handle = entry
+            if self._clock() - stored_at > self.ttl_s:
+                self._drop(session_id)
+                return None
+            self._entries.move_to_end(session_id)
+            return handle
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of row ids currently held."""
+        return self._bytes
+
+    def put(self, session_id: str, handle: ResultHandle) -> None:
+        size = getattr(handle, "nbytes", 0)
+        with self._lock:
+            self._drop(session_id)  # the old handle is stale either way
+            if size > self.max_bytes:
+                return
+            self._entries[session_id] = (self._clock(), handle)
+            self._bytes += size
+            while len(self._entries) > self.max_sessions or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= getattr(entry[1], "nbytes", 0)
@@ -0,0 +1,66 @@
+"""Relaxation ladder for preferences that match nothing, evaluated on the column index in one pass."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, dataclass, field, replace
+from typing import List, Optional, Tuple
+
+from .columns import ColumnIndex, popcount
+from .models import Preference
+
+# Fraction by which each price bound is widened.
+PRICE_WIDEN = 0.2
+
+
+@dataclass
+class Relaxation:
+    """One rung of the ladder: the preference to run, what was loosened, and how many records match."""
+
+    preference: Preference
+    relaxed: List[str] = field(default_factory=list)
+    count: int = 0
+
+
+def widen_price(price_min: Optional[int], price_max: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+    """Price band widened by PRICE_WIDEN on each side (rounded outwards)."""
+    lo = None if price_min is None else int(math.floor(price_min * (1 - PRICE_WIDEN)))
+    hi = None if price_max is None else int(math.ceil(price_max * (1 + PRICE_WIDEN)))
+    return lo, hi
+
+
+def relaxation_ladder(index: ColumnIndex, pref: Preference) -> List[Relaxation]:
+    """
+    Counts for ``pref`` and for each cumulative relaxation of it.
+
+    The ladder is: drop the rating floor, widen the price band by 20%, drop
+    the cuisine, then drop the locality (whole city). Rungs that would not
+    change anything are skipped. Each filter bitmap is built once; every
+    rung is a word-wise AND of a subset of them plus a popcount.
+    """
+    active = index.filter_bits(**asdict(pref))
+    wide_min, wide_max = widen_price(pref.price_min, pref.price_max)
+    steps = [
+        ("min_rating", ("rating",), {"min_rating": None}),
+        ("price", ("price",), {"price_min": wide_min, "price_max": wide_max}),
+        ("cuisine", ("cuisine",), {"cuisine": None}),
+        ("location", ("location", "city"), {"location": None, "city": None}),
+    ]
+
+    ladder = [Relaxation(preference=pref, count=popcount(index.combine(active)))]
+    for name, dims, changes in steps:
+        if not any(d in active for d in dims):
+            continue
+        for d in dims:
+            active.pop(d, None)
+        if name == "price":
+            active["price"] = index.filter_bits(price_min=wide_min, price_max=wide_max)["price"]
+        current = replace(ladder[-1].preference, **changes)
+        relaxed = ladder[-1].relaxed + [name]
+        ladder.append(Relaxation(preference=current, relaxed=relaxed, count=popcount(index.combine(active))))
+    return ladder
+
+
+def best_relaxation(index: ColumnIndex, pref: Preference) -> Optional[Relaxation]:
+    """The least relaxed rung with at least one match (``relaxed`` empty if ``pref`` already matches)."""
+    return next((r for r in relaxation_ladder(index, pref) if r.count > 0), None)
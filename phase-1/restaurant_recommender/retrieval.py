@@ -1,9 +1,26 @@
 """Retrieval component: preference -> filtered list of restaurant records."""
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from .models import Preference, RestaurantRecord
 from .data_store import RestaurantDataStore
+from .refinement import ResultHandle
+
+
+def _rank(
+    candidates: List[RestaurantRecord],
+    sort_by_rating: bool,
+    limit: Optional[int],
+) -> List[RestaurantRecord]:
+    if sort_by_rating:
+        candidates = sorted(
+            candidates,
+            key=lambda r: (r.rating_numeric or 0.0, r.votes or 0),
+            reverse=True,
+        )
+    if limit is not None:
+        candidates = candidates[:limit]
+    return candidates
 
 
 def retrieve(
@@ -15,14 +32,33 @@ def retrieve(
     """
     Return restaurants matching the preference, optionally sorted by rating (desc)
     and limited to top_k.
+
+    Location (+ cuisine) preferences sorted by rating are served from the
+    store's precomputed best-of views when possible.
     """
-    candidates = store.query_by_preference(preference)
+    limit = top_k if top_k is not None and top_k > 0 else None
     if sort_by_rating:
-        candidates = sorted(
-            candidates,
-            key=lambda r: (r.rating_numeric or 0.0, r.votes or 0),
-            reverse=True,
-        )
-    if top_k is not None and top_k > 0:
-        candidates = candidates[:top_k]
-    return candidates
+        best = store.best_of(preference, limit=limit)
+        if best is not None:
+            return best
+
+    return _rank(store.query_by_preference(preference), sort_by_rating, limit)
+
+
+def retrieve_refined(
+    store: RestaurantDataStore,
+    preference: Preference,
+    previous: Optional[ResultHandle] = None,
+    sort_by_rating: bool = True,
+    top_k: Optional[int] = None,
+) -> Tuple[List[RestaurantRecord], ResultHandle]:
+    """
+    Like ``retrieve``, but also returns a handle on the full match set.
+
+    Pass the handle from the previous search of the same session as
+    ``previous``: when the new preference is narrower, only those rows are
+    re-filtered.
+    """
+    handle = store.query_handle(preference, previous=previous)
+    limit = top_k if top_k is not None and top_k > 0 else None
+    return _rank(store.records(handle), sort_by_rating, limit), handle
@@ -0,0 +1,153 @@
+"""Content-based "similar restaurants" index (no LLM).
+
+Each restaurant entity (records deduplicated by name, keeping the best-rated
+listing) is encoded as a TF-IDF weighted one-hot vector over cuisines,
+rest_type, dish_liked, cost band and locality. Rows are L2-normalised so the
+dot product is the cosine similarity. The top-N neighbours of every entity are
+computed once per store generation, so a lookup is a dict hit plus a slice.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columns import cost_band
+from .models import RestaurantRecord
+
+DEFAULT_NEIGHBOURS = 20
+DEFAULT_MAX_DISH_FEATURES = 500
+_BLOCK_ROWS = 1024
+
+
+def entity_key(name: str) -> str:
+    """Normalise a restaurant name into the key used to identify an entity."""
+    return " ".join(name.strip().lower().split())
+
+
+def _split(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [t.strip().lower() for t in value.split(",") if t.strip()]
+
+
+def _record_tokens(r: RestaurantRecord) -> Tuple[List[str], List[str]]:
+    """Return (base feature tokens, dish tokens) for a record."""
+    tokens = [f"cuisine:{c}" for c in _split(r.cuisines)]
+    tokens += [f"rest_type:{t}" for t in _split(r.rest_type)]
+    band = cost_band(r.cost_numeric)
+    if band:
+        tokens.append(f"cost:{band}")
+    if r.location:
+        tokens.append(f"location:{r.location.strip().lower()}")
+    dishes = [f"dish:{d}" for d in _split(r.dish_liked)]
+    return tokens, dishes
+
+
+def _representatives(records: Sequence[RestaurantRecord]) -> Tuple[List[str], List[RestaurantRecord]]:
+    """One record per entity: the best by (rating, votes), first seen on ties."""
+    best: Dict[str, RestaurantRecord] = {}
+    for r in records:
+        key = entity_key(r.name)
+        cur = best.get(key)
+        if cur is None or (r.rating_numeric or 0.0, r.votes or 0) > (cur.rating_numeric or 0.0, cur.votes or 0):
+            best[key] = r
+    keys = list(best.keys())
+    return keys, [best[k] for k in keys]
+
+
+class SimilarityIndex:
+    """
+    Precomputed nearest neighbours over restaurant entities.
+
+    Built from a snapshot of records; the data store rebuilds it whenever its
+    generation changes.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[RestaurantRecord],
+        neighbours: int = DEFAULT_NEIGHBOURS,
+        max_dish_features: int = DEFAULT_MAX_DISH_FEATURES,
+    ):
+        self._keys, self._entities = _representatives(records)
+        self._position: Dict[str, int] = {k: i for i, k in enumerate(self._keys)}
+
+        matrix = self._feature_matrix(max_dish_features)
+        self._neighbours, self._scores = self._top_neighbours(matrix, neighbours)
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and entity_key(name) in self._position
+
+    def _feature_matrix(self, max_dish_features: int) -> np.ndarray:
+        per_entity = [_record_tokens(r) for r in self._entities]
+
+        # Keep only the most common dishes; the long tail adds width, not signal.
+        dish_df: Dict[str, int] = {}
+        for _, dishes in per_entity:
+            for d in set(dishes):
+                dish_df[d] = dish_df.get(d, 0) + 1
+        kept_dishes = set(sorted(dish_df, key=lambda d: (-dish_df[d], d))[:max_dish_features])
+
+        vocab: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        for i, (tokens, dishes) in enumerate(per_entity):
+            for t in set(tokens) | (set(dishes) & kept_dishes):
+                rows.append(i)
+                cols.append(vocab.setdefault(t, len(vocab)))
+
+        n = len(self._entities)
+        matrix = np.zeros((n, max(1, len(vocab))), dtype=np.float32)
+        if not rows:
+            return matrix
+        row_idx = np.asarray(rows, dtype=np.int64)
+        col_idx = np.asarray(cols, dtype=np.int64)
+        matrix[row_idx, col_idx] = 1.0
+
+        df = np.bincount(col_idx, minlength=matrix.shape[1]).astype(np.float32)
+        idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+        matrix *= idf
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    @staticmethod
+    def _top_neighbours(matrix: np.ndarray, neighbours: int) -> Tuple[np.ndarray, np.ndarray]:
+        n = matrix.shape[0]
+        k = max(0, min(neighbours, n - 1))
+        idx = np.zeros((n, k), dtype=np.int32)
+        scores = np.zeros((n, k), dtype=np.float32)
+        if k == 0:
+            return idx, scores
+
+        for start in range(0, n, _BLOCK_ROWS):
+            stop = min(start + _BLOCK_ROWS, n)
+            sims = matrix[start:stop] @ matrix.T
+            sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+            part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            part_scores = np.take_along_axis(sims, part, axis=1)
+            order = np.argsort(-part_scores, axis=1, kind="stable")
+            idx[start:stop] = np.take_along_axis(part, order, axis=1)
+            scores[start:stop] = np.take_along_axis(part_scores, order, axis=1)
+        return idx, scores
+
+    def similar(self, name: str, top_n: int = 5) -> List[Tuple[RestaurantRecord, float]]:
+        """
+        Return up to ``top_n`` (record, cosine score) pairs most similar to ``name``.
+
+        Raises KeyError if the restaurant is unknown. Neighbours with no
+        shared features (score 0) are omitted.
+        """
+        pos = self._position[entity_key(name)]
+        out: List[Tuple[RestaurantRecord, float]] = []
+        for j, score in zip(self._neighbours[pos, :top_n], self._scores[pos, :top_n]):
+            if score <= 0.0:
+                break
+            out.append((self._entities[int(j)], float(score)))
+        return out
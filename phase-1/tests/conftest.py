@@ -20,6 +20,8 @@ def sample_records():
             votes=775,
             rest_type="Casual Dining",
             dish_liked="Pasta, Lunch Buffet",
+            online_order="Yes",
+            book_table="Yes",
         ),
         RestaurantRecord(
             name="Spice Elephant",
@@ -30,6 +32,8 @@ def sample_records():
             rate="4.1/5",
             votes=787,
             rest_type="Casual Dining",
+            online_order="Yes",
+            book_table="No",
         ),
         RestaurantRecord(
             name="Addhuri Udupi Bhojana",
@@ -40,6 +44,8 @@ def sample_records():
             rate="3.7/5",
             votes=88,
             rest_type="Quick Bites",
+            online_order="No",
+            book_table="No",
         ),
         RestaurantRecord(
             name="Onesta",
@@ -50,6 +56,8 @@ def sample_records():
             rate="4.6/5",
             votes=2556,
             rest_type="Casual Dining, Cafe",
+            online_order="Yes",
+            book_table="No",
         ),
         RestaurantRecord(
             name="Cafe in Koramangala",
@@ -1,11 +1,13 @@
 """Phase 1 tests: loader, data store, retrieval, and end-to-end."""
 
+import numpy as np
 import pytest
 
 from restaurant_recommender.models import Preference, RestaurantRecord
 from restaurant_recommender.loader import load_dataset_from_hf
 from restaurant_recommender.data_store import RestaurantDataStore
-from restaurant_recommender.retrieval import retrieve
+from restaurant_recommender.retrieval import retrieve, retrieve_refined
+from restaurant_recommender.refinement import ResultHandleCache, is_narrower
 
 
 # --- Unit: Data store filtering ---
@@ -53,6 +55,32 @@ def test_data_store_combined_filters(store):
     assert results[0].name == "Onesta"
 
 
+def test_data_store_filter_by_flags(store):
+    assert {r.name for r in store.query(online_order=True)} == {"Jalsa", "Spice Elephant", "Onesta"}
+    assert [r.name for r in store.query(online_order=False)] == ["Addhuri Udupi Bhojana"]
+    assert [r.name for r in store.query(online_order=True, book_table=True)] == ["Jalsa"]
+
+
+def test_data_store_filter_by_rest_type_matches_whole_name(store):
+    assert {r.name for r in store.query(rest_type="cafe")} == {"Onesta"}
+    assert len(store.query(rest_type="Casual Dining")) == 3
+    assert store.query(rest_type="Casual") == []
+
+
+def test_unknown_rest_types_are_not_cached(store):
+    for i in range(5):
+        assert store.query(rest_type=f"no such type {i}") == []
+    store.query(rest_type="Cafe")
+    assert list(store.column_index()._rest_type_bits) == ["cafe"]
+
+
+def test_data_store_filter_by_min_votes(store):
+    pref = Preference(min_votes=700, rest_type="Casual Dining", online_order=True)
+    assert {r.name for r in store.query_by_preference(pref)} == {"Jalsa", "Spice Elephant", "Onesta"}
+    assert store.facets(pref).total == 3
+    assert store.query(min_votes=1000)[0].name == "Onesta"
+
+
 # --- Unit: Preference and retrieval ---
 
 def test_retrieve_by_preference_returns_list(store):
@@ -78,6 +106,114 @@ def test_retrieve_respects_top_k(store):
     assert len(results) == 2
 
 
+def test_best_of_views_match_filter_path(store):
+    for pref in (
+        Preference(location="Banashankari"),
+        Preference(location="banashankari", cuisine="Chinese"),
+        Preference(location="Koramangala", cuisine="Cafe"),
+        Preference(location="Banashankari", cuisine="Thai"),
+    ):
+        served = store.best_of(pref, limit=3)
+        assert served is not None
+        expected = sorted(
+            store.query_by_preference(pref),
+            key=lambda r: (r.rating_numeric or 0.0, r.votes or 0),
+            reverse=True,
+        )[:3]
+        assert served == expected
+        assert retrieve(store, pref, top_k=3) == expected
+
+
+def test_best_of_declines_other_shapes(store):
+    assert store.best_of(Preference(city="Banashankari")) is None
+    assert store.best_of(Preference(location="Banashankari", min_rating=4.0)) is None
+    # "Indian" is part of several cuisine names, so no single view holds the answer.
+    assert store.best_of(Preference(location="Banashankari", cuisine="Indian")) is None
+
+
+def test_best_of_views_refresh_with_generation(store):
+    pref = Preference(location="Koramangala")
+    assert [r.name for r in store.best_of(pref)] == ["Cafe in Koramangala"]
+    store.add(RestaurantRecord(name="Third Wave", location="Koramangala", cuisines="Cafe", rate="4.5/5"))
+    assert [r.name for r in store.best_of(pref)] == ["Third Wave", "Cafe in Koramangala"]
+
+
+def test_is_narrower():
+    base = Preference(location="Banashankari", price_max=800, min_rating=3.5)
+    assert is_narrower(base, base)
+    assert is_narrower(Preference(location="Banashankari", price_max=600, min_rating=4.0, cuisine="Thai"), base)
+    assert not is_narrower(Preference(location="Banashankari", price_max=900, min_rating=3.5), base)
+    assert not is_narrower(Preference(price_max=800, min_rating=3.5), base)
+    assert not is_narrower(Preference(location="Bana", price_max=800, min_rating=3.5), base)
+
+
+def test_refined_query_filters_previous_handle(store):
+    records, handle = retrieve_refined(store, Preference(location="Banashankari"))
+    assert len(handle) == 4
+
+    narrower = Preference(location="Banashankari", min_rating=4.0, price_max=700)
+    refined, refined_handle = retrieve_refined(store, narrower, previous=handle)
+    assert [r.name for r in refined] == ["Onesta"]
+    assert refined == retrieve(store, narrower)
+    assert refined_handle.preference == narrower
+
+    # A handle from an older generation is ignored rather than trusted.
+    store.add(RestaurantRecord(name="Nandhini", location="Banashankari", rate="4.3/5", approx_cost="600"))
+    stale, _ = retrieve_refined(store, narrower, previous=refined_handle)
+    assert [r.name for r in stale] == ["Onesta", "Nandhini"]
+
+
+def test_result_handle_cache_expires_and_evicts():
+    now = [0.0]
+    cache = ResultHandleCache(max_sessions=2, ttl_s=10.0, clock=lambda: now[0])
+    cache.put("a", "handle-a")
+    cache.put("b", "handle-b")
+    assert cache.get("a") == "handle-a"
+    cache.put("c", "handle-c")  # "b" is least recently used
+    assert cache.get("b") is None
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_result_handle_cache_bounds_stored_bytes(store):
+    _, handle = retrieve_refined(store, Preference())
+    assert handle.rows.dtype == np.int32
+    cache = ResultHandleCache(max_bytes=2 * handle.nbytes)
+    for session in "abc":
+        cache.put(session, handle)
+    assert cache.get("a") is None  # evicted to stay within max_bytes
+    assert cache.nbytes == 2 * handle.nbytes
+
+    tiny = ResultHandleCache(max_bytes=handle.nbytes - 1)
+    tiny.put("a", handle)
+    assert tiny.get("a") is None and tiny.nbytes == 0
+
+
+def test_relaxation_ladder_counts_each_rung(store):
+    pref = Preference(location="Banashankari", cuisine="Thai", price_max=400, min_rating=4.5)
+    ladder = store.relaxations(pref)
+    assert [r.relaxed for r in ladder] == [
+        [],
+        ["min_rating"],
+        ["min_rating", "price"],
+        ["min_rating", "price", "cuisine"],
+        ["min_rating", "price", "cuisine", "location"],
+    ]
+    assert [r.count for r in ladder] == [0, 0, 0, 1, 1]
+    assert ladder[2].preference.price_max == 480
+    for rung in ladder:
+        assert rung.count == len(store.query_by_preference(rung.preference))
+
+
+def test_relax_returns_least_relaxed_non_empty(store):
+    assert store.relax(Preference(location="Banashankari")).relaxed == []
+    relaxed = store.relax(Preference(location="Banashankari", price_max=260))
+    assert relaxed.relaxed == ["price"]
+    assert [r.name for r in store.query_by_preference(relaxed.preference)] == ["Addhuri Udupi Bhojana"]
+    assert store.relax(Preference(rest_type="Microbrewery")) is None
+
+
 def test_retrieve_empty_preference_returns_all(store):
     pref = Preference()
     results = retrieve(store, pref, sort_by_rating=False)
@@ -100,6 +236,76 @@ def test_restaurant_record_cost_numeric():
     assert r2.cost_numeric == 1000
 
 
+# --- Unit: Facet counts ---
+
+def test_facets_total_matches_query(store):
+    pref = Preference(city="Banashankari", min_rating=4.0)
+    counts = store.facets(pref)
+    assert counts.total == len(store.query_by_preference(pref))
+
+
+def test_facets_ignore_own_dimension(store):
+    counts = store.facets(Preference(cuisine="Italian"))
+    assert counts.total == 2
+    assert dict(counts.location) == {"Banashankari": 1, "Koramangala": 1}
+    cuisines = dict(counts.cuisine)
+    assert cuisines["North Indian"] == 3
+    assert cuisines["Italian"] == 2
+
+
+def test_facets_price_buckets(store):
+    counts = store.facets(Preference(location="Banashankari"))
+    assert dict(counts.price) == {"<300": 0, "300-500": 1, "500-800": 1, "800-1200": 2, "1200-2000": 0, "2000+": 0}
+
+
+# --- Unit: Prefix autocomplete ---
+
+def test_autocomplete_ranks_by_count(store):
+    assert store.autocomplete("cuisine", "", limit=2) == [("North Indian", 3), ("Cafe", 2)]
+
+
+def test_autocomplete_matches_any_word_prefix(store):
+    names = [v for v, _ in store.autocomplete("cuisine", "ind")]
+    assert names == ["North Indian", "South Indian"]
+    assert store.autocomplete("area", "KORA") == [("Koramangala", 1)]
+    assert store.autocomplete("area", "xyz") == []
+
+
+def test_autocomplete_unknown_field_raises(store):
+    with pytest.raises(ValueError):
+        store.autocomplete("dish", "pa")
+
+
+# --- Unit: Similar restaurants index ---
+
+def test_similar_returns_closest_restaurant_first(store):
+    results = store.similar("Jalsa", top_n=2)
+    assert results[0][0].name == "Spice Elephant"
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+    assert all(r.name != "Jalsa" for r, _ in results)
+
+
+def test_similar_is_case_and_whitespace_insensitive(store):
+    assert store.similar("  spice   elephant ", top_n=1)[0][0].name == "Jalsa"
+
+
+def test_similar_unknown_restaurant_raises_key_error(store):
+    with pytest.raises(KeyError):
+        store.similar("Nowhere Diner")
+
+
+def test_similar_index_refreshes_with_generation(store):
+    index = store.similarity_index()
+    generation = store.generation
+    assert store.similarity_index() is index
+
+    store.add(RestaurantRecord(name="Thai House", location="Banashankari", cuisines="Thai, Chinese", approx_cost="800"))
+    assert store.generation == generation + 1
+    assert store.similarity_index() is not index
+    assert "Thai House" in [r.name for r, _ in store.similar("Spice Elephant", top_n=4)]
+
+
 # --- Integration: real Hugging Face load + retrieval ---
 
 @pytest.mark.integration
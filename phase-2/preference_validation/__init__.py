@@ -1,9 +1,16 @@
 from .models import ValidatedPreference, PreferenceValidationError
 from .validator import validate_preference
+from .gazetteer import Gazetteer
+from .text_parser import ParsedText, parse_preference_text
+from .vocabulary import PreferenceVocabulary
 
 __all__ = [
     "ValidatedPreference",
     "PreferenceValidationError",
     "validate_preference",
+    "Gazetteer",
+    "ParsedText",
+    "parse_preference_text",
+    "PreferenceVocabulary",
 ]
 
@@ -0,0 +1,138 @@
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Field priority when one surface form belongs to several vocabularies
+# (e.g. "Indiranagar" is both a location and a listed_in(city) value).
+GAZETTEER_FIELDS = ("location", "city", "cuisine", "rest_type")
+
+_CURRENCY = re.compile(r"₹|\brs\b\.?|\binr\b")
+_NON_WORD = re.compile(r"[^\w.,+<>=-]+")
+_LOOSE_DOT = re.compile(r"(?<!\d)\.|\.(?!\d)")
+_LOOSE_COMMA = re.compile(r"(?<!\d),|,(?!\d{3}\b)")  # keeps thousands separators: "1,000"
+_WORD_HYPHEN = re.compile(r"(?<=[^\W\d])-|-(?=[^\W\d])")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, mark currency as ' rs ', and reduce punctuation to single spaces."""
+    s = _CURRENCY.sub(" rs ", text.lower())
+    s = _NON_WORD.sub(" ", s)
+    s = _LOOSE_DOT.sub(" ", s)
+    s = _LOOSE_COMMA.sub(" ", s)
+    s = _WORD_HYPHEN.sub(" ", s)
+    return _SPACES.sub(" ", s).strip()
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every pattern occurrence."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self.patterns: List[str] = []
+
+        for pattern in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(len(self.patterns))
+            self.patterns.append(pattern)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, int]]:
+        """Yield (start, end, pattern_id) for every occurrence, overlapping included."""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pid in self._out[state]:
+                yield i + 1 - len(self.patterns[pid]), i + 1, pid
+
+
+@dataclass(frozen=True)
+class GazetteerMatch:
+    start: int
+    end: int
+    field: str
+    value: str  # canonical vocabulary entry
+
+
+class Gazetteer:
+    """
+    Dictionary of known localities, cities, cuisines and rest types.
+
+    Matches whole words only and resolves overlaps leftmost-longest, so
+    "north indian" wins over "indian".
+    """
+
+    def __init__(self, entries: Dict[str, Tuple[str, str]]):
+        # normalized surface form -> (field, canonical value)
+        self._entries = entries
+        self._matcher = AhoCorasick(entries.keys())
+
+    @classmethod
+    def from_vocabulary(
+        cls,
+        locations: Iterable[str] = (),
+        cities: Iterable[str] = (),
+        cuisines: Iterable[str] = (),
+        rest_types: Iterable[str] = (),
+    ) -> "Gazetteer":
+        entries: Dict[str, Tuple[str, str]] = {}
+        by_field = dict(zip(GAZETTEER_FIELDS, (locations, cities, cuisines, rest_types)))
+        for field in GAZETTEER_FIELDS:
+            for value in by_field[field]:
+                key = normalize_text(value)
+                if key and key not in entries:
+                    entries[key] = (field, value)
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, surface: str) -> Optional[Tuple[str, str]]:
+        return self._entries.get(normalize_text(surface))
+
+    def find(self, text: str) -> List[GazetteerMatch]:
+        """Non-overlapping whole-word matches in normalized ``text``, left to right."""
+        found = []
+        for start, end, pid in self._matcher.iter_matches(text):
+            if start > 0 and text[start - 1] != " ":
+                continue
+            if end < len(text) and text[end] != " ":
+                continue
+            found.append((start, end, pid))
+
+        found.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        out: List[GazetteerMatch] = []
+        last_end = 0
+        for start, end, pid in found:
+            if start < last_end:
+                continue
+            field, value = self._entries[self._matcher.patterns[pid]]
+            out.append(GazetteerMatch(start=start, end=end, field=field, value=value))
+            last_end = end
+        return out
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -12,7 +12,15 @@ class ValidatedPreference:
     price_max: Optional[int] = None
     min_rating: Optional[float] = None
     cuisine: Optional[str] = None
+    online_order: Optional[bool] = None
+    book_table: Optional[bool] = None
+    rest_type: Optional[str] = None
+    min_votes: Optional[int] = None
     max_results: Optional[int] = None
+    notes: Optional[str] = None  # free text for the LLM only; never used as a filter
+    # Filled only when validating against a vocabulary:
+    corrections: Dict[str, str] = field(default_factory=dict)  # field -> original (misspelt) input
+    suggestions: Dict[str, List[str]] = field(default_factory=dict)  # field -> close known names
 
 
 class PreferenceValidationError(ValueError):
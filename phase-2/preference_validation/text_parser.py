@@ -0,0 +1,184 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .gazetteer import Gazetteer, normalize_text
+from .models import ValidatedPreference
+from .validator import NOTES_MAX_LENGTH, validate_preference
+from .vocabulary import PreferenceVocabulary
+
+# Budget words map to a default price band when no explicit amount is given.
+CHEAP_PRICE_MAX = 500
+UPSCALE_PRICE_MIN = 1500
+HIGHLY_RATED_MIN = 4.0
+POPULAR_MIN_VOTES = 500
+
+_NUMBER = r"\d{1,2}(?:,\d{3})+|\d{2,5}"  # "1,000" as well as "1000"
+_AMOUNT = rf"(?:rs\s*)?({_NUMBER})(?:\s*rs)?"
+_RATING = r"(\d(?:\.\d+)?)"
+
+# (pattern, handler name); earlier patterns claim their span first.
+_RULES: List[Tuple["re.Pattern[str]", str]] = [
+    (re.compile(rf"\b(?:between\s+)?{_AMOUNT}\s*(?:-|to|and)\s*{_AMOUNT}\b"), "price_range"),
+    (
+        re.compile(
+            rf"\b(?:(?:above|over|at least|atleast|min(?:imum)?|>=?)\s*)?{_RATING}\s*\+?\s*"
+            r"(?:stars?|star rating|rating|rated)(?:\s+(?:and above|or (?:more|higher|above)|plus))?\b"
+        ),
+        "rating",
+    ),
+    (
+        re.compile(
+            rf"\b(?:rated|rating)\s+(?:(?:above|over|of|at least|atleast)\s+)?{_RATING}\s*\+?"
+            r"(?:\s+(?:and above|or (?:more|higher|above)|plus))?"
+        ),
+        "rating",
+    ),
+    (
+        re.compile(
+            rf"(?:\b(?:under|below|less than|upto|up to|within|max(?:imum)?|cheaper than|not more than)|<=?)\s*{_AMOUNT}\b"
+            r"(?:\s+for two)?"
+        ),
+        "price_max",
+    ),
+    (
+        re.compile(rf"(?:\b(?:over|above|more than|at least|atleast|min(?:imum)?|from)|>=?)\s*{_AMOUNT}\b(?:\s+for two)?"),
+        "price_min",
+    ),
+    (re.compile(rf"\brs\s*({_NUMBER})\b(?:\s+for two)?|\b({_NUMBER})\s+(?:rs\s+)?for two\b"), "price_max"),
+    (re.compile(r"\b(?:top|best)\s+(\d{1,3})\b|\b(\d{1,3})\s+(?:places|restaurants|options|results|spots)\b"), "max_results"),
+    (re.compile(r"\b(?:cheap|budget|inexpensive|affordable|pocket friendly)\b"), "cheap"),
+    (re.compile(r"\b(?:expensive|upscale|premium|luxury|fancy|high end)\b"), "upscale"),
+    (re.compile(r"\b(?:highly rated|top rated|well rated)\b"), "highly_rated"),
+    (re.compile(r"\b(?:online order(?:ing)?|order online|home delivery|delivers)\b"), "online_order"),
+    (re.compile(r"\b(?:table booking|book(?:ing)? a table|book table|reservations?|reserve a table)\b"), "book_table"),
+    (re.compile(r"\b(?:popular|well known|crowd favou?rite)\b"), "popular"),
+]
+
+# Connective words that carry no preference once the rules above have run.
+STOPWORDS = frozenset(
+    """
+    a an and any at around best but by can close find food for from get good i im in is
+    looking me my near nearby of on or place places please restaurant restaurants
+    serving show some spot spots that the to want where with
+    """.split()
+)
+
+
+@dataclass
+class ParsedText:
+    """Outcome of parsing a free-text request."""
+
+    preference: ValidatedPreference
+    extracted: Dict[str, Any] = field(default_factory=dict)
+    leftover: Optional[str] = None  # words no rule understood
+    ambiguous: List[str] = field(default_factory=list)  # extra matches the preference cannot hold
+
+    @property
+    def needs_llm(self) -> bool:
+        """True when part of the request could only be interpreted by the LLM."""
+        return bool(self.leftover or self.ambiguous)
+
+
+def _first_group(match: "re.Match[str]") -> Optional[str]:
+    return next((g for g in match.groups() if g is not None), None)
+
+
+def _amount(text: str) -> int:
+    return int(text.replace(",", ""))
+
+
+def _extract(text: str, gazetteer: Optional[Gazetteer]) -> Tuple[Dict[str, Any], List[str], str]:
+    raw: Dict[str, Any] = {}
+    ambiguous: List[str] = []
+    consumed = [False] * len(text)
+
+    def claim(start: int, end: int) -> bool:
+        if any(consumed[start:end]):
+            return False
+        consumed[start:end] = [True] * (end - start)
+        return True
+
+    flags = set()
+    for pattern, kind in _RULES:
+        for m in pattern.finditer(text):
+            if not claim(m.start(), m.end()):
+                continue
+            if kind == "price_range":
+                lo, hi = sorted((_amount(m.group(1)), _amount(m.group(2))))
+                raw.setdefault("price_min", lo)
+                raw.setdefault("price_max", hi)
+            elif kind == "rating":
+                value = float(_first_group(m))
+                if value <= 5.0:
+                    raw.setdefault("min_rating", value)
+                else:
+                    ambiguous.append(m.group(0))
+            elif kind in ("price_max", "price_min", "max_results"):
+                raw.setdefault(kind, _amount(_first_group(m)))
+            else:
+                flags.add(kind)
+
+    if "cheap" in flags:
+        raw.setdefault("price_max", CHEAP_PRICE_MAX)
+    if "upscale" in flags:
+        raw.setdefault("price_min", UPSCALE_PRICE_MIN)
+    if "highly_rated" in flags:
+        raw.setdefault("min_rating", HIGHLY_RATED_MIN)
+    if "popular" in flags:
+        raw.setdefault("min_votes", POPULAR_MIN_VOTES)
+    for flag in ("online_order", "book_table"):
+        if flag in flags:
+            raw.setdefault(flag, True)
+
+    if gazetteer is not None:
+        for gm in gazetteer.find(text):
+            if not claim(gm.start, gm.end):
+                continue
+            if gm.field in raw:
+                ambiguous.append(gm.value)
+            else:
+                raw[gm.field] = gm.value
+
+    leftover_chars = [" " if used else ch for ch, used in zip(text, consumed)]
+    words = [w for w in "".join(leftover_chars).split() if w not in STOPWORDS]
+    return raw, ambiguous, " ".join(words)
+
+
+def parse_preference_text(
+    text: str,
+    gazetteer: Optional[Gazetteer] = None,
+    overrides: Optional[Mapping[str, Any]] = None,
+    vocabulary: Optional[PreferenceVocabulary] = None,
+) -> ParsedText:
+    """
+    Turn free text such as "cheap north indian near indiranagar above 4 stars"
+    into a ValidatedPreference, without calling an LLM.
+
+    Prices, ratings and yes/no flags come from regex rules; localities,
+    cities, cuisines and rest types from the gazetteer. Structured
+    ``overrides`` win over anything parsed; ``vocabulary`` is passed on to
+    ``validate_preference``.
+    Words no rule understood are returned as ``leftover`` and also passed
+    through ``notes`` so only the LLM ranking step has to interpret them.
+
+    Raises PreferenceValidationError if the combined input is invalid.
+    """
+    raw, ambiguous, leftover = _extract(normalize_text(text), gazetteer)
+    if "price_min" in raw and "price_max" in raw and raw["price_min"] > raw["price_max"]:
+        ambiguous.append(f"price {raw.pop('price_min')}+")
+
+    extracted = dict(raw)
+    if overrides:
+        raw.update({k: v for k, v in overrides.items() if v is not None})
+
+    notes = " ".join(x for x in [leftover, *ambiguous] if x)[:NOTES_MAX_LENGTH]
+    if notes and "notes" not in raw:
+        raw["notes"] = notes
+
+    return ParsedText(
+        preference=validate_preference(raw, vocabulary=vocabulary),
+        extracted=extracted,
+        leftover=leftover or None,
+        ambiguous=ambiguous,
+    )
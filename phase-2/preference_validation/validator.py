@@ -1,6 +1,12 @@
 from typing import Any, Mapping, Dict, List, Optional
 
 from .models import ValidatedPreference, PreferenceValidationError
+from .vocabulary import VOCABULARY_FIELDS, PreferenceVocabulary
+
+NOTES_MAX_LENGTH = 300
+
+_TRUE = {"true", "yes", "y", "1"}
+_FALSE = {"false", "no", "n", "0"}
 
 
 def _as_str(value: Any) -> Optional[str]:
@@ -23,6 +29,18 @@ def _parse_int(field: str, value: Any, errors: List[str], minimum: Optional[int]
     return ivalue
 
 
+def _parse_bool(field: str, value: Any, errors: List[str]) -> Optional[bool]:
+    if value is None or isinstance(value, bool):
+        return value
+    s = str(value).strip().lower()
+    if s in _TRUE:
+        return True
+    if s in _FALSE:
+        return False
+    errors.append(f"{field} must be true or false")
+    return None
+
+
 def _parse_float(field: str, value: Any, errors: List[str], minimum: Optional[float] = None, maximum: Optional[float] = None) -> Optional[float]:
     if value is None:
         return None
@@ -38,11 +56,17 @@ def _parse_float(field: str, value: Any, errors: List[str], minimum: Optional[fl
     return fvalue
 
 
-def validate_preference(raw: Mapping[str, Any]) -> ValidatedPreference:
+def validate_preference(
+    raw: Mapping[str, Any],
+    vocabulary: Optional[PreferenceVocabulary] = None,
+) -> ValidatedPreference:
     """
     Validate a raw preference mapping and return a normalized ValidatedPreference.
 
-    Unknown keys result in validation errors.
+    Unknown keys result in validation errors. With a ``vocabulary``, city,
+    location and cuisine are canonicalized against the known names: typos
+    with one clear fuzzy match are corrected (see ``corrections``), others
+    are kept with ``suggestions``.
     """
     allowed_keys = {
         "city",
@@ -51,7 +75,12 @@ def validate_preference(raw: Mapping[str, Any]) -> ValidatedPreference:
         "price_max",
         "min_rating",
         "cuisine",
+        "online_order",
+        "book_table",
+        "rest_type",
+        "min_votes",
         "max_results",
+        "notes",
     }
 
     errors: List[str] = []
@@ -65,6 +94,10 @@ def validate_preference(raw: Mapping[str, Any]) -> ValidatedPreference:
     city = _as_str(raw.get("city"))
     location = _as_str(raw.get("location"))
     cuisine = _as_str(raw.get("cuisine"))
+    rest_type = _as_str(raw.get("rest_type"))
+    notes = _as_str(raw.get("notes"))
+    if notes is not None and len(notes) > NOTES_MAX_LENGTH:
+        errors.append(f"notes must be at most {NOTES_MAX_LENGTH} characters")
 
     # Numeric fields
     price_min = _parse_int("price_min", raw.get("price_min"), errors, minimum=0)
@@ -72,6 +105,12 @@ def validate_preference(raw: Mapping[str, Any]) -> ValidatedPreference:
 
     min_rating = _parse_float("min_rating", raw.get("min_rating"), errors, minimum=0.0, maximum=5.0)
 
+    min_votes = _parse_int("min_votes", raw.get("min_votes"), errors, minimum=0)
+
+    # Yes/no flags
+    online_order = _parse_bool("online_order", raw.get("online_order"), errors)
+    book_table = _parse_bool("book_table", raw.get("book_table"), errors)
+
     max_results = _parse_int("max_results", raw.get("max_results"), errors, minimum=1)
     if max_results is not None and max_results > 100:
         errors.append("max_results must be <= 100")
@@ -83,6 +122,21 @@ def validate_preference(raw: Mapping[str, Any]) -> ValidatedPreference:
     if errors:
         raise PreferenceValidationError(errors)
 
+    strings = {"city": city, "location": location, "cuisine": cuisine}
+    corrections: Dict[str, str] = {}
+    suggestions: Dict[str, List[str]] = {}
+    if vocabulary is not None:
+        for name in VOCABULARY_FIELDS:
+            if strings[name] is None:
+                continue
+            result = vocabulary.canonicalize(name, strings[name])
+            strings[name] = result.value
+            if result.corrected_from is not None:
+                corrections[name] = result.corrected_from
+            if result.suggestions:
+                suggestions[name] = result.suggestions
+        city, location, cuisine = strings["city"], strings["location"], strings["cuisine"]
+
     return ValidatedPreference(
         city=city,
         location=location,
@@ -90,6 +144,13 @@ def validate_preference(raw: Mapping[str, Any]) -> ValidatedPreference:
         price_max=price_max,
         min_rating=min_rating,
         cuisine=cuisine,
+        online_order=online_order,
+        book_table=book_table,
+        rest_type=rest_type,
+        min_votes=min_votes,
         max_results=max_results,
+        notes=notes,
+        corrections=corrections,
+        suggestions=suggestions,
     )
 
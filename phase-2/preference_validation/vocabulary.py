@@ -0,0 +1,121 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Fields that can be canonicalized against the store vocabulary.
+VOCABULARY_FIELDS = ("city", "location", "cuisine")
+
+# A fuzzy match replaces the input only when it is this similar...
+AUTOCORRECT_MIN_SCORE = 0.5
+# ...and this much better than the runner-up; otherwise it is only suggested.
+AUTOCORRECT_MIN_MARGIN = 0.1
+SUGGEST_MIN_SCORE = 0.3
+
+
+def _key(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def trigrams(value: str) -> Set[str]:
+    padded = f"  {_key(value)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Fuzzy lookup over a fixed list of names.
+
+    Each name's trigrams go into an inverted index, so a lookup only scores
+    names sharing at least one trigram with the input (Jaccard similarity).
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = []
+        self._by_key: Dict[str, str] = {}
+        self._grams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for name in names:
+            key = _key(name)
+            if not key or key in self._by_key:
+                continue
+            self._by_key[key] = name
+            grams = trigrams(name)
+            for g in grams:
+                self._postings.setdefault(g, []).append(len(self.names))
+            self.names.append(name)
+            self._grams.append(grams)
+        self._keys = list(self._by_key)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def exact(self, value: str) -> Optional[str]:
+        """Canonical spelling of ``value`` if it is a name (case/space-insensitive)."""
+        return self._by_key.get(_key(value))
+
+    def is_substring(self, value: str) -> bool:
+        """True if ``value`` occurs inside some name, i.e. it already works as a substring filter."""
+        key = _key(value)
+        return any(key in k for k in self._keys)
+
+    def similar(self, value: str, limit: int = 3, min_score: float = SUGGEST_MIN_SCORE) -> List[Tuple[str, float]]:
+        """Up to ``limit`` (name, score) pairs, best first."""
+        grams = trigrams(value)
+        shared = Counter(i for g in grams for i in self._postings.get(g, ()))
+        scored = []
+        for i, common in shared.items():
+            score = common / (len(grams) + len(self._grams[i]) - common)
+            if score >= min_score:
+                scored.append((self.names[i], round(score, 3)))
+        scored.sort(key=lambda p: (-p[1], p[0].lower()))
+        return scored[:limit]
+
+
+@dataclass
+class Canonicalized:
+    value: str
+    corrected_from: Optional[str] = None
+    suggestions: List[str] = field(default_factory=list)
+
+
+class PreferenceVocabulary:
+    """Known cities, localities and cuisines, used to canonicalize preference strings."""
+
+    def __init__(self, indexes: Dict[str, TrigramIndex]):
+        self._indexes = indexes
+
+    @classmethod
+    def from_values(
+        cls,
+        cities: Iterable[str] = (),
+        locations: Iterable[str] = (),
+        cuisines: Iterable[str] = (),
+    ) -> "PreferenceVocabulary":
+        values = dict(zip(VOCABULARY_FIELDS, (cities, locations, cuisines)))
+        return cls({f: TrigramIndex(values[f]) for f in VOCABULARY_FIELDS})
+
+    def index(self, field_name: str) -> TrigramIndex:
+        return self._indexes[field_name]
+
+    def canonicalize(self, field_name: str, value: str) -> Canonicalized:
+        """
+        Exact names get their canonical spelling; values that already match as
+        a substring are kept; anything else is corrected when one fuzzy match
+        clearly wins, and otherwise kept with suggestions.
+        """
+        index = self._indexes.get(field_name)
+        if index is None or not len(index):
+            return Canonicalized(value)
+        exact = index.exact(value)
+        if exact is not None:
+            return Canonicalized(exact)
+        if index.is_substring(value):
+            return Canonicalized(value)
+
+        matches = index.similar(value)
+        if matches:
+            best, score = matches[0]
+            runner_up = matches[1][1] if len(matches) > 1 else 0.0
+            if score >= AUTOCORRECT_MIN_SCORE and score - runner_up >= AUTOCORRECT_MIN_MARGIN:
+                return Canonicalized(best, corrected_from=value)
+        return Canonicalized(value, suggestions=[name for name, _ in matches])
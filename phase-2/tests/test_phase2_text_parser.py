@@ -0,0 +1,106 @@
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure the phase-2 package is importable when running tests directly.
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from preference_validation import (  # type: ignore  # imported via sys.path tweak
+    Gazetteer,
+    PreferenceValidationError,
+    parse_preference_text,
+)
+from preference_validation.gazetteer import AhoCorasick  # type: ignore
+
+
+@pytest.fixture
+def gazetteer():
+    return Gazetteer.from_vocabulary(
+        locations=["Indiranagar", "Koramangala 5th Block", "BTM"],
+        cities=["Indiranagar", "Koramangala"],
+        cuisines=["North Indian", "South Indian", "Chinese", "Pizza", "Cafe"],
+        rest_types=["Casual Dining", "Cafe", "Quick Bites"],
+    )
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    ac = AhoCorasick(["he", "she", "his", "hers"])
+    found = sorted((s, e, ac.patterns[p]) for s, e, p in ac.iter_matches("ushers"))
+    assert found == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_parses_example_query(gazetteer):
+    parsed = parse_preference_text("cheap north indian near indiranagar above 4 stars under 800", gazetteer)
+    pref = parsed.preference
+    assert pref.cuisine == "North Indian"
+    assert pref.location == "Indiranagar"
+    assert pref.min_rating == pytest.approx(4.0)
+    # An explicit amount wins over the "cheap" default.
+    assert pref.price_max == 800
+    assert parsed.leftover is None
+    assert not parsed.needs_llm
+
+
+def test_longest_match_and_word_boundaries(gazetteer):
+    parsed = parse_preference_text("South-Indian in Koramangala 5th block", gazetteer)
+    assert parsed.preference.cuisine == "South Indian"
+    assert parsed.preference.location == "Koramangala 5th Block"
+    # "pizzas" is not the whole word "pizza"
+    assert parse_preference_text("pizzas", gazetteer).preference.cuisine is None
+
+
+def test_price_range_rating_and_count(gazetteer):
+    parsed = parse_preference_text("top 3 chinese between ₹300 and 700 rated 4.5+", gazetteer)
+    pref = parsed.preference
+    assert (pref.price_min, pref.price_max) == (300, 700)
+    assert pref.min_rating == pytest.approx(4.5)
+    assert pref.max_results == 3
+    assert pref.cuisine == "Chinese"
+
+
+@pytest.mark.parametrize(
+    "text, prices",
+    [
+        ("chinese under 1,000 in indiranagar", (None, 1000)),
+        ("chinese between rs 1,200 and 2,500", (1200, 2500)),
+        ("chinese ₹1,500 for two", (None, 1500)),
+    ],
+)
+def test_amounts_with_thousands_separators(gazetteer, text, prices):
+    parsed = parse_preference_text(text, gazetteer)
+    assert (parsed.preference.price_min, parsed.preference.price_max) == prices
+    assert parsed.leftover is None
+
+
+def test_leftovers_and_extra_matches_go_to_notes(gazetteer):
+    parsed = parse_preference_text("chinese or pizza in BTM with live music", gazetteer)
+    assert parsed.preference.cuisine == "Chinese"
+    assert parsed.ambiguous == ["Pizza"]
+    assert parsed.leftover == "live music"
+    assert parsed.needs_llm
+    assert parsed.preference.notes == "live music Pizza"
+
+
+def test_rest_type_and_flags(gazetteer):
+    parsed = parse_preference_text("popular quick bites in BTM where I can book a table and order online", gazetteer)
+    pref = parsed.preference
+    assert pref.rest_type == "Quick Bites"
+    assert pref.book_table is True
+    assert pref.online_order is True
+    assert pref.min_votes == 500
+    assert not parsed.needs_llm
+
+
+def test_overrides_win_over_parsed_values(gazetteer):
+    parsed = parse_preference_text("cheap chinese", gazetteer, overrides={"price_max": 1200, "max_results": 2})
+    assert parsed.preference.price_max == 1200
+    assert parsed.preference.max_results == 2
+    assert parsed.extracted["price_max"] == 500
+
+
+def test_invalid_overrides_raise_validation_error(gazetteer):
+    with pytest.raises(PreferenceValidationError):
+        parse_preference_text("chinese", gazetteer, overrides={"min_rating": 9})
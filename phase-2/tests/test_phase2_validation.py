@@ -11,6 +11,7 @@ sys.path.insert(0, str(ROOT))
 from preference_validation import (  # type: ignore  # imported via sys.path tweak
     ValidatedPreference,
     PreferenceValidationError,
+    PreferenceVocabulary,
     validate_preference,
 )
 
@@ -86,3 +87,58 @@ def test_unknown_fields_raise_error():
         validate_preference(raw)
     assert "Unknown fields" in str(exc.value)
 
+
+
+def test_notes_are_trimmed_and_length_capped():
+    pref = validate_preference({"notes": "  quiet, live music  "})
+    assert pref.notes == "quiet, live music"
+
+    with pytest.raises(PreferenceValidationError) as exc:
+        validate_preference({"notes": "x" * 301})
+    assert "notes must be at most 300 characters" in str(exc.value)
+
+
+def test_flags_rest_type_and_min_votes():
+    pref = validate_preference(
+        {"online_order": "yes", "book_table": False, "rest_type": " Cafe ", "min_votes": "50"}
+    )
+    assert pref.online_order is True
+    assert pref.book_table is False
+    assert pref.rest_type == "Cafe"
+    assert pref.min_votes == 50
+
+    with pytest.raises(PreferenceValidationError) as exc:
+        validate_preference({"online_order": "maybe", "min_votes": -1})
+    assert "online_order must be true or false" in str(exc.value)
+    assert "min_votes must be >= 0" in str(exc.value)
+
+
+VOCABULARY = PreferenceVocabulary.from_values(
+    cities=["Koramangala 5th Block", "Koramangala 6th Block", "Indiranagar"],
+    locations=["Koramangala", "Koramangala 5th Block", "Indiranagar", "BTM"],
+    cuisines=["Chinese", "North Indian", "South Indian", "Italian"],
+)
+
+
+def test_vocabulary_corrects_clear_typos():
+    pref = validate_preference({"location": "Koramangla", "cuisine": "chineese"}, vocabulary=VOCABULARY)
+    assert pref.location == "Koramangala"
+    assert pref.cuisine == "Chinese"
+    assert pref.corrections == {"location": "Koramangla", "cuisine": "chineese"}
+    assert pref.suggestions == {}
+
+
+def test_vocabulary_canonicalizes_case_and_keeps_substrings():
+    pref = validate_preference({"location": "  indiranagar ", "cuisine": "indian"}, vocabulary=VOCABULARY)
+    assert pref.location == "Indiranagar"
+    assert pref.cuisine == "indian"  # still a valid substring filter
+    assert pref.corrections == {}
+
+
+def test_vocabulary_only_suggests_when_ambiguous():
+    pref = validate_preference({"city": "Koramangala 7th Block"}, vocabulary=VOCABULARY)
+    assert pref.city == "Koramangala 7th Block"
+    assert pref.suggestions["city"][:2] == ["Koramangala 5th Block", "Koramangala 6th Block"]
+
+    untouched = validate_preference({"location": "Koramangla"})
+    assert untouched.location == "Koramangla"
@@ -3,14 +3,48 @@ from .models import (
     RecommendSettings,
     Recommendation,
 )
+from .http_pool import HTTPConnectionPool
 from .xai_client import XAIChatCompletionsClient
-from .recommender import recommend_with_explanations
+from .async_client import AsyncLLMClient, AsyncXAIChatCompletionsClient, ThreadedAsyncLLMClient
+from .cache import CachingLLMClient, ResponseCache
+from .single_flight import SingleFlight, SingleFlightLLMClient
+from .circuit_breaker import CircuitBreaker, CircuitBreakerLLMClient, CircuitOpenError
+from .routing import Backend, RoutingLLMClient
+from .cascade import CascadeTracker
+from .local_ranker import ScoringWeights, rank_locally
+from .distill import DistilledRanker, RankingLog, evaluate_ranker, train_ranker
+from .recommender import recommend_with_explanations, recommend_with_explanations_async, stream_recommendations
+from .snippets import SnippetStore, precompute_snippets
 
 __all__ = [
     "CandidateRestaurant",
     "Recommendation",
     "RecommendSettings",
+    "HTTPConnectionPool",
     "XAIChatCompletionsClient",
+    "AsyncLLMClient",
+    "AsyncXAIChatCompletionsClient",
+    "ThreadedAsyncLLMClient",
+    "CachingLLMClient",
+    "ResponseCache",
+    "SingleFlight",
+    "SingleFlightLLMClient",
+    "CircuitBreaker",
+    "CircuitBreakerLLMClient",
+    "CircuitOpenError",
+    "Backend",
+    "RoutingLLMClient",
+    "CascadeTracker",
+    "ScoringWeights",
+    "rank_locally",
+    "DistilledRanker",
+    "RankingLog",
+    "evaluate_ranker",
+    "train_ranker",
     "recommend_with_explanations",
+    "recommend_with_explanations_async",
+    "stream_recommendations",
+    "SnippetStore",
+    "precompute_snippets",
 ]
 
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import ssl
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .models import LLMError
+from .xai_client import LLMClient, client_ready
+
+# Default cap on calls one client keeps in flight at once.
+DEFAULT_MAX_CONCURRENCY = 64
+
+
+class AsyncLLMClient:
+    async def agenerate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        raise NotImplementedError
+
+    def ready(self) -> bool:
+        """See ``LLMClient.ready``."""
+        return True
+
+
+class _Limiter:
+    """A semaphore per event loop, so one client can be shared by several ``asyncio.run`` calls."""
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.limit = limit
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._semaphores.get(id(loop))
+        if sem is None:
+            # Loops are short-lived in tests and scripts; keep only the current one.
+            self._semaphores = {id(loop): asyncio.Semaphore(self.limit)}
+            sem = self._semaphores[id(loop)]
+        return sem
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        return b"".join(chunks)
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"]))
+    return await reader.read()
+
+
+async def post_json(url: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, bytes]:
+    """POST ``body`` with asyncio streams and return (status, response body)."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Unsupported URL: {url}")
+    https = parts.scheme == "https"
+    port = parts.port or (443 if https else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    host = parts.hostname if parts.port is None else f"{parts.hostname}:{port}"
+
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, port, ssl=ssl.create_default_context() if https else None
+    )
+    try:
+        lines = [f"POST {path} HTTP/1.1", f"Host: {host}", f"Content-Length: {len(body)}", "Connection: close"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError) as e:
+            raise LLMError(f"Malformed HTTP status line: {status_line!r}") from e
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        return status, await _read_body(reader, response_headers)
+    finally:
+        writer.close()
+        with suppress(Exception):
+            await writer.wait_closed()
+
+
+@dataclass
+class AsyncXAIChatCompletionsClient(AsyncLLMClient):
+    """
+    XAI (Grok) Chat Completions client on asyncio streams.
+
+    Same env and request body as ``XAIChatCompletionsClient``. A call waits
+    on a socket rather than a thread, so one event loop can keep many calls
+    in flight; at most ``max_concurrency`` run at once, the rest queue.
+    """
+
+    api_key: Optional[str] = None
+    base_url: str = "https://api.x.ai/v1"
+    temperature: float = 0.2
+    max_tokens: Optional[int] = None  # cap on generated tokens (see prompting.output_token_budget)
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    _limiter: _Limiter = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._limiter = _Limiter(self.max_concurrency)
+
+    def ready(self) -> bool:
+        return bool(self.api_key or os.environ.get("XAI_API_KEY"))
+
+    async def agenerate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        api_key = self.api_key or os.environ.get("XAI_API_KEY")
+        if not api_key:
+            raise LLMError("XAI_API_KEY is not set")
+
+        base_url = os.environ.get("XAI_BASE_URL", self.base_url).rstrip("/")
+        body: Dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "temperature": self.temperature,
+        }
+        if self.max_tokens is not None:
+            body["max_tokens"] = self.max_tokens
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+
+        async with self._limiter.semaphore():
+            try:
+                status, data = await asyncio.wait_for(
+                    post_json(f"{base_url}/chat/completions", json.dumps(body).encode("utf-8"), headers),
+                    timeout=timeout_s,
+                )
+            except LLMError:
+                raise
+            except asyncio.TimeoutError as e:
+                raise LLMError(f"XAI request timed out after {timeout_s}s") from e
+            except Exception as e:
+                raise LLMError(f"XAI request failed: {e}") from e
+
+        raw = data.decode("utf-8", errors="replace")
+        if status >= 400:
+            raise LLMError(f"XAI HTTP error {status}: {raw}")
+        try:
+            payload = json.loads(raw)
+            return payload["choices"][0]["message"]["content"]
+        except Exception as e:
+            raise LLMError(f"Unexpected XAI response shape: {e}") from e
+
+
+class ThreadedAsyncLLMClient(AsyncLLMClient):
+    """
+    Runs a blocking ``LLMClient`` in worker threads, so cached or fake
+    clients can be used from async code. At most ``max_concurrency`` calls
+    hold a thread at once.
+    """
+
+    def __init__(self, inner: LLMClient, max_concurrency: int = 8):
+        self.inner = inner
+        self.temperature = getattr(inner, "temperature", None)
+        self._limiter = _Limiter(max_concurrency)
+
+    def ready(self) -> bool:
+        return client_ready(self.inner)
+
+    async def agenerate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        async with self._limiter.semaphore():
+            return await asyncio.to_thread(self.inner.generate, model=model, messages=messages, timeout_s=timeout_s)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import concurrent.futures
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Time kept back from a deadline to assemble the fallback and write the response.
+DEADLINE_MARGIN_S = 0.05
+# LLM calls that may go on after their request's deadline; later ones are dropped.
+MAX_BACKGROUND_CALLS = 16
+
+_late_slots = threading.BoundedSemaphore(MAX_BACKGROUND_CALLS)
+
+_END = object()
+
+
+def deadline_after(seconds: Optional[float]) -> Optional[float]:
+    """Absolute ``time.monotonic()`` deadline ``seconds`` from now (None stays None)."""
+    return None if seconds is None else time.monotonic() + seconds
+
+
+def remaining(deadline: float) -> float:
+    """Seconds the caller may still wait for the LLM before serving the fallback."""
+    return max(0.0, deadline - time.monotonic() - DEADLINE_MARGIN_S)
+
+
+def claim_late_slot() -> bool:
+    """Let one call outlive its request; False when ``MAX_BACKGROUND_CALLS`` already do."""
+    return _late_slots.acquire(blocking=False)
+
+
+def release_late_slot() -> None:
+    _late_slots.release()
+
+
+def call_with_deadline(fn: Callable[[], T], deadline: float, on_late: Callable[["Future[T]"], Any]) -> T:
+    """
+    ``fn()`` on a thread of its own, waited for until ``deadline``.
+
+    Past the deadline this raises ``concurrent.futures.TimeoutError``. The call cannot be
+    cancelled, but only ``MAX_BACKGROUND_CALLS`` late calls are followed up:
+    with a free slot, ``on_late`` gets the finished future; without one the
+    result is dropped when it arrives.
+    """
+    future: "Future[T]" = Future()
+
+    def run() -> None:
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="llm-call", daemon=True).start()
+    try:
+        return future.result(timeout=remaining(deadline))
+    except concurrent.futures.TimeoutError:
+        if claim_late_slot():
+
+            def finish(done: "Future[T]") -> None:
+                try:
+                    on_late(done)
+                finally:
+                    release_late_slot()
+
+            future.add_done_callback(finish)
+        raise
+
+
+class BackgroundStream:
+    """
+    Reads a text stream on a thread of its own, so the reader can stop
+    waiting at a deadline without cancelling the call.
+
+    ``read(deadline)`` yields chunks until the stream ends or the deadline
+    passes (``TimeoutError``). After a timeout, if a late slot is free (see
+    ``claim_late_slot``), the thread reads the stream to its end and hands
+    the whole text to ``on_complete``; otherwise, or when the reader is
+    closed before that, the thread stops after its current chunk.
+    """
+
+    def __init__(self, chunks: Iterator[str], on_complete: Callable[[str], Any]):
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._stop = threading.Event()
+        self._abandoned = threading.Event()  # set while holding a late slot
+        self._lock = threading.Lock()  # orders the end of the stream against abandoning it
+        self._on_complete = on_complete
+        threading.Thread(target=self._run, args=(chunks,), name="llm-stream", daemon=True).start()
+
+    def _run(self, chunks: Iterator[str]) -> None:
+        text = []
+        try:
+            for chunk in chunks:
+                text.append(chunk)
+                self._queue.put(chunk)
+                if self._stop.is_set():
+                    break
+            else:
+                with self._lock:
+                    self._queue.put(_END)
+                    abandoned = self._abandoned.is_set()
+                if abandoned:
+                    self._on_complete("".join(text))
+        except Exception as e:
+            self._queue.put(e)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            with self._lock:
+                if self._abandoned.is_set():
+                    release_late_slot()
+
+    def read(self, deadline: float) -> Iterator[str]:
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=remaining(deadline))
+                except queue.Empty:
+                    with self._lock:
+                        if self._queue.empty():
+                            if claim_late_slot():
+                                self._abandoned.set()
+                            raise TimeoutError("Deadline passed while streaming") from None
+                    continue
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not self._abandoned.is_set():
+                self._stop.set()
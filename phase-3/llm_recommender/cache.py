@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .parser import _extract_json_array
+from .xai_client import LLMClient, client_ready
+
+
+def cache_key(model: str, temperature: Optional[float], messages: List[Dict[str, str]]) -> str:
+    """Stable key for one completion request: model, temperature and a hash of the messages."""
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_complete_json_array(text: str) -> bool:
+    """True if ``text`` holds a whole, non-empty JSON array (prose around it is fine)."""
+    try:
+        data = json.loads(_extract_json_array(text))
+    except ValueError:
+        return False
+    return isinstance(data, list) and len(data) > 0
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    memory_entries: int
+    disk_entries: int
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "memory_entries": self.memory_entries,
+            "disk_entries": self.disk_entries,
+        }
+
+
+class ResponseCache:
+    """
+    Two-tier cache of raw LLM responses.
+
+    An in-memory LRU answers repeat prompts in microseconds; an optional
+    SQLite file (``path``) keeps responses across restarts. Entries older
+    than ``ttl_s`` are ignored and removed, and each tier is trimmed to its
+    size limit by least recent use. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 10_000,
+        ttl_s: float = 24 * 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl_s:
+                    self._memory.move_to_end(key)
+                    self._memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if now - created_at <= self.ttl_s:
+                        self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._remember(key, created_at, value)
+                        self._disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+            self._misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                excess = self._disk_count() - self.max_disk_entries
+                if excess > 0:
+                    self._db.execute(
+                        "DELETE FROM responses WHERE key IN"
+                        " (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                        (excess,),
+                    )
+
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_count(self) -> int:
+        if self._db is None:
+            return 0
+        return int(self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0])
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                memory_hits=self._memory_hits,
+                disk_hits=self._disk_hits,
+                misses=self._misses,
+                memory_entries=len(self._memory),
+                disk_entries=self._disk_count(),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class CachingLLMClient(LLMClient):
+    """
+    LLMClient wrapper that answers repeated prompts from a ResponseCache.
+
+    The key includes the wrapped client's ``temperature`` (if it has one), so
+    sampling settings never share entries. Errors are not cached, and
+    neither is an answer ``validate`` rejects (by default anything but a
+    complete JSON array: refusals, prose, output cut off by ``max_tokens``),
+    so one bad completion is retried instead of served for the whole TTL.
+    ``validate=None`` caches every answer.
+    """
+
+    def __init__(
+        self,
+        inner: LLMClient,
+        cache: Optional[ResponseCache] = None,
+        validate: Optional[Callable[[str], bool]] = is_complete_json_array,
+    ):
+        self.inner = inner
+        self.cache = cache or ResponseCache()
+        self.validate = validate
+
+    def _store(self, key: str, raw: str) -> None:
+        if self.validate is None or self.validate(raw):
+            self.cache.put(key, raw)
+
+    def ready(self) -> bool:
+        return client_ready(self.inner)
+
+    def generate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        key = cache_key(model, getattr(self.inner, "temperature", None), messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        raw = self.inner.generate(model=model, messages=messages, timeout_s=timeout_s)
+        self._store(key, raw)
+        return raw
+
+    def stream(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> Iterator[str]:
+        """A hit is yielded whole; a miss is passed through and cached once it completes."""
+        key = cache_key(model, getattr(self.inner, "temperature", None), messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        parts: List[str] = []
+        for piece in self.inner.stream(model=model, messages=messages, timeout_s=timeout_s):
+            parts.append(piece)
+            yield piece
+        self._store(key, "".join(parts))
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# Why an answer from the fast model was not served (see recommender._escalation_reason).
+ESCALATION_REASONS = ("error", "unparseable", "too_few", "invalid")
+# Longest fast-model explanation accepted; the prompt asks for at most 20 words.
+FAST_MAX_EXPLANATION_WORDS = 40
+
+
+@dataclass(frozen=True)
+class CascadeStats:
+    requests: int
+    fast_served: int
+    escalated: Dict[str, int]  # by reason
+    avg_fast_ms: Optional[float]  # fast-model calls, served or not
+    avg_large_ms: Optional[float]  # large-model calls after an escalation
+    latency_saved_ms: Optional[float]  # net, versus sending everything to the large model
+
+    @property
+    def fast_share(self) -> float:
+        return self.fast_served / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value, 1)
+
+        return {
+            "requests": self.requests,
+            "fast_served": self.fast_served,
+            "fast_share": round(self.fast_share, 4),
+            "escalated": dict(self.escalated),
+            "avg_fast_ms": ms(self.avg_fast_ms),
+            "avg_large_ms": ms(self.avg_large_ms),
+            "latency_saved_ms": ms(self.latency_saved_ms),
+        }
+
+
+class CascadeTracker:
+    """
+    Counts how cascade requests were served. Thread-safe.
+
+    Latency saved is estimated as if every request had gone straight to the
+    large model at its observed average: each fast-served request saves
+    that average minus its own time, and each escalation loses the time
+    spent on the fast model first.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._fast_served = 0
+        self._escalated = {reason: 0 for reason in ESCALATION_REASONS}
+        self._fast_s = 0.0  # all fast-model time
+        self._fast_calls = 0
+        self._served_fast_s = 0.0  # fast-model time of served requests
+        self._large_s = 0.0
+        self._large_calls = 0
+
+    def record_fast(self, fast_s: float) -> None:
+        with self._lock:
+            self._fast_served += 1
+            self._fast_calls += 1
+            self._fast_s += fast_s
+            self._served_fast_s += fast_s
+
+    def record_escalation(self, reason: str, fast_s: float, large_s: Optional[float]) -> None:
+        """``large_s`` is None when the large model failed too."""
+        with self._lock:
+            self._escalated[reason] = self._escalated.get(reason, 0) + 1
+            self._fast_calls += 1
+            self._fast_s += fast_s
+            if large_s is not None:
+                self._large_calls += 1
+                self._large_s += large_s
+
+    def stats(self) -> CascadeStats:
+        with self._lock:
+            escalated = sum(self._escalated.values())
+            avg_large = self._large_s / self._large_calls if self._large_calls else None
+            saved = None
+            if avg_large is not None:
+                wasted = self._fast_s - self._served_fast_s
+                saved = (self._fast_served * avg_large - self._served_fast_s - wasted) * 1000
+            return CascadeStats(
+                requests=self._fast_served + escalated,
+                fast_served=self._fast_served,
+                escalated=dict(self._escalated),
+                avg_fast_ms=self._fast_s / self._fast_calls * 1000 if self._fast_calls else None,
+                avg_large_ms=avg_large * 1000 if avg_large is not None else None,
+                latency_saved_ms=saved,
+            )
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from .async_client import AsyncLLMClient
+from .models import LLMError
+from .xai_client import LLMClient, client_ready, stream_text
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(LLMError):
+    """Raised instead of calling the provider while the circuit is open."""
+
+
+@dataclass(frozen=True)
+class CircuitBreakerStats:
+    state: str
+    failure_rate: float  # over the calls in the current window
+    window_calls: int
+    rejected: int  # calls skipped while open
+    opened: int  # times the circuit has opened
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate, 4),
+            "window_calls": self.window_calls,
+            "rejected": self.rejected,
+            "opened": self.opened,
+        }
+
+
+@dataclass(frozen=True)
+class CallPermit:
+    """What ``CircuitBreaker.allow`` granted; hand it back to ``record`` or ``release``."""
+
+    probe: bool  # the one half-open call whose outcome decides the circuit
+    generation: int  # times the circuit had opened when the call was let through
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over the outcomes of recent calls.
+
+    Closed: calls go through; the last ``window`` outcomes are kept, and a
+    call that fails or takes longer than ``slow_call_s`` counts as a failure.
+    Once at least ``min_calls`` are in the window and the failure rate
+    reaches ``failure_rate``, the circuit opens.
+
+    Open: calls are rejected without touching the provider. After
+    ``open_s`` one probe call at a time is let through (half-open); its
+    success closes the circuit with a fresh window, its failure opens it
+    again for another ``open_s``. Calls let through before the circuit
+    last opened report into nothing: only the probe's permit decides.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        slow_call_s: float = 10.0,
+        open_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        if min_calls < 1 or window < min_calls:
+            raise ValueError("need 1 <= min_calls <= window")
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_s = slow_call_s
+        self.open_s = open_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True = failed
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._rejected = 0
+        self._opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_s:
+            return HALF_OPEN
+        return self._state
+
+    def ready(self) -> bool:
+        """Whether a call would be let through now; does not reserve a probe."""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self._probing)
+
+    def allow(self) -> Optional[CallPermit]:
+        """
+        Reserve the right to call, or None if the circuit rejects it. Every
+        permit must be passed to ``record`` or ``release``.
+        """
+        with self._lock:
+            state = self.state
+            if state == CLOSED:
+                return CallPermit(probe=False, generation=self._opened)
+            if state == HALF_OPEN and not self._probing:
+                self._state = HALF_OPEN
+                self._probing = True
+                return CallPermit(probe=True, generation=self._opened)
+            self._rejected += 1
+            return None
+
+    def record(self, ok: bool, latency_s: float, permit: Optional[CallPermit] = None) -> None:
+        failed = not ok or latency_s > self.slow_call_s
+        with self._lock:
+            if permit is not None and permit.probe:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                return
+            if self._state != CLOSED or (permit is not None and permit.generation != self._opened):
+                return  # a call that started before the circuit (last) opened
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_calls and self._rate() >= self.failure_rate:
+                self._open()
+
+    def release(self, permit: Optional[CallPermit] = None) -> None:
+        """Give back a permit whose call ended without an outcome (e.g. it was cancelled)."""
+        if permit is None or not permit.probe:
+            return
+        with self._lock:
+            self._probing = False
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._opened += 1
+        self._outcomes.clear()
+
+    def _rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def stats(self) -> CircuitBreakerStats:
+        with self._lock:
+            return CircuitBreakerStats(
+                state=self.state,
+                failure_rate=self._rate(),
+                window_calls=len(self._outcomes),
+                rejected=self._rejected,
+                opened=self._opened,
+            )
+
+
+class CircuitBreakerLLMClient(LLMClient, AsyncLLMClient):
+    """
+    LLMClient wrapper that stops calling a failing or slow provider.
+
+    While the breaker is open, calls raise ``CircuitOpenError`` at once and
+    ``ready()`` is False, so the recommender skips building the prompt and
+    serves its fallback. Put it under ``SingleFlightLLMClient`` so each
+    provider call is counted once. A stream's latency is the time to its
+    first piece.
+    """
+
+    def __init__(self, inner: Any, breaker: Optional[CircuitBreaker] = None):
+        self.inner = inner
+        self.breaker = breaker or CircuitBreaker()
+        self.temperature = getattr(inner, "temperature", None)
+
+    def ready(self) -> bool:
+        return self.breaker.ready() and client_ready(self.inner)
+
+    def _allow(self) -> CallPermit:
+        permit = self.breaker.allow()
+        if permit is None:
+            raise CircuitOpenError("LLM circuit is open")
+        return permit
+
+    def generate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        permit = self._allow()
+        start = time.monotonic()
+        try:
+            raw = self.inner.generate(model=model, messages=messages, timeout_s=timeout_s)
+        except BaseException as e:
+            self._failed(e, start, permit)
+            raise
+        self.breaker.record(True, time.monotonic() - start, permit)
+        return raw
+
+    async def agenerate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        permit = self._allow()
+        start = time.monotonic()
+        try:
+            raw = await self.inner.agenerate(model=model, messages=messages, timeout_s=timeout_s)
+        except BaseException as e:
+            self._failed(e, start, permit)
+            raise
+        self.breaker.record(True, time.monotonic() - start, permit)
+        return raw
+
+    def stream(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> Iterator[str]:
+        permit = self._allow()
+        start = time.monotonic()
+        recorded = False
+        try:
+            for piece in stream_text(self.inner, model=model, messages=messages, timeout_s=timeout_s):
+                if not recorded:
+                    recorded = True
+                    self.breaker.record(True, time.monotonic() - start, permit)
+                yield piece
+        except BaseException as e:
+            if not recorded:
+                recorded = True
+                self._failed(e, start, permit)
+            raise
+        finally:
+            if not recorded:
+                self.breaker.release(permit)
+
+    def _failed(self, error: BaseException, start: float, permit: CallPermit) -> None:
+        if isinstance(error, Exception):
+            self.breaker.record(False, time.monotonic() - start, permit)
+        else:
+            self.breaker.release(permit)  # cancelled or interrupted: no verdict on the provider
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .local_ranker import FEATURES, candidate_features
+from .models import CandidateRestaurant
+from .prompting import _pref_to_dict
+
+RANKER_FORMAT_VERSION = 1
+# Columns of ``ranking_features``: the local scorer's features plus a few raw signals.
+RANKING_FEATURES = FEATURES + ("retrieval", "votes", "online_order", "book_table")
+# Serve the learned order only when its first pick and its cut-off are at least this likely right.
+DEFAULT_MIN_CONFIDENCE = 0.8
+# Votes at which the ``votes`` feature reaches 1 (log scale).
+VOTES_SCALE = 10000
+
+_CANDIDATE_FIELDS = {f.name for f in fields(CandidateRestaurant)}
+
+
+def _flag(value: Any) -> float:
+    return 1.0 if str(value or "").strip().lower() in ("yes", "y", "true", "1") else 0.0
+
+
+def ranking_features(preference: Any, candidates: Sequence[CandidateRestaurant]) -> np.ndarray:
+    """``(len(candidates), len(RANKING_FEATURES))`` matrix, every column in [0, 1]."""
+    n = len(candidates)
+    if not n:
+        return np.zeros((0, len(RANKING_FEATURES)), dtype=np.float64)
+    votes = np.array([max(c.votes or 0, 0) for c in candidates], dtype=np.float64)
+    return np.column_stack(
+        [
+            candidate_features(preference, candidates),
+            1.0 - np.arange(n, dtype=np.float64) / n,
+            np.minimum(np.log1p(votes) / np.log1p(VOTES_SCALE), 1.0),
+            [_flag(c.online_order) for c in candidates],
+            [_flag(c.book_table) for c in candidates],
+        ]
+    )
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30.0, 30.0)))
+
+
+@dataclass(frozen=True)
+class RankingExample:
+    """One logged LLM answer: the candidates it saw and its order as indices into them."""
+
+    preference: Dict[str, Any]
+    candidates: List[CandidateRestaurant]
+    ranking: List[int]  # best first; candidates not listed rank below all listed ones
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "preference": self.preference,
+            "candidates": [{k: v for k, v in asdict(c).items() if v is not None} for c in self.candidates],
+            "ranking": list(self.ranking),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RankingExample":
+        candidates = [CandidateRestaurant(**{k: v for k, v in c.items() if k in _CANDIDATE_FIELDS}) for c in data["candidates"]]
+        ranking = [int(i) for i in data["ranking"]]
+        if not ranking or len(set(ranking)) != len(ranking) or not all(0 <= i < len(candidates) for i in ranking):
+            raise ValueError("ranking must list distinct candidate indices")
+        return cls(preference=dict(data.get("preference") or {}), candidates=candidates, ranking=ranking)
+
+
+class RankingLog:
+    """
+    Append-only JSON Lines log of LLM rankings, the training data for
+    ``train_ranker``. Thread-safe within a process; one line per answer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, preference: Any, candidates: Sequence[CandidateRestaurant], ranking: Sequence[int]) -> None:
+        example = RankingExample(preference=_pref_to_dict(preference), candidates=list(candidates), ranking=list(ranking))
+        line = json.dumps(example.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    @staticmethod
+    def read(path: str) -> List[RankingExample]:
+        """Examples in logged order; malformed lines (e.g. a torn last write) are skipped."""
+        out: List[RankingExample] = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    out.append(RankingExample.from_dict(json.loads(line)))
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return out
+
+
+@dataclass(frozen=True)
+class DistilledRankerStats:
+    served: int  # answered by the learned ranker
+    deferred: int  # not confident enough; left to the LLM
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.served + self.deferred
+        return {"served": self.served, "deferred": self.deferred, "served_share": round(self.served / total, 4) if total else 0.0}
+
+
+class DistilledRanker:
+    """
+    Linear scorer over ``ranking_features`` learned from LLM rankings.
+
+    ``rank`` also returns a confidence: the lower of the pairwise model's
+    probabilities that the first pick beats the second and that the last
+    pick in the top ``desired`` beats the first one left out. The order of
+    near-equal places in the middle matters less than getting the set and
+    the top right. ``decide`` serves the learned order only at
+    ``min_confidence`` or above.
+    """
+
+    def __init__(
+        self,
+        weights: Sequence[float],
+        *,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+        trained_on: int = 0,
+        metrics: Optional[Dict[str, Any]] = None,
+    ):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        if self.weights.shape != (len(RANKING_FEATURES),):
+            raise ValueError(f"Expected {len(RANKING_FEATURES)} weights, got {self.weights.shape}")
+        self.min_confidence = min_confidence
+        self.trained_on = trained_on
+        self.metrics = dict(metrics or {})
+        self._lock = threading.Lock()
+        self._served = 0
+        self._deferred = 0
+
+    def scores(self, preference: Any, candidates: Sequence[CandidateRestaurant]) -> np.ndarray:
+        return ranking_features(preference, candidates) @ self.weights
+
+    def rank(self, preference: Any, candidates: Sequence[CandidateRestaurant], desired: int) -> Tuple[List[int], float]:
+        """Candidate indices best first, and the confidence in the top ``desired``."""
+        scores = self.scores(preference, candidates)
+        order = np.argsort(-scores, kind="stable")
+        if len(order) < 2:
+            return order.tolist(), 1.0
+        cut = min(max(desired, 1), len(order) - 1)
+        gaps = [scores[order[0]] - scores[order[1]], scores[order[cut - 1]] - scores[order[cut]]]
+        return order.tolist(), float(_sigmoid(np.array(gaps)).min())
+
+    def decide(self, preference: Any, candidates: Sequence[CandidateRestaurant], desired: int) -> Optional[List[int]]:
+        """The learned order when confident enough, else None (ask the LLM); counted in ``stats``."""
+        order, confidence = self.rank(preference, candidates, desired)
+        confident = confidence >= self.min_confidence
+        with self._lock:
+            if confident:
+                self._served += 1
+            else:
+                self._deferred += 1
+        return order if confident else None
+
+    def stats(self) -> DistilledRankerStats:
+        with self._lock:
+            return DistilledRankerStats(served=self._served, deferred=self._deferred)
+
+    @classmethod
+    def load(cls, path: str) -> "DistilledRanker":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != RANKER_FORMAT_VERSION:
+            raise ValueError(f"Unsupported ranker file version: {data.get('version')!r}")
+        if tuple(data.get("features") or ()) != RANKING_FEATURES:
+            raise ValueError("Ranker was trained on different features")
+        return cls(
+            data["weights"],
+            min_confidence=data.get("min_confidence", DEFAULT_MIN_CONFIDENCE),
+            trained_on=data.get("trained_on", 0),
+            metrics=data.get("metrics"),
+        )
+
+    def save(self, path: str) -> None:
+        """Write atomically, so a server loading the file never sees half of it."""
+        data = {
+            "version": RANKER_FORMAT_VERSION,
+            "features": list(RANKING_FEATURES),
+            "weights": [round(float(w), 6) for w in self.weights],
+            "min_confidence": self.min_confidence,
+            "trained_on": self.trained_on,
+            "metrics": self.metrics,
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, path)
+
+
+def _pairs(example: RankingExample) -> np.ndarray:
+    """Feature differences (preferred minus other) for every pair the LLM's order implies."""
+    feats = ranking_features(example.preference, example.candidates)
+    listed = set(example.ranking)
+    below = list(example.ranking) + [i for i in range(len(example.candidates)) if i not in listed]
+    rows = [feats[a] - feats[b] for pos, a in enumerate(example.ranking) for b in below[pos + 1 :]]
+    return np.array(rows, dtype=np.float64).reshape(-1, len(RANKING_FEATURES))
+
+
+def train_ranker(
+    examples: Sequence[RankingExample],
+    *,
+    l2: float = 1e-3,
+    epochs: int = 300,
+    learning_rate: float = 1.0,
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+) -> DistilledRanker:
+    """
+    Pairwise logistic regression: P(a above b) = sigmoid(w . (f(a) - f(b))).
+
+    Each pair is used in both directions, so no intercept is needed and a
+    tie scores 0.5. Differences are scaled to unit variance while training
+    (features that barely vary would otherwise need many more steps).
+    Full-batch gradient descent from zero, so training is deterministic.
+    """
+    diffs = [_pairs(e) for e in examples]
+    x = np.vstack(diffs) if diffs else np.zeros((0, len(RANKING_FEATURES)))
+    if not len(x):
+        raise ValueError("No ranked pairs to train on")
+    x = np.vstack([x, -x])
+    y = np.concatenate([np.ones(len(x) // 2), np.zeros(len(x) // 2)])
+    scale = x.std(axis=0)
+    scale[scale == 0] = 1.0
+    x = x / scale
+    w = np.zeros(x.shape[1], dtype=np.float64)
+    for _ in range(epochs):
+        grad = x.T @ (_sigmoid(x @ w) - y) / len(x) + l2 * w
+        w -= learning_rate * grad
+    return DistilledRanker(w / scale, min_confidence=min_confidence, trained_on=len(examples))
+
+
+def split_examples(examples: Sequence[RankingExample], holdout: float = 0.2) -> Tuple[List[RankingExample], List[RankingExample]]:
+    """(train, holdout): the last ``holdout`` share is held out, so the evaluation runs on later traffic."""
+    cut = len(examples) - int(round(len(examples) * holdout))
+    return list(examples[:cut]), list(examples[cut:])
+
+
+@dataclass(frozen=True)
+class RankerEvaluation:
+    examples: int
+    top1_agreement: float  # learned first pick is the LLM's first pick
+    overlap_at_k: float  # share of the LLM's k picks in the learned top k
+    pairwise_accuracy: float  # LLM-implied pairs ordered the same way
+    coverage: float  # share confident enough to skip the LLM
+    confident_top1_agreement: Optional[float]  # top1_agreement on those
+    confident_overlap_at_k: Optional[float]  # overlap_at_k on those
+    retrieval_top1_agreement: float  # baseline: retrieval order's first pick
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: (round(v, 4) if isinstance(v, float) else v) for k, v in asdict(self).items()}
+
+
+def evaluate_ranker(ranker: DistilledRanker, examples: Sequence[RankingExample]) -> RankerEvaluation:
+    """Offline agreement of ``ranker`` with the logged LLM rankings."""
+    top1 = overlap = pairs_right = pairs = retrieval_top1 = 0.0
+    confident: List[Tuple[bool, float]] = []  # (top-1 agrees, overlap) of confident examples
+    for e in examples:
+        k = len(e.ranking)
+        order, confidence = ranker.rank(e.preference, e.candidates, k)
+        first = order[0] == e.ranking[0]
+        top1 += first
+        retrieval_top1 += e.ranking[0] == 0
+        hit = len(set(order[:k]) & set(e.ranking)) / k
+        overlap += hit
+        if confidence >= ranker.min_confidence:
+            confident.append((first, hit))
+        diffs = _pairs(e)
+        pairs += len(diffs)
+        pairs_right += float((diffs @ ranker.weights > 0).sum())
+    n = len(examples)
+    return RankerEvaluation(
+        examples=n,
+        top1_agreement=top1 / n if n else 0.0,
+        overlap_at_k=overlap / n if n else 0.0,
+        pairwise_accuracy=pairs_right / pairs if pairs else 0.0,
+        coverage=len(confident) / n if n else 0.0,
+        confident_top1_agreement=sum(f for f, _ in confident) / len(confident) if confident else None,
+        confident_overlap_at_k=sum(h for _, h in confident) / len(confident) if confident else None,
+        retrieval_top1_agreement=retrieval_top1 / n if n else 0.0,
+    )
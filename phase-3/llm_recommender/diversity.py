@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .models import CandidateRestaurant
+
+# Upper bounds (exclusive) of the cost-for-two bands used as a similarity feature.
+COST_BAND_EDGES = (300, 500, 800, 1200, 2000)
+
+# Relative weight of each feature group in the candidate-candidate similarity.
+# Branches of one chain share a name, so that group dominates.
+FEATURE_WEIGHTS: Dict[str, float] = {
+    "name": 3.0,
+    "location": 1.0,
+    "cuisine": 1.0,
+    "rest_type": 0.5,
+    "cost": 0.5,
+}
+
+
+def _split(value: object) -> List[str]:
+    if not value:
+        return []
+    return [t.strip().lower() for t in str(value).split(",") if t.strip()]
+
+
+def _features(c: CandidateRestaurant) -> Dict[str, float]:
+    feats: Dict[str, float] = {"name:" + " ".join(c.name.lower().split()): FEATURE_WEIGHTS["name"]}
+    if c.location:
+        feats["location:" + c.location.strip().lower()] = FEATURE_WEIGHTS["location"]
+    for cuisine in _split(c.cuisines):
+        feats["cuisine:" + cuisine] = FEATURE_WEIGHTS["cuisine"]
+    for rest_type in _split(c.rest_type):
+        feats["rest_type:" + rest_type] = FEATURE_WEIGHTS["rest_type"]
+    if c.cost_numeric is not None:
+        feats[f"cost:{int(np.searchsorted(COST_BAND_EDGES, c.cost_numeric, side='right'))}"] = FEATURE_WEIGHTS["cost"]
+    return feats
+
+
+def similarity_matrix(candidates: Sequence[CandidateRestaurant]) -> np.ndarray:
+    """Cosine similarity between candidates over weighted one-hot features."""
+    vocab: Dict[str, int] = {}
+    rows = [_features(c) for c in candidates]
+    for feats in rows:
+        for key in feats:
+            vocab.setdefault(key, len(vocab))
+
+    matrix = np.zeros((len(rows), max(1, len(vocab))), dtype=np.float64)
+    for i, feats in enumerate(rows):
+        for key, weight in feats.items():
+            matrix[i, vocab[key]] = weight
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix @ matrix.T
+
+
+def select_diverse(
+    candidates: Sequence[CandidateRestaurant],
+    k: int,
+    lambda_: float = 0.5,
+) -> List[CandidateRestaurant]:
+    """
+    Pick ``k`` candidates with Maximal Marginal Relevance.
+
+    Input order is treated as relevance (best first). Each step takes the
+    candidate maximising ``lambda_ * relevance - (1 - lambda_) * max similarity``
+    to those already picked, so chain branches and near-identical places in one
+    locality stop crowding the prompt. The result keeps the input order, so
+    retrieval-order fallbacks are unaffected.
+    """
+    n = len(candidates)
+    if k >= n:
+        return list(candidates)
+    if k <= 0:
+        return []
+
+    sims = similarity_matrix(candidates)
+    relevance = 1.0 - np.arange(n, dtype=np.float64) / n
+    max_sim = np.zeros(n, dtype=np.float64)
+    available = np.ones(n, dtype=bool)
+
+    picked: List[int] = []
+    for _ in range(k):
+        score = lambda_ * relevance - (1.0 - lambda_) * max_sim
+        score[~available] = -np.inf
+        best = int(np.argmax(score))
+        picked.append(best)
+        available[best] = False
+        np.maximum(max_sim, sims[best], out=max_sim)
+
+    return [candidates[i] for i in sorted(picked)]
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import http.client
+import select
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterator, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Errors that mean a reused keep-alive socket was closed by the peer.
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+_HostKey = Tuple[str, str, int]
+
+
+@dataclass
+class PoolStats:
+    created: int = 0
+    reused: int = 0
+    discarded: int = 0
+
+
+class _HostPool:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.idle: Deque[http.client.HTTPConnection] = deque()
+        self.slots = threading.BoundedSemaphore(limit)  # one per in-flight request
+        self.open = 0  # live connections, idle or in use
+
+
+def _host_key(url: str) -> Tuple[_HostKey, str]:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Unsupported URL: {url}")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    return (parts.scheme, parts.hostname, port), path
+
+
+def _is_dead(conn: http.client.HTTPConnection) -> bool:
+    """An idle keep-alive socket that is readable has been closed (or sent junk) by the server."""
+    sock = conn.sock
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class HTTPConnectionPool:
+    """
+    Keep-alive connections reused across requests, per (scheme, host, port).
+
+    At most ``max_per_host`` connections per host exist at once; callers
+    beyond that wait for one to be returned. Idle sockets the server has
+    closed are discarded on checkout, and a request that fails on a reused
+    socket is retried once on a fresh one. Thread-safe.
+    """
+
+    def __init__(self, max_per_host: int = 4, timeout_s: float = 20.0):
+        self.max_per_host = max_per_host
+        self.timeout_s = timeout_s
+        self.stats = PoolStats()
+        self._lock = threading.Lock()
+        self._hosts: Dict[_HostKey, _HostPool] = {}
+
+    def _host(self, key: _HostKey) -> _HostPool:
+        with self._lock:
+            pool = self._hosts.get(key)
+            if pool is None:
+                pool = self._hosts[key] = _HostPool(self.max_per_host)
+            return pool
+
+    def _new_connection(self, key: _HostKey, pool: _HostPool, timeout_s: float) -> http.client.HTTPConnection:
+        """Connect, counting the connection against the host's limit (the caller has reserved room)."""
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = cls(host, port, timeout=timeout_s)
+        try:
+            conn.connect()
+        except BaseException:
+            with self._lock:
+                pool.open -= 1
+            raise
+        with self._lock:
+            self.stats.created += 1
+        return conn
+
+    def _discard(self, pool: _HostPool, conn: http.client.HTTPConnection) -> None:
+        conn.close()
+        with self._lock:
+            pool.open -= 1
+            self.stats.discarded += 1
+
+    def _checkout(self, key: _HostKey, pool: _HostPool, timeout_s: float) -> Tuple[http.client.HTTPConnection, bool]:
+        while True:
+            with self._lock:
+                conn = pool.idle.pop() if pool.idle else None
+                if conn is None:
+                    pool.open += 1
+            if conn is None:
+                return self._new_connection(key, pool, timeout_s), False
+            if _is_dead(conn):
+                self._discard(pool, conn)
+                continue
+            conn.timeout = timeout_s
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout_s)
+            with self._lock:
+                self.stats.reused += 1
+            return conn, True
+
+    def _checkin(self, pool: _HostPool, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            pool.idle.append(conn)
+
+    def _send(
+        self,
+        key: _HostKey,
+        pool: _HostPool,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Optional[Mapping[str, str]],
+        timeout_s: float,
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send a request and read the response headers; the caller holds a slot."""
+        may_retry = True
+        while True:
+            conn, reused = self._checkout(key, pool, timeout_s)
+            try:
+                conn.request(method, path, body=body, headers=dict(headers or {}))
+                return conn, conn.getresponse()
+            except _STALE_ERRORS:
+                self._discard(pool, conn)
+                if reused and may_retry:
+                    may_retry = False
+                    continue
+                raise
+            except BaseException:
+                self._discard(pool, conn)
+                raise
+
+    def _release(self, pool: _HostPool, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+        """Return a connection whose response has been read to the end."""
+        if resp.will_close:
+            conn.close()
+            with self._lock:
+                pool.open -= 1
+        else:
+            self._checkin(pool, conn)
+
+    def _acquire(self, url: str, timeout_s: Optional[float]) -> Tuple[_HostKey, str, _HostPool, float]:
+        key, path = _host_key(url)
+        pool = self._host(key)
+        timeout_s = self.timeout_s if timeout_s is None else timeout_s
+        if not pool.slots.acquire(timeout=timeout_s):
+            raise TimeoutError(f"No free connection to {key[1]}:{key[2]} within {timeout_s}s")
+        return key, path, pool, timeout_s
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout_s: Optional[float] = None,
+    ) -> Tuple[int, bytes]:
+        """Send one request and return (status, body), reusing a pooled connection when possible."""
+        key, path, pool, timeout_s = self._acquire(url, timeout_s)
+        try:
+            conn, resp = self._send(key, pool, method, path, body, headers, timeout_s)
+            try:
+                data = resp.read()
+            except BaseException:
+                self._discard(pool, conn)
+                raise
+            self._release(pool, conn, resp)
+            return resp.status, data
+        finally:
+            pool.slots.release()
+
+    @contextmanager
+    def open_stream(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout_s: Optional[float] = None,
+    ) -> Iterator[http.client.HTTPResponse]:
+        """
+        Like ``request`` but yields the unread response, for streamed bodies.
+        The connection is pooled again only if the body was read to the end.
+        """
+        key, path, pool, timeout_s = self._acquire(url, timeout_s)
+        try:
+            conn, resp = self._send(key, pool, method, path, body, headers, timeout_s)
+            try:
+                yield resp
+            except BaseException:
+                self._discard(pool, conn)
+                raise
+            if resp.isclosed():
+                self._release(pool, conn, resp)
+            else:
+                self._discard(pool, conn)
+        finally:
+            pool.slots.release()
+
+    def prewarm(self, url: str, connections: int = 1) -> int:
+        """Open up to ``connections`` idle connections to the host of ``url``; returns how many were opened."""
+        key, _ = _host_key(url)
+        pool = self._host(key)
+        opened = 0
+        while True:
+            with self._lock:
+                if len(pool.idle) >= connections or pool.open >= pool.limit:
+                    return opened
+                pool.open += 1
+            self._checkin(pool, self._new_connection(key, pool, self.timeout_s))
+            opened += 1
+
+    def idle_count(self, url: str) -> int:
+        key, _ = _host_key(url)
+        with self._lock:
+            pool = self._hosts.get(key)
+            return len(pool.idle) if pool else 0
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            pools = list(self._hosts.values())
+            self._hosts = {}
+            idle = []
+            for pool in pools:
+                idle.extend(pool.idle)
+                pool.open -= len(pool.idle)
+                pool.idle.clear()
+        for conn in idle:
+            conn.close()
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+from .models import CandidateRestaurant
+from .prompting import _pref_to_dict
+
+# Columns of ``candidate_features``, each in [0, 1].
+FEATURES = ("rating", "price", "cuisine", "locality")
+
+# Cuisine match strength: the requested cuisine is the place's first listed one, or listed later.
+PRIMARY_CUISINE_MATCH = 1.0
+SECONDARY_CUISINE_MATCH = 0.7
+# Locality match: same area (location), or only the same listed city.
+AREA_MATCH = 1.0
+CITY_MATCH = 0.5
+# Used when no candidate has a rating.
+DEFAULT_PRIOR_RATING = 3.5
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    rating: float = 1.0
+    price: float = 0.5
+    cuisine: float = 0.8
+    locality: float = 0.3
+    # Bayesian smoothing: a rating counts as if ``prior_votes`` more votes were cast at
+    # ``prior_rating`` (None = the vote-weighted mean rating of the candidates).
+    prior_votes: float = 50.0
+    prior_rating: Optional[float] = None
+
+    def vector(self) -> np.ndarray:
+        return np.array([getattr(self, name) for name in FEATURES], dtype=np.float64)
+
+
+def _split(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        value = ",".join(str(v) for v in value)
+    return [t.strip().lower() for t in str(value).split(",") if t.strip()]
+
+
+def _smoothed_rating(candidates: Sequence[CandidateRestaurant], prior_votes: float, prior_rating: Optional[float]) -> np.ndarray:
+    rating = np.array([c.rating_numeric if c.rating_numeric is not None else np.nan for c in candidates], dtype=np.float64)
+    votes = np.array([max(c.votes or 0, 0) for c in candidates], dtype=np.float64)
+    rated = ~np.isnan(rating)
+    votes[~rated] = 0.0
+    if prior_rating is None:
+        if votes.sum() > 0:
+            prior_rating = float((rating[rated] * votes[rated]).sum() / votes.sum())
+        elif rated.any():
+            prior_rating = float(rating[rated].mean())
+        else:
+            prior_rating = DEFAULT_PRIOR_RATING
+    rating = np.where(rated, rating, prior_rating)
+    return (votes * rating + prior_votes * prior_rating) / np.maximum(votes + prior_votes, 1e-9)
+
+
+def _price_fit(candidates: Sequence[CandidateRestaurant], price_min: Any, price_max: Any) -> np.ndarray:
+    """1 inside the budget, falling linearly to 0 at a budget's width outside it; 0.5 when the cost is unknown."""
+    n = len(candidates)
+    try:
+        lo = float(price_min) if price_min is not None else None
+        hi = float(price_max) if price_max is not None else None
+    except (TypeError, ValueError):
+        lo = hi = None
+    if lo is None and hi is None:
+        return np.zeros(n, dtype=np.float64)
+    cost = np.array([c.cost_numeric if c.cost_numeric is not None else np.nan for c in candidates], dtype=np.float64)
+    below = np.maximum((lo or 0.0) - cost, 0.0)
+    above = np.maximum(cost - hi, 0.0) if hi is not None else np.zeros(n)
+    scale = max(hi if hi is not None else lo, 1.0)
+    fit = np.clip(1.0 - (below + above) / scale, 0.0, 1.0)
+    return np.where(np.isnan(cost), 0.5, fit)
+
+
+def _cuisine_match(candidates: Sequence[CandidateRestaurant], requested: List[str]) -> np.ndarray:
+    """Mean over the requested cuisines of how prominently each candidate serves it."""
+    if not requested:
+        return np.zeros(len(candidates), dtype=np.float64)
+    strength = np.zeros((len(candidates), len(requested)), dtype=np.float64)
+    for i, c in enumerate(candidates):
+        served = _split(c.cuisines)
+        for j, cuisine in enumerate(requested):
+            if served and served[0] == cuisine:
+                strength[i, j] = PRIMARY_CUISINE_MATCH
+            elif cuisine in served:
+                strength[i, j] = SECONDARY_CUISINE_MATCH
+    return strength.mean(axis=1)
+
+
+def _locality_match(candidates: Sequence[CandidateRestaurant], location: Any, city: Any) -> np.ndarray:
+    location = str(location or "").strip().lower()
+    city = str(city or "").strip().lower()
+    area = np.array([bool(location) and (c.location or "").strip().lower() == location for c in candidates])
+    same_city = np.array([bool(city) and (c.listed_in_city or "").strip().lower() == city for c in candidates])
+    return np.where(area, AREA_MATCH, np.where(same_city, CITY_MATCH, 0.0))
+
+
+def candidate_features(
+    preference: Any,
+    candidates: Sequence[CandidateRestaurant],
+    *,
+    prior_votes: float = ScoringWeights.prior_votes,
+    prior_rating: Optional[float] = None,
+) -> np.ndarray:
+    """``(len(candidates), len(FEATURES))`` matrix of per-candidate features in [0, 1]."""
+    if not candidates:
+        return np.zeros((0, len(FEATURES)), dtype=np.float64)
+    pref = _pref_to_dict(preference)
+    return np.column_stack(
+        [
+            _smoothed_rating(candidates, prior_votes, prior_rating) / 5.0,
+            _price_fit(candidates, pref.get("price_min"), pref.get("price_max")),
+            _cuisine_match(candidates, _split(pref.get("cuisine"))),
+            _locality_match(candidates, pref.get("location"), pref.get("city")),
+        ]
+    )
+
+
+def score_candidates(
+    preference: Any,
+    candidates: Sequence[CandidateRestaurant],
+    weights: Optional[ScoringWeights] = None,
+) -> np.ndarray:
+    """Weighted sum of ``candidate_features``, one score per candidate."""
+    weights = weights or ScoringWeights()
+    features = candidate_features(
+        preference, candidates, prior_votes=weights.prior_votes, prior_rating=weights.prior_rating
+    )
+    return features @ weights.vector()
+
+
+def rank_locally(
+    preference: Any,
+    candidates: Sequence[CandidateRestaurant],
+    weights: Optional[ScoringWeights] = None,
+) -> List[CandidateRestaurant]:
+    """
+    Candidates by descending local score, ties in retrieval order.
+
+    Deterministic and without any network call, so it serves as a complete
+    ranking (``llm_mode="local"``) or as a pre-ranker choosing which
+    candidates reach the LLM (``RecommendSettings.local_prerank``).
+    """
+    scores = score_candidates(preference, candidates, weights)
+    return [candidates[i] for i in np.argsort(-scores, kind="stable")]
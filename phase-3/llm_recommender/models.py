@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .local_ranker import ScoringWeights
 
 
 @dataclass(frozen=True)
@@ -62,16 +65,45 @@ class Recommendation:
     restaurant_name: str
     explanation: Optional[str] = None
     attributes: Optional[Dict[str, Any]] = None
+    model: Optional[str] = None  # the LLM whose answer placed this item; None when filled without one
 
 
 class LLMError(RuntimeError):
     pass
 
 
+# How much of the answer comes from the LLM (RecommendSettings.llm_mode):
+# "explain" ranks and explains, "rank" only orders the candidates, "off" makes no call,
+# "local" makes no call and orders by the local scorer (see local_ranker.py).
+# Without the LLM's words, explanations come from precomputed snippets (see snippets.py).
+LLM_MODES = ("explain", "rank", "off", "local")
+
+
 @dataclass(frozen=True)
 class RecommendSettings:
     model: str = "grok-2-latest"
     top_k_candidates: int = 12
     max_results: int = 5
     timeout_s: float = 20.0
+    # Diverse subset of the top-K actually sent to the LLM (None = send all top-K).
+    prompt_candidates: Optional[int] = 8
+    diversity_lambda: float = 0.5
+    # Opt-in: candidates as a short table instead of JSON objects, and a prompt budget
+    # in estimated tokens (prompting.COMPACT_PROMPT_BUDGET suits compact prompts).
+    compact_prompt: bool = False
+    max_prompt_tokens: Optional[int] = None
+    # Opt-in: ask for [{"i": n, "why": ...}] instead of echoed restaurant names
+    # ("rank" mode always does).
+    index_output: bool = False
+    llm_mode: str = "explain"
+    # End-to-end wait for the LLM (None = up to timeout_s). Past it the fallback is
+    # served and the call finishes in the background to fill the caches.
+    deadline_s: Optional[float] = None
+    # Cheaper, faster model tried first; ``model`` only answers when its answer fails
+    # the checks in ``recommender._escalation_reason`` (None = always ``model``).
+    fast_model: Optional[str] = None
+    # Reorder retrieved candidates by the local scorer before choosing the ones
+    # sent to the LLM (always on in "local" mode); None weights = the defaults.
+    local_prerank: bool = False
+    local_weights: Optional["ScoringWeights"] = None
 
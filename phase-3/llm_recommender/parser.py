@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from .models import Recommendation
+from .models import CandidateRestaurant, Recommendation
 
 
 @dataclass(frozen=True)
@@ -24,58 +24,198 @@ def _extract_json_array(text: str) -> str:
     return text[start : end + 1]
 
 
-def parse_recommendations(text: str) -> ParsedLLMResult:
+def _candidate_number(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def _to_recommendation(
+    item: Any,
+    i: int,
+    warnings: List[str],
+    candidates: Optional[Sequence[CandidateRestaurant]] = None,
+) -> Optional[Recommendation]:
+    """
+    Validate one array item (1-based position ``i``); problems are appended to ``warnings``.
+
+    With ``candidates``, index items ``{"i": n, "why": ...}`` resolve to the
+    n-th candidate's exact name; items that echo a name are still accepted.
+    """
+    if not isinstance(item, dict):
+        warnings.append(f"Item {i} is not an object; skipped")
+        return None
+
+    if candidates is not None and "i" in item:
+        number = _candidate_number(item["i"])
+        if number is None or not 1 <= number <= len(candidates):
+            warnings.append(f"Item {i} refers to unknown candidate {item['i']!r}; skipped")
+            return None
+        name = candidates[number - 1].name
+    else:
+        name = item.get("restaurant_name") or item.get("name") or item.get("restaurant")
+        if not name or not isinstance(name, str):
+            warnings.append(f"Item {i} missing restaurant_name; skipped")
+            return None
+
+    rank_val = item.get("rank")
+    if isinstance(rank_val, int):
+        rank = rank_val
+    else:
+        rank = i
+        if rank_val is not None:
+            warnings.append(f"Item {i} rank is not int; using position")
+
+    explanation = item.get("why", item.get("explanation"))
+    if explanation is not None and not isinstance(explanation, str):
+        warnings.append(f"Item {i} explanation is not string; dropped")
+        explanation = None
+
+    attrs = item.get("attributes")
+    if attrs is not None and not isinstance(attrs, dict):
+        warnings.append(f"Item {i} attributes is not object; dropped")
+        attrs = None
+
+    return Recommendation(
+        rank=rank,
+        restaurant_name=name.strip(),
+        explanation=explanation.strip() if isinstance(explanation, str) else None,
+        attributes=attrs,
+    )
+
+
+def parse_recommendations(
+    text: str,
+    candidates: Optional[Sequence[CandidateRestaurant]] = None,
+) -> ParsedLLMResult:
     warnings: List[str] = []
     candidate = text.strip()
     try:
         data = json.loads(candidate)
     except json.JSONDecodeError:
-        candidate = _extract_json_array(candidate)
-        data = json.loads(candidate)
+        try:
+            data = json.loads(_extract_json_array(candidate))
+        except ValueError:
+            # Cut off mid-array (e.g. by max_tokens): keep the items that were closed.
+            data = IncrementalArrayParser().feed(candidate)
+            if data:
+                warnings.append("Output was truncated; kept the complete items")
 
     if not isinstance(data, list):
         raise ValueError("Expected a JSON array")
 
     recs: List[Recommendation] = []
     for i, item in enumerate(data, start=1):
-        if not isinstance(item, dict):
-            warnings.append(f"Item {i} is not an object; skipped")
-            continue
-
-        name = item.get("restaurant_name") or item.get("name") or item.get("restaurant")
-        if not name or not isinstance(name, str):
-            warnings.append(f"Item {i} missing restaurant_name; skipped")
-            continue
-
-        rank_val = item.get("rank")
-        if isinstance(rank_val, int):
-            rank = rank_val
-        else:
-            rank = i
-            if rank_val is not None:
-                warnings.append(f"Item {i} rank is not int; using position")
-
-        explanation = item.get("explanation")
-        if explanation is not None and not isinstance(explanation, str):
-            warnings.append(f"Item {i} explanation is not string; dropped")
-            explanation = None
-
-        attrs = item.get("attributes")
-        if attrs is not None and not isinstance(attrs, dict):
-            warnings.append(f"Item {i} attributes is not object; dropped")
-            attrs = None
-
-        recs.append(
-            Recommendation(
-                rank=rank,
-                restaurant_name=name.strip(),
-                explanation=explanation.strip() if isinstance(explanation, str) else None,
-                attributes=attrs,
-            )
-        )
+        rec = _to_recommendation(item, i, warnings, candidates)
+        if rec is not None:
+            recs.append(rec)
 
     if not recs:
         raise ValueError("No valid recommendations parsed")
 
     return ParsedLLMResult(recommendations=recs, parse_warnings=warnings)
 
+
+
+class IncrementalArrayParser:
+    """
+    Emits the items of a streamed JSON array as soon as each one closes.
+
+    Text before the first ``[`` (e.g. "Sure, here you go:") is skipped, and
+    so is everything after the matching ``]``. Only the current item is
+    buffered, so each ``feed`` costs time proportional to the new text.
+    Items that are not valid JSON are skipped with a warning.
+    """
+
+    def __init__(self) -> None:
+        self.warnings: List[str] = []
+        self.done = False
+        self._started = False
+        self._depth = 0  # nesting inside the top-level array
+        self._in_string = False
+        self._escape = False
+        self._item: List[str] = []  # text of the current item so far
+        self._position = 0  # items seen, valid or not
+
+    def feed(self, text: str) -> List[Any]:
+        """Consume the next chunk; returns the items completed by it."""
+        out: List[Any] = []
+        for ch in text:
+            if self.done:
+                break
+            if not self._started:
+                self._started = ch == "["
+                continue
+            if self._depth == 0:
+                if ch == "]":
+                    self.done = True
+                elif ch in "{[":
+                    self._depth = 1
+                    self._item = [ch]
+                elif ch == '"':
+                    # A bare string item (not a recommendation); skip it.
+                    self._depth = 1
+                    self._in_string = True
+                    self._item = [ch]
+                continue
+
+            self._item.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._item[0] == '"':
+                        self._close_item(out)
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_item(out)
+        return out
+
+    def _close_item(self, out: List[Any]) -> None:
+        self._depth = 0
+        self._position += 1
+        text = "".join(self._item)
+        self._item = []
+        try:
+            out.append(json.loads(text))
+        except json.JSONDecodeError:
+            self.warnings.append(f"Item {self._position} is not valid JSON; skipped")
+
+
+class StreamingRecommendationParser:
+    """``IncrementalArrayParser`` plus the same per-item checks as ``parse_recommendations``."""
+
+    def __init__(self, candidates: Optional[Sequence[CandidateRestaurant]] = None) -> None:
+        self._array = IncrementalArrayParser()
+        self._candidates = candidates
+        self._count = 0
+
+    @property
+    def warnings(self) -> List[str]:
+        return self._array.warnings
+
+    @property
+    def done(self) -> bool:
+        return self._array.done
+
+    def feed(self, text: str) -> List[Recommendation]:
+        out: List[Recommendation] = []
+        for item in self._array.feed(text):
+            self._count += 1
+            rec = _to_recommendation(item, self._count, self._array.warnings, self._candidates)
+            if rec is not None:
+                out.append(rec)
+        return out
@@ -0,0 +1,124 @@
+"""
+Prompt size benchmark: estimated tokens of the JSON prompt versus the
+compact table, with and without a budget, and of a typical answer with
+echoed names versus candidate numbers.
+
+    python -m llm_recommender.prompt_benchmark [--candidates 4 8 12] [--budget 600]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Dict, List, Optional
+
+from .models import CandidateRestaurant
+from .prompting import COMPACT_PROMPT_BUDGET, build_messages, estimate_tokens, messages_tokens, output_token_budget
+
+# Shaped like the Zomato Bangalore records: long dish lists and cuisine strings.
+_SAMPLES = [
+    ("Jalsa", "Banashankari", "North Indian, Mughlai, Chinese", "800", "4.1/5", 775, "Casual Dining",
+     "Pasta, Lunch Buffet, Masala Papad, Paneer Lajawab, Tomato Shorba, Dum Biryani, Sweet Corn Soup"),
+    ("Spice Elephant", "Banashankari", "Chinese, North Indian, Thai", "800", "4.1/5", 787, "Casual Dining",
+     "Momos, Lunch Buffet, Chocolate Nirvana, Thai Green Curry, Paneer Tikka, Dum Biryani, Chicken Biryani"),
+    ("San Churro Cafe", "Banashankari", "Cafe, Mexican, Italian", "800", "3.8/5", 918, "Cafe, Casual Dining",
+     "Churros, Cannelloni, Minestrone Soup, Hot Chocolate, Pink Sauce Pasta, Salsa, Veg Supreme Pizza"),
+    ("Addhuri Udupi Bhojana", "Banashankari", "South Indian, North Indian", "300", "3.7/5", 88, "Quick Bites",
+     "Masala Dosa"),
+    ("Grand Village", "Basavanagudi", "North Indian, Rajasthani", "600", "3.8/5", 166, "Casual Dining",
+     "Panipuri, Gol Gappe"),
+    ("Timepass Dinner", "Basavanagudi", "North Indian", "600", "3.8/5", 286, "Casual Dining",
+     "Onion Rings, Pasta, Kadhai Paneer, Salads, Salad, Roti, Jeera Rice"),
+    ("Onesta", "Banashankari", "Pizza, Cafe, Italian", "600", "4.6/5", 2556, "Casual Dining, Cafe",
+     "Farmhouse Pizza, Chocolate Banana, Virgin Mojito, Pasta, Paneer Tikka, Lime Soda, Prawn Pizza"),
+    ("Penthouse Cafe", "Basavanagudi", "Cafe, Continental, Fast Food", "700", "4.0/5", 324, "Cafe",
+     "Burgers, Pasta, Nachos, Cheese Maggi, Chocolate Shake, Fries, Peri Peri Fries"),
+    ("Smacznego", "Banashankari", "Cafe, Mexican, Italian, Momos, Beverages", "550", "4.2/5", 504, "Cafe",
+     "Waffles, Pasta, Coleslaw Sandwich, Choco Waffle, Tacos, Momos, Cheese Nachos"),
+    ("CafeCoffeeDay", "Banashankari", "Cafe", "800", "3.6/5", 402, "Cafe",
+     "Coffee, Sandwiches, Brownie"),
+    ("Rosewood International Hotel - Bar & Restaurant", "Banashankari", "North Indian, South Indian, Andhra, Chinese",
+     "800", "3.6/5", 8, "Casual Dining, Bar", None),
+    ("Caf-Eleven", "Banashankari", "Cafe, Continental", "450", "4.0/5", 424, "Cafe",
+     "Sandwiches, Burgers, Pasta, Coffee, Fries, Hot Chocolate, Cold Coffee"),
+]
+
+
+def sample_candidates(n: int) -> List[CandidateRestaurant]:
+    out = []
+    for i in range(n):
+        name, loc, cuisines, cost, rate, votes, rest_type, dishes = _SAMPLES[i % len(_SAMPLES)]
+        out.append(
+            CandidateRestaurant(
+                name=name if i < len(_SAMPLES) else f"{name} {i // len(_SAMPLES) + 1}",
+                location=loc,
+                listed_in_city=loc,
+                cuisines=cuisines,
+                approx_cost=cost,
+                rate=rate,
+                votes=votes,
+                rest_type=rest_type,
+                dish_liked=dishes,
+                online_order="Yes",
+                book_table="Yes" if i % 2 == 0 else "No",
+            )
+        )
+    return out
+
+
+_WHY = "Rated {rating} for {cuisines} within your budget."
+
+
+def sample_answers(cands: List[CandidateRestaurant], desired: int) -> Dict[str, str]:
+    """The same picks and reasons written in the name and in the index output contract."""
+    picks = list(enumerate(cands, start=1))[:desired]
+    why = {i: _WHY.format(rating=c.rating_numeric, cuisines=c.cuisines) for i, c in picks}
+    names = [{"rank": r, "restaurant_name": c.name, "explanation": why[i]} for r, (i, c) in enumerate(picks, start=1)]
+    index = [{"i": i, "why": why[i]} for i, _ in picks]
+    return {
+        "names": json.dumps(names, ensure_ascii=False),
+        "index": json.dumps(index, ensure_ascii=False, separators=(",", ":")),
+    }
+
+
+def run(candidates: int = 8, budget: Optional[int] = COMPACT_PROMPT_BUDGET, desired: int = 5) -> Dict[str, int]:
+    """Estimated prompt tokens per encoding for ``candidates`` sample restaurants."""
+    cands = sample_candidates(candidates)
+    pref = {"location": "Banashankari", "price_max": 800, "min_rating": 3.5, "max_results": desired}
+    answers = sample_answers(cands, desired)
+    return {
+        "json": messages_tokens(build_messages(pref, cands, desired)),
+        "compact": messages_tokens(build_messages(pref, cands, desired, compact=True)),
+        "compact_budget": messages_tokens(
+            build_messages(pref, cands, desired, compact=True, max_prompt_tokens=budget)
+        ),
+        "output_names": estimate_tokens(answers["names"]),
+        "output_index": estimate_tokens(answers["index"]),
+        "max_tokens": output_token_budget(desired, index_output=True),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[4, 8, 12])
+    parser.add_argument("--budget", type=int, default=COMPACT_PROMPT_BUDGET)
+    parser.add_argument("--desired", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print("prompt tokens")
+    print(f"{'candidates':>10} {'json':>6} {'compact':>8} {'budget':>7} {'saved':>7}")
+    for n in args.candidates:
+        r = run(n, args.budget, min(args.desired, n))
+        saved = 1 - r["compact_budget"] / r["json"]
+        print(f"{n:>10} {r['json']:>6} {r['compact']:>8} {r['compact_budget']:>7} {saved:>7.0%}")
+
+    print("output tokens")
+    print(f"{'results':>10} {'names':>6} {'index':>8} {'saved':>7}  max_tokens")
+    for desired in sorted({1, 3, args.desired}):
+        r = run(max(args.candidates), args.budget, desired)
+        saved = 1 - r["output_index"] / r["output_names"]
+        print(f"{desired:>10} {r['output_names']:>6} {r['output_index']:>8} {saved:>7.0%}  {r['max_tokens']}")
+
+
+if __name__ == "__main__":
+    main()
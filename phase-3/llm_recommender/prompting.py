@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, Iterable, List, Mapping, Tuple
+import math
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from .models import CandidateRestaurant
 
@@ -17,6 +19,7 @@ Rules:
 - Output MUST be valid JSON only (no markdown, no prose).
 - Keep explanations short (1-2 sentences).
 - Do not hallucinate attributes that aren't in the candidate list.
+- "notes" in the preferences is the user's own wording that filters could not capture; use it to rank and explain, never to invent attributes.
 
 Output format (JSON array):
 [
@@ -29,6 +32,24 @@ Output format (JSON array):
 """
 
 
+# Preference fields sent to the LLM, in prompt order. A tuple, not a set: the prompt
+# text (and so the response-cache key) must not depend on PYTHONHASHSEED.
+PREFERENCE_FIELDS = (
+    "city",
+    "location",
+    "price_min",
+    "price_max",
+    "min_rating",
+    "cuisine",
+    "online_order",
+    "book_table",
+    "rest_type",
+    "min_votes",
+    "max_results",
+    "notes",
+)
+
+
 def _pref_to_dict(preference: Any) -> Dict[str, Any]:
     """
     Best-effort conversion for preference objects from Phase 2 or dict-like inputs.
@@ -39,22 +60,10 @@ def _pref_to_dict(preference: Any) -> Dict[str, Any]:
         raw = dict(vars(preference))
     else:
         # Last resort: pull a small known set of attributes.
-        raw = {}
-        for k in ("city", "location", "price_min", "price_max", "min_rating", "cuisine", "max_results"):
-            if hasattr(preference, k):
-                raw[k] = getattr(preference, k)
-
-    allowed = {
-        "city",
-        "location",
-        "price_min",
-        "price_max",
-        "min_rating",
-        "cuisine",
-        "max_results",
-    }
+        raw = {k: getattr(preference, k) for k in PREFERENCE_FIELDS if hasattr(preference, k)}
+
     cleaned: Dict[str, Any] = {}
-    for k in allowed:
+    for k in PREFERENCE_FIELDS:
         v = raw.get(k)
         if v is None or v == "":
             continue
@@ -62,22 +71,234 @@ def _pref_to_dict(preference: Any) -> Dict[str, Any]:
     return cleaned
 
 
+TABLE_DESCRIPTION = 'Candidates are a table: one row per restaurant, columns separated by "|", empty = unknown. Columns: #, name, area, cuisines, cost (for two, INR), rating (of 5), votes, type, online (online ordering Y/N), book (table booking Y/N), dishes (popular dishes).'
+
+COMPACT_SYSTEM_PROMPT = "You recommend restaurants. " + TABLE_DESCRIPTION + """
+
+Rules:
+- ONLY recommend candidates from the table; copy names exactly.
+- Output ONLY a JSON array, no markdown or prose.
+- One sentence per explanation, at most 20 words, based only on the table and the preferences.
+- "notes" in the preferences is the user's own wording; use it to rank and explain, never to invent attributes.
+
+Output: [{"rank":1,"restaurant_name":"Exact Name","explanation":"..."}]"""
+
+# Index output contract: the model answers with candidate numbers instead of
+# echoing names, e.g. [{"i":3,"why":"..."}], which is shorter to generate
+# and maps back to a candidate without any name matching.
+INDEX_SYSTEM_PROMPT = SYSTEM_PROMPT[: SYSTEM_PROMPT.index("Output format")] + """Output format (JSON array, best first; "i" is the candidate's "i"):
+[
+  {"i": 3, "why": "Short reason based on preferences and candidate fields"}
+]
+"""
+
+COMPACT_INDEX_SYSTEM_PROMPT = COMPACT_SYSTEM_PROMPT.replace(
+    "copy names exactly", 'refer to them by "#"'
+).replace(
+    'Output: [{"rank":1,"restaurant_name":"Exact Name","explanation":"..."}]',
+    'Output, best first, i = "#": [{"i":3,"why":"..."}]',
+)
+
+# Ranking only: explanations come from precomputed snippets (see snippets.py).
+RANK_ONLY_SYSTEM_PROMPT = "You rank restaurants for a user. " + TABLE_DESCRIPTION + """
+
+Rules:
+- ONLY pick candidates from the table, by their "#".
+- Output ONLY a JSON array, best first, no explanations, markdown or prose.
+- "notes" in the preferences is the user's own wording; use it to rank.
+
+Output: [{"i":3},{"i":1}]"""
+
+SNIPPET_SYSTEM_PROMPT = "You write short restaurant blurbs. " + TABLE_DESCRIPTION + """
+
+For EVERY row write one sentence of at most 20 words on what the place is known for, naming signature dishes when listed. Use only the table; do not mention price or rating.
+
+Output ONLY a JSON array: [{"i":1,"snippet":"..."}]"""
+
+_COMPACT_COLUMNS = ("#", "name", "area", "cuisines", "cost", "rating", "votes", "type", "online", "book", "dishes")
+# A prompt budget (estimated tokens) that fits 8 compact candidates with room to spare.
+COMPACT_PROMPT_BUDGET = 600
+
+# Output is capped at OUTPUT_TOKENS_BASE + OUTPUT_TOKENS_PER_ITEM per requested result
+# (OUTPUT_TOKENS_PER_INDEX_ITEM when names are not echoed, OUTPUT_TOKENS_PER_RANK_ITEM
+# without explanations).
+OUTPUT_TOKENS_BASE = 16
+OUTPUT_TOKENS_PER_ITEM = 64
+OUTPUT_TOKENS_PER_INDEX_ITEM = 48
+OUTPUT_TOKENS_PER_RANK_ITEM = 8
+
+# Trimming ladder used when a prompt is over budget, least lossy first:
+# (max dishes, max cuisines, keep votes/type). None = untouched.
+_TRIM_LEVELS: Tuple[Tuple[Optional[int], Optional[int], bool], ...] = (
+    (None, None, True),
+    (3, None, True),
+    (3, 3, True),
+    (0, 3, True),
+    (0, 2, False),
+)
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token estimate for BPE-style tokenizers: a word costs one token
+    per 6 letters, digits one per 3, and each punctuation mark one.
+    """
+    total = 0
+    for piece in _TOKEN_RE.findall(text):
+        if piece[0].isalpha():
+            total += math.ceil(len(piece) / 6)
+        elif piece[0].isdigit():
+            total += math.ceil(len(piece) / 3)
+        else:
+            total += 1
+    return total
+
+
+def output_token_budget(desired_results: int, index_output: bool = False, explain: bool = True) -> int:
+    """``max_tokens`` for an answer with ``desired_results`` items (one sentence each if ``explain``)."""
+    if not explain:
+        per_item = OUTPUT_TOKENS_PER_RANK_ITEM
+    elif index_output:
+        per_item = OUTPUT_TOKENS_PER_INDEX_ITEM
+    else:
+        per_item = OUTPUT_TOKENS_PER_ITEM
+    return OUTPUT_TOKENS_BASE + per_item * max(1, desired_results)
+
+
+def _first(value: Any, limit: Optional[int]) -> Any:
+    """First ``limit`` comma-separated entries of ``value`` (None drops it when limit is 0)."""
+    if limit is None or not isinstance(value, str):
+        return value
+    if limit == 0:
+        return None
+    return ", ".join([p.strip() for p in value.split(",") if p.strip()][:limit])
+
+
+def _trimmed(candidate: CandidateRestaurant, level: Tuple[Optional[int], Optional[int], bool]) -> Dict[str, Any]:
+    dishes, cuisines, keep_minor = level
+    data = candidate.to_prompt_dict()
+    data["dish_liked"] = _first(data.get("dish_liked"), dishes)
+    data["cuisines"] = _first(data.get("cuisines"), cuisines)
+    if not keep_minor:
+        data.pop("votes", None)
+        data.pop("rest_type", None)
+    return {k: v for k, v in data.items() if v is not None and v != ""}
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.strip().lower() in ("yes", "no"):
+        return value.strip()[0].upper()
+    if isinstance(value, float):
+        value = f"{value:g}"
+    return " ".join(str(value).replace("|", "/").split())
+
+
+def _table(rows: List[Dict[str, Any]]) -> str:
+    lines = ["|".join(_COMPACT_COLUMNS)]
+    for i, d in enumerate(rows, start=1):
+        cells = (
+            i,
+            d.get("name"),
+            d.get("location") or d.get("city"),
+            d.get("cuisines"),
+            d.get("approx_cost_for_two"),
+            d.get("rating"),
+            d.get("votes"),
+            d.get("rest_type"),
+            d.get("online_order"),
+            d.get("book_table"),
+            d.get("dish_liked"),
+        )
+        lines.append("|".join(_cell(c) for c in cells))
+    return "\n".join(lines)
+
+
+def _render(
+    pref_dict: Dict[str, Any],
+    rows: List[Dict[str, Any]],
+    desired_results: int,
+    compact: bool,
+    index_output: bool,
+    explain: bool = True,
+) -> List[Dict[str, str]]:
+    if not explain:
+        system = RANK_ONLY_SYSTEM_PROMPT
+        user = f"preferences: {json.dumps(pref_dict, ensure_ascii=False, separators=(',', ':'))}\ndesired_results: {desired_results}\ncandidates:\n{_table(rows)}"
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+    if not compact:
+        if index_output:
+            rows = [{"i": i, **d} for i, d in enumerate(rows, start=1)]
+        user_payload = {
+            "preferences": pref_dict,
+            "desired_results": desired_results,
+            "candidates": rows,
+        }
+        system = INDEX_SYSTEM_PROMPT if index_output else SYSTEM_PROMPT
+        return [
+            {"role": "system", "content": system.strip()},
+            {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
+        ]
+    preferences = json.dumps(pref_dict, ensure_ascii=False, separators=(",", ":"))
+    user = f"preferences: {preferences}\ndesired_results: {desired_results}\ncandidates:\n{_table(rows)}"
+    return [
+        {"role": "system", "content": COMPACT_INDEX_SYSTEM_PROMPT if index_output else COMPACT_SYSTEM_PROMPT},
+        {"role": "user", "content": user},
+    ]
+
+
+def messages_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimated prompt tokens, plus a few per message for the chat framing."""
+    return sum(estimate_tokens(m["content"]) + 4 for m in messages)
+
+
 def build_messages(
     preference: Any,
     candidates: Iterable[CandidateRestaurant],
     desired_results: int,
+    compact: bool = False,
+    max_prompt_tokens: Optional[int] = None,
+    index_output: bool = False,
+    explain: bool = True,
 ) -> List[Dict[str, str]]:
+    """
+    Chat messages for ranking ``candidates``.
+
+    ``compact`` sends the candidates as a pipe-separated table under a
+    shorter system prompt instead of JSON objects with long keys. With
+    ``max_prompt_tokens``, long fields are trimmed step by step (fewer
+    dishes, fewer cuisines, then no dishes, votes or type) until the
+    estimate fits; if it still does not, candidates are dropped from the
+    end, never below ``desired_results``.
+
+    ``index_output`` numbers the candidates from 1 and asks for
+    ``[{"i": n, "why": ...}]`` instead of echoed names; parse the answer
+    with the same candidate list. ``explain=False`` asks only for the
+    order, always as a numbered table (``[{"i": n}, ...]``).
+    """
     pref_dict = _pref_to_dict(preference)
-    candidate_payload = [c.to_prompt_dict() for c in candidates]
+    candidates = list(candidates)
 
-    user_payload = {
-        "preferences": pref_dict,
-        "desired_results": desired_results,
-        "candidates": candidate_payload,
-    }
+    messages: List[Dict[str, str]] = []
+    for level in _TRIM_LEVELS:
+        rows = [_trimmed(c, level) for c in candidates]
+        messages = _render(pref_dict, rows, desired_results, compact, index_output, explain)
+        if max_prompt_tokens is None or messages_tokens(messages) <= max_prompt_tokens:
+            return messages
 
+    while len(rows) > max(1, desired_results) and messages_tokens(messages) > max_prompt_tokens:
+        rows = rows[:-1]
+        messages = _render(pref_dict, rows, desired_results, compact, index_output, explain)
+    return messages
+
+
+def build_snippet_messages(candidates: Iterable[CandidateRestaurant]) -> List[Dict[str, str]]:
+    """Messages asking for one user-independent blurb per candidate, answered as ``[{"i": n, "snippet": ...}]``."""
+    rows = [_trimmed(c, _TRIM_LEVELS[0]) for c in candidates]
     return [
-        {"role": "system", "content": SYSTEM_PROMPT.strip()},
-        {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
+        {"role": "system", "content": SNIPPET_SYSTEM_PROMPT},
+        {"role": "user", "content": "candidates:\n" + _table(rows)},
     ]
-
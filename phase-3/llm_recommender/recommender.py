@@ -1,15 +1,73 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from .models import (
+    LLM_MODES,
     CandidateRestaurant,
     RecommendSettings,
     Recommendation,
 )
-from .xai_client import LLMClient, XAIChatCompletionsClient
-from .parser import ParsedLLMResult, parse_recommendations
-from .prompting import build_messages
+from .async_client import AsyncLLMClient, AsyncXAIChatCompletionsClient
+from . import background
+from .cascade import FAST_MAX_EXPLANATION_WORDS, CascadeTracker
+from .cache import ResponseCache
+from .diversity import COST_BAND_EDGES, select_diverse
+from .distill import DistilledRanker, RankingLog
+from .local_ranker import rank_locally
+from .xai_client import LLMClient, XAIChatCompletionsClient, client_ready, stream_text
+from .parser import ParsedLLMResult, StreamingRecommendationParser, parse_recommendations
+from .prompting import _pref_to_dict, build_messages, output_token_budget
+
+if TYPE_CHECKING:
+    from .snippets import SnippetStore
+
+
+def _price_band(value: Any) -> Optional[int]:
+    try:
+        return sum(int(value) >= edge for edge in COST_BAND_EDGES)
+    except (TypeError, ValueError):
+        return None
+
+
+def ranking_cache_key(
+    model: str,
+    preference: Any,
+    candidates: Sequence[CandidateRestaurant],
+    desired: int,
+    llm_mode: str = "explain",
+) -> str:
+    """
+    Key for reusing a ranking across requests that retrieved the same candidates.
+
+    Only a coarse signature of the preference goes in (cuisine, price bands,
+    rating floor to 0.5, notes words), so e.g. price_max 800 and 900 share
+    an entry when retrieval returned the same ordered candidates.
+    """
+    pref = _pref_to_dict(preference)
+    rating = pref.get("min_rating")
+    try:
+        rating_floor = int(float(rating) * 2) / 2 if rating is not None else None
+    except (TypeError, ValueError):
+        rating_floor = None
+    signature = {
+        "model": model,
+        "mode": llm_mode,
+        "desired": desired,
+        "cuisine": str(pref.get("cuisine") or "").strip().lower(),
+        "price": [_price_band(pref.get("price_min")), _price_band(pref.get("price_max"))],
+        "rating": rating_floor,
+        "notes": sorted(set(str(pref.get("notes") or "").lower().split())),
+        "candidates": [[_normalize_name(c.name), (c.location or "").strip().lower()] for c in candidates],
+    }
+    payload = json.dumps(signature, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return "ranking:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 def _normalize_name(name: str) -> str:
@@ -40,6 +98,22 @@ def _template_explanation(preference: Any, candidate: CandidateRestaurant) -> st
     return sentence + "."
 
 
+def _snippet_explanation(preference: Any, candidate: CandidateRestaurant, snippets: Optional["SnippetStore"]) -> str:
+    """The precomputed snippet plus this candidate's rating and price; the template without a snippet."""
+    snippet = snippets.get(candidate) if snippets is not None else None
+    if not snippet:
+        return _template_explanation(preference, candidate)
+    facts: List[str] = []
+    if candidate.rating_numeric is not None:
+        facts.append(f"Rated {candidate.rating_numeric:.1f}")
+    if candidate.cost_numeric is not None:
+        facts.append(f"approx. ₹{candidate.cost_numeric} for two")
+    if not facts:
+        return snippet
+    tail = ", ".join(facts)
+    return f"{snippet.rstrip('.')}. {tail[0].upper()}{tail[1:]}."
+
+
 def _coerce_candidates(items: Iterable[Any]) -> List[CandidateRestaurant]:
     out: List[CandidateRestaurant] = []
     for it in items:
@@ -71,23 +145,37 @@ def _coerce_candidates(items: Iterable[Any]) -> List[CandidateRestaurant]:
     return out
 
 
-def recommend_with_explanations(
-    *,
+@dataclass
+class _Plan:
+    """What both the sync and async entry points need before (and instead of) calling the LLM."""
+
+    top_k: List[CandidateRestaurant]  # every candidate the answer may use, in fallback order
+    desired: int
+    prompt: List[CandidateRestaurant] = field(default_factory=list)  # the ones listed to the LLM
+    cache_keys: Dict[str, str] = field(default_factory=dict)  # ranking-cache key per model that may answer
+    model: Optional[str] = None  # settings.model; only its answers are logged for distillation
+    result: Optional[List[Recommendation]] = None  # already answered (no candidates, a cache hit, a confident ranker)
+    preference: Any = None
+    ranking_log: Optional[RankingLog] = None  # where LLM answers are logged for ``distill.train_ranker``
+
+
+def _plan(
     preference: Any,
     candidates: Sequence[Any],
-    client: Optional[LLMClient] = None,
-    settings: RecommendSettings = RecommendSettings(),
-) -> List[Recommendation]:
-    """
-    Rank candidate restaurants with short explanations.
-
-    - Uses LLM if possible.
-    - Falls back to candidate order with template explanations on failure.
-    """
+    settings: RecommendSettings,
+    ranking_cache: Optional[ResponseCache],
+    snippets: Optional["SnippetStore"] = None,
+    ranker: Optional[DistilledRanker] = None,
+    ranking_log: Optional[RankingLog] = None,
+) -> _Plan:
+    if settings.llm_mode not in LLM_MODES:
+        raise ValueError(f"Unknown llm_mode {settings.llm_mode!r}; expected one of {', '.join(LLM_MODES)}")
     coerced = _coerce_candidates(candidates)
     if not coerced:
-        return []
+        return _Plan(top_k=[], desired=0, result=[])
 
+    if settings.local_prerank or settings.llm_mode == "local":
+        coerced = rank_locally(preference, coerced, settings.local_weights)
     top_k = coerced[: max(1, settings.top_k_candidates)]
 
     desired = settings.max_results
@@ -98,47 +186,458 @@ def recommend_with_explanations(
             desired = settings.max_results
     desired = max(1, min(desired, len(top_k)))
 
-    messages = build_messages(preference, top_k, desired_results=desired)
-    client = client or XAIChatCompletionsClient()
+    if settings.llm_mode in ("off", "local"):
+        # No prompt is built, so keep the (retrieval or local-score) order of the whole top-K.
+        plan = _Plan(top_k=top_k, desired=desired, prompt=top_k, preference=preference)
+        plan.result = _fallback(preference, plan, snippets)
+        return plan
+
+    prompt = top_k
+    if settings.prompt_candidates is not None:
+        # Drop chain branches / near-duplicates so fewer candidates cover the same choices,
+        # but never list fewer than the answer needs.
+        k = max(desired, settings.prompt_candidates)
+        prompt = select_diverse(top_k, k=k, lambda_=settings.diversity_lambda)
+        # The fallback (and any shortfall in the LLM's answer) fills from the whole top-K,
+        # the prompted candidates first.
+        top_k = prompt + _others(top_k, prompt)
+
+    plan = _Plan(
+        top_k=top_k, desired=desired, prompt=prompt, model=settings.model, preference=preference, ranking_log=ranking_log
+    )
+    if ranking_cache is not None:
+        # Answers are cached under the model that gave them; a large-model answer is preferred.
+        for model in (settings.model, settings.fast_model):
+            if model is not None:
+                plan.cache_keys[model] = ranking_cache_key(model, preference, top_k, desired, settings.llm_mode)
+        for model, key in plan.cache_keys.items():
+            cached = ranking_cache.get(key)
+            if cached is not None:
+                plan.result = _postprocess(
+                    preference=preference,
+                    candidates=top_k,
+                    parsed=parse_recommendations(cached, prompt),
+                    desired=desired,
+                    snippets=snippets,
+                    model=model,
+                )
+                return plan
+    if ranker is not None:
+        order = ranker.decide(preference, prompt, desired)
+        if order is not None:
+            ranked = [prompt[i] for i in order]
+            ranked += _others(top_k, ranked)
+            plan.result = _fallback(preference, _Plan(top_k=ranked, desired=desired), snippets)
+    return plan
+
+
+def _messages(preference: Any, plan: _Plan, settings: RecommendSettings) -> List[Dict[str, str]]:
+    return build_messages(
+        preference,
+        plan.prompt,
+        desired_results=plan.desired,
+        compact=settings.compact_prompt,
+        max_prompt_tokens=settings.max_prompt_tokens,
+        index_output=settings.index_output or settings.llm_mode == "rank",
+        explain=settings.llm_mode != "rank",
+    )
+
+
+def _max_tokens(plan: _Plan, settings: RecommendSettings) -> int:
+    return output_token_budget(plan.desired, settings.index_output, explain=settings.llm_mode != "rank")
+
+
+def _log_ranking(plan: _Plan, recs: Sequence[Recommendation]) -> None:
+    """Append the LLM's order (as indices into ``plan.prompt``) to ``plan.ranking_log``."""
+    if plan.ranking_log is None:
+        return
+    index = {_normalize_name(c.name): i for i, c in enumerate(plan.prompt)}
+    ranking: List[int] = []
+    for rec in sorted(recs, key=lambda r: r.rank):
+        i = index.get(_normalize_name(rec.restaurant_name))
+        if i is not None and i not in ranking:
+            ranking.append(i)
+    if ranking:
+        try:
+            plan.ranking_log.record(plan.preference, plan.prompt, ranking)
+        except OSError:
+            pass  # training data is best effort; never fail a request over it
+
+
+def _remember(plan: _Plan, raw: str, model: str, ranking_cache: Optional[ResponseCache]) -> ParsedLLMResult:
+    """Cache ``model``'s answer under that model; log it for distillation only if it is ``settings.model``'s."""
+    parsed = parse_recommendations(raw, plan.prompt)
+    key = plan.cache_keys.get(model)
+    if key is not None and parsed.recommendations:
+        ranking_cache.put(key, raw)
+    if model == plan.model:
+        _log_ranking(plan, parsed.recommendations)
+    return parsed
+
+
+def _remember_late(plan: _Plan, answer: Any, ranking_cache: Optional[ResponseCache]) -> None:
+    """
+    Cache an answer (a ``(raw, model)`` pair, or a finished future or task
+    returning one) that arrived after its request was served; nobody is
+    left to see errors.
+    """
+    try:
+        raw, model = answer if isinstance(answer, tuple) else answer.result()
+        _remember(plan, raw, model, ranking_cache)
+    except BaseException:
+        pass
+
+
+def _others(pool: Sequence[CandidateRestaurant], chosen: Sequence[CandidateRestaurant]) -> List[CandidateRestaurant]:
+    """``pool`` minus ``chosen`` (by identity: chain branches can compare equal), in pool order."""
+    seen = {id(c) for c in chosen}
+    return [c for c in pool if id(c) not in seen]
 
+
+def _finish(
+    preference: Any,
+    plan: _Plan,
+    answer: Tuple[str, str],
+    ranking_cache: Optional[ResponseCache],
+    snippets: Optional["SnippetStore"] = None,
+) -> List[Recommendation]:
+    raw, model = answer
+    parsed = _remember(plan, raw, model, ranking_cache)
+    return _postprocess(
+        preference=preference, candidates=plan.top_k, parsed=parsed, desired=plan.desired, snippets=snippets, model=model
+    )
+
+
+def _fallback(preference: Any, plan: _Plan, snippets: Optional["SnippetStore"] = None) -> List[Recommendation]:
+    """Keep candidate order (retrieval, or local scores) and explain from snippets (or a minimal template)."""
+    return _Assembler(preference, plan.top_k, plan.desired, snippets).fill()
+
+
+def _escalation_reason(preference: Any, plan: _Plan, raw: str, settings: RecommendSettings) -> Optional[str]:
+    """Why a fast-model answer must go to the large model, or None to serve it."""
     try:
-        raw = client.generate(model=settings.model, messages=messages, timeout_s=settings.timeout_s)
-        parsed = parse_recommendations(raw)
-        return _postprocess(preference=preference, candidates=top_k, parsed=parsed, desired=desired)
+        parsed = parse_recommendations(raw, plan.prompt)
+    except ValueError:
+        return "unparseable"
+    assembler = _Assembler(preference, plan.top_k, plan.desired)
+    accepted = [rec for rec in sorted(parsed.recommendations, key=lambda r: r.rank) if assembler.add(rec) is not None]
+    if len(accepted) < plan.desired:
+        return "too_few"
+    if settings.llm_mode == "explain" and not all(
+        0 < len((rec.explanation or "").split()) <= FAST_MAX_EXPLANATION_WORDS for rec in accepted
+    ):
+        return "invalid"
+    return None
+
+
+def _cascade(
+    preference: Any,
+    plan: _Plan,
+    settings: RecommendSettings,
+    generate: Callable[[str], str],
+    stats: Optional[CascadeTracker],
+) -> Tuple[str, str]:
+    """
+    ``generate(settings.fast_model)``, then ``generate(settings.model)`` if
+    that answer will not do; returns the answer and the model that gave it.
+    """
+    start = time.monotonic()
+    try:
+        raw = generate(settings.fast_model)
+        reason = _escalation_reason(preference, plan, raw, settings)
+    except Exception:
+        reason = "error"
+    fast_s = time.monotonic() - start
+    if reason is None:
+        if stats is not None:
+            stats.record_fast(fast_s)
+        return raw, settings.fast_model
+    try:
+        raw = generate(settings.model)
+    except Exception:
+        if stats is not None:
+            stats.record_escalation(reason, fast_s, None)
+        raise
+    if stats is not None:
+        stats.record_escalation(reason, fast_s, time.monotonic() - start - fast_s)
+    return raw, settings.model
+
+
+async def _acascade(
+    preference: Any,
+    plan: _Plan,
+    settings: RecommendSettings,
+    generate: Callable[[str], Awaitable[str]],
+    stats: Optional[CascadeTracker],
+) -> Tuple[str, str]:
+    """Async counterpart of ``_cascade``."""
+    start = time.monotonic()
+    try:
+        raw = await generate(settings.fast_model)
+        reason = _escalation_reason(preference, plan, raw, settings)
     except Exception:
-        # Fallback: keep retrieval order and generate a minimal explanation.
-        out: List[Recommendation] = []
-        for idx, c in enumerate(top_k[:desired], start=1):
-            out.append(
-                Recommendation(
-                    rank=idx,
-                    restaurant_name=c.name,
-                    explanation=_template_explanation(preference, c),
-                    attributes={"cuisines": c.cuisines, "rating": c.rating_numeric or c.rate, "approx_cost": c.approx_cost, "location": c.location},
+        reason = "error"
+    fast_s = time.monotonic() - start
+    if reason is None:
+        if stats is not None:
+            stats.record_fast(fast_s)
+        return raw, settings.fast_model
+    try:
+        raw = await generate(settings.model)
+    except Exception:
+        if stats is not None:
+            stats.record_escalation(reason, fast_s, None)
+        raise
+    if stats is not None:
+        stats.record_escalation(reason, fast_s, time.monotonic() - start - fast_s)
+    return raw, settings.model
+
+
+def recommend_with_explanations(
+    *,
+    preference: Any,
+    candidates: Sequence[Any],
+    client: Optional[LLMClient] = None,
+    settings: RecommendSettings = RecommendSettings(),
+    ranking_cache: Optional[ResponseCache] = None,
+    snippets: Optional["SnippetStore"] = None,
+    deadline: Optional[float] = None,
+    ranker: Optional[DistilledRanker] = None,
+    ranking_log: Optional[RankingLog] = None,
+    cascade_stats: Optional[CascadeTracker] = None,
+) -> List[Recommendation]:
+    """
+    Rank candidate restaurants with short explanations.
+
+    - Uses LLM if possible.
+    - With a ``ranking_cache``, reuses an earlier LLM answer for the same
+      candidates and a similar preference (see ``ranking_cache_key``).
+    - Falls back to candidate order with template explanations on failure,
+      and without building the prompt when the client is not ``ready()``
+      (no API key, open circuit).
+    - ``settings.llm_mode`` "rank" asks the LLM only for the order, "off"
+      skips it and "local" orders by ``local_ranker.rank_locally`` instead;
+      explanations then come from ``snippets`` (precomputed by
+      ``snippets.precompute_snippets``) where available.
+    - ``settings.local_prerank`` applies the local ranking before the
+      candidates for the prompt (and the fallback order) are chosen.
+    - A ``ranker`` (``distill.DistilledRanker``, trained on the answers
+      appended to ``ranking_log``) answers instead of the LLM when it is
+      confident about the order; explanations then come from ``snippets``.
+    - ``deadline`` (a ``time.monotonic()`` value; defaults to
+      ``settings.deadline_s`` from now) bounds the wait: past it the
+      fallback is returned, and the LLM call finishes in the background
+      to fill the caches for the next identical request (unless
+      ``background.MAX_BACKGROUND_CALLS`` late calls are already running).
+    - With ``settings.fast_model`` set, that model answers first and
+      ``settings.model`` is asked only if the answer does not parse, has
+      fewer than the desired valid items or has missing or overlong
+      explanations; outcomes are counted in ``cascade_stats``. Items from
+      an LLM answer carry the ``model`` that gave it, which also keys the
+      ranking cache; only ``settings.model`` answers go to ``ranking_log``.
+    """
+    plan = _plan(preference, candidates, settings, ranking_cache, snippets, ranker, ranking_log)
+    if plan.result is not None:
+        return plan.result
+
+    client = client or XAIChatCompletionsClient(max_tokens=_max_tokens(plan, settings))
+    if not client_ready(client):
+        return _fallback(preference, plan, snippets)
+    messages = _messages(preference, plan, settings)
+    deadline = deadline if deadline is not None else background.deadline_after(settings.deadline_s)
+
+    def generate(model: str) -> str:
+        return client.generate(model=model, messages=messages, timeout_s=settings.timeout_s)
+
+    def call() -> Tuple[str, str]:
+        if settings.fast_model is None:
+            return generate(settings.model), settings.model
+        return _cascade(preference, plan, settings, generate, cascade_stats)
+
+    try:
+        if deadline is None:
+            answer = call()
+        else:
+            try:
+                answer = background.call_with_deadline(
+                    call, deadline, on_late=lambda f: _remember_late(plan, f, ranking_cache)
                 )
-            )
-        return out
+            except concurrent.futures.TimeoutError:
+                return _fallback(preference, plan, snippets)
+        return _finish(preference, plan, answer, ranking_cache, snippets)
+    except Exception:
+        return _fallback(preference, plan, snippets)
 
 
-def _postprocess(
+def stream_recommendations(
     *,
     preference: Any,
-    candidates: Sequence[CandidateRestaurant],
-    parsed: ParsedLLMResult,
-    desired: int,
+    candidates: Sequence[Any],
+    client: Optional[LLMClient] = None,
+    settings: RecommendSettings = RecommendSettings(),
+    ranking_cache: Optional[ResponseCache] = None,
+    snippets: Optional["SnippetStore"] = None,
+    deadline: Optional[float] = None,
+    ranker: Optional[DistilledRanker] = None,
+    ranking_log: Optional[RankingLog] = None,
+) -> Iterator[Recommendation]:
+    """
+    Like ``recommend_with_explanations``, but yields each recommendation as
+    soon as the model has finished writing it.
+
+    Items are taken in the order the model writes them. If the stream fails
+    part-way, what was already yielded stands and the rest is filled from
+    retrieval order, so a failure before the first item gives exactly the
+    usual fallback. Passing the ``deadline`` counts as such a failure; the
+    stream is then read to its end in the background and cached, within
+    the same ``background.MAX_BACKGROUND_CALLS`` limit as other late calls.
+
+    Streams always use ``settings.model``: items are sent before the answer
+    is complete, so a fast-model answer could not be judged and replaced.
+    """
+    plan = _plan(preference, candidates, settings, ranking_cache, snippets, ranker, ranking_log)
+    if plan.result is not None:
+        yield from plan.result
+        return
+
+    client = client or XAIChatCompletionsClient(max_tokens=_max_tokens(plan, settings))
+    if not client_ready(client):
+        yield from _fallback(preference, plan, snippets)
+        return
+    messages = _messages(preference, plan, settings)
+
+    assembler = _Assembler(preference, plan.top_k, plan.desired, snippets, model=settings.model)
+    parser = StreamingRecommendationParser(plan.prompt)
+    parsed: List[Recommendation] = []
+    chunks = stream_text(client, model=settings.model, messages=messages, timeout_s=settings.timeout_s)
+    deadline = deadline if deadline is not None else background.deadline_after(settings.deadline_s)
+    if deadline is not None:
+        late = background.BackgroundStream(chunks, lambda raw: _remember_late(plan, (raw, settings.model), ranking_cache))
+        chunks = late.read(deadline)
+    try:
+        for chunk in chunks:
+            for rec in parser.feed(chunk):
+                parsed.append(rec)
+                added = assembler.add(rec)
+                if added is not None:
+                    yield added
+            if assembler.full or parser.done:
+                break
+    except Exception:
+        parsed = []  # incomplete answer: fill below, but do not cache it
+    finally:
+        chunks.close()
+
+    if parsed and (parser.done or assembler.full):
+        key = plan.cache_keys.get(settings.model)
+        if key is not None:
+            ranking_cache.put(key, json.dumps([asdict(r) for r in parsed], ensure_ascii=False))
+        _log_ranking(plan, parsed)
+    yield from assembler.fill()
+
+
+async def recommend_with_explanations_async(
+    *,
+    preference: Any,
+    candidates: Sequence[Any],
+    client: Optional[AsyncLLMClient] = None,
+    settings: RecommendSettings = RecommendSettings(),
+    ranking_cache: Optional[ResponseCache] = None,
+    snippets: Optional["SnippetStore"] = None,
+    deadline: Optional[float] = None,
+    ranker: Optional[DistilledRanker] = None,
+    ranking_log: Optional[RankingLog] = None,
+    cascade_stats: Optional[CascadeTracker] = None,
 ) -> List[Recommendation]:
-    by_name: Dict[str, CandidateRestaurant] = {_normalize_name(c.name): c for c in candidates}
-    used: set[str] = set()
+    """
+    Async counterpart of ``recommend_with_explanations`` with the same
+    caching and fallback behaviour. ``settings.timeout_s`` bounds the whole
+    LLM call, including time queued behind the client's concurrency limit.
+    A call still running at the ``deadline`` goes on as a task on the
+    running loop, or is cancelled when ``background.MAX_BACKGROUND_CALLS``
+    calls already do. With ``settings.fast_model``, each model in the cascade
+    gets its own ``timeout_s``.
+    """
+    plan = _plan(preference, candidates, settings, ranking_cache, snippets, ranker, ranking_log)
+    if plan.result is not None:
+        return plan.result
 
-    out: List[Recommendation] = []
-    for rec in sorted(parsed.recommendations, key=lambda r: r.rank):
+    client = client or AsyncXAIChatCompletionsClient(max_tokens=_max_tokens(plan, settings))
+    if not client_ready(client):
+        return _fallback(preference, plan, snippets)
+    messages = _messages(preference, plan, settings)
+    deadline = deadline if deadline is not None else background.deadline_after(settings.deadline_s)
+
+    async def generate(model: str) -> str:
+        return await asyncio.wait_for(
+            client.agenerate(model=model, messages=messages, timeout_s=settings.timeout_s),
+            timeout=settings.timeout_s,
+        )
+
+    async def large() -> Tuple[str, str]:
+        return await generate(settings.model), settings.model
+
+    if settings.fast_model is None:
+        call = asyncio.ensure_future(large())
+    else:
+        call = asyncio.ensure_future(_acascade(preference, plan, settings, generate, cascade_stats))
+    try:
+        if deadline is None:
+            answer = await call
+        else:
+            answer = await asyncio.wait_for(asyncio.shield(call), timeout=background.remaining(deadline))
+        return _finish(preference, plan, answer, ranking_cache, snippets)
+    except asyncio.TimeoutError:
+        if not call.done():
+            if background.claim_late_slot():
+                _late_tasks.add(call)
+                call.add_done_callback(_late_tasks.discard)
+                call.add_done_callback(lambda t: _remember_late(plan, t, ranking_cache))
+                call.add_done_callback(lambda t: background.release_late_slot())
+            else:
+                call.cancel()
+        return _fallback(preference, plan, snippets)
+    except Exception:
+        return _fallback(preference, plan, snippets)
+
+
+# Calls that outlived their request; the loop only keeps weak references to tasks.
+_late_tasks: set = set()
+
+
+class _Assembler:
+    """Builds the final list one LLM item at a time: known candidates only, no repeats, ranks 1..desired."""
+
+    def __init__(
+        self,
+        preference: Any,
+        candidates: Sequence[CandidateRestaurant],
+        desired: int,
+        snippets: Optional["SnippetStore"] = None,
+        model: Optional[str] = None,
+    ):
+        self.preference = preference
+        self.snippets = snippets
+        self.model = model  # set on the items taken from the LLM's answer
+        self.candidates = candidates
+        self.desired = desired
+        self.by_name: Dict[str, CandidateRestaurant] = {_normalize_name(c.name): c for c in candidates}
+        self.used: set[str] = set()
+        self.out: List[Recommendation] = []
+
+    @property
+    def full(self) -> bool:
+        return len(self.out) >= self.desired
+
+    def add(self, rec: Recommendation) -> Optional[Recommendation]:
+        """Accept one parsed item; returns the final recommendation, or None if it was dropped."""
         key = _normalize_name(rec.restaurant_name)
-        cand = by_name.get(key)
-        if not cand or key in used:
-            continue
-        used.add(key)
+        cand = self.by_name.get(key)
+        if self.full or not cand or key in self.used:
+            return None
+        self.used.add(key)
 
-        explanation = rec.explanation or _template_explanation(preference, cand)
+        explanation = rec.explanation or _snippet_explanation(self.preference, cand, self.snippets)
         attrs = dict(rec.attributes or {})
         # Ensure some useful fields are present.
         attrs.setdefault("cuisines", cand.cuisines)
@@ -146,34 +645,52 @@ def _postprocess(
         attrs.setdefault("approx_cost", cand.approx_cost)
         attrs.setdefault("location", cand.location)
 
-        out.append(
-            Recommendation(
-                rank=len(out) + 1,
-                restaurant_name=cand.name,
-                explanation=explanation,
-                attributes=attrs,
-            )
+        out = Recommendation(
+            rank=len(self.out) + 1,
+            restaurant_name=cand.name,
+            explanation=explanation,
+            attributes=attrs,
+            model=self.model,
         )
-        if len(out) >= desired:
-            break
+        self.out.append(out)
+        return out
 
-    # If LLM returned fewer valid items, fill from remaining candidates.
-    if len(out) < desired:
-        for cand in candidates:
+    def fill(self) -> List[Recommendation]:
+        """Top up from the remaining candidates in retrieval order; returns what was added."""
+        added: List[Recommendation] = []
+        for cand in self.candidates:
+            if self.full:
+                break
             key = _normalize_name(cand.name)
-            if key in used:
+            if key in self.used:
                 continue
-            used.add(key)
-            out.append(
-                Recommendation(
-                    rank=len(out) + 1,
-                    restaurant_name=cand.name,
-                    explanation=_template_explanation(preference, cand),
-                    attributes={"cuisines": cand.cuisines, "rating": cand.rating_numeric or cand.rate, "approx_cost": cand.approx_cost, "location": cand.location},
-                )
+            self.used.add(key)
+            rec = Recommendation(
+                rank=len(self.out) + 1,
+                restaurant_name=cand.name,
+                explanation=_snippet_explanation(self.preference, cand, self.snippets),
+                attributes={"cuisines": cand.cuisines, "rating": cand.rating_numeric or cand.rate, "approx_cost": cand.approx_cost, "location": cand.location},
             )
-            if len(out) >= desired:
-                break
+            self.out.append(rec)
+            added.append(rec)
+        return added
 
-    return out
 
+def _postprocess(
+    *,
+    preference: Any,
+    candidates: Sequence[CandidateRestaurant],
+    parsed: ParsedLLMResult,
+    desired: int,
+    snippets: Optional["SnippetStore"] = None,
+    model: Optional[str] = None,
+) -> List[Recommendation]:
+    assembler = _Assembler(preference, candidates, desired, snippets, model)
+    for rec in sorted(parsed.recommendations, key=lambda r: r.rank):
+        assembler.add(rec)
+        if assembler.full:
+            break
+
+    # If LLM returned fewer valid items, fill from remaining candidates.
+    assembler.fill()
+    return assembler.out
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence
+
+from .models import LLMError
+from .xai_client import LLMClient, client_ready, stream_text
+
+
+@dataclass(frozen=True)
+class Backend:
+    name: str
+    client: Any  # an LLMClient, e.g. XAIChatCompletionsClient(base_url=..., api_key_env=..., base_url_env=None)
+    model: Optional[str] = None  # model name on this backend; None = the one asked for
+
+
+@dataclass(frozen=True)
+class BackendStats:
+    name: str
+    latency_ms: Optional[float]  # EWMA of successful calls
+    p90_ms: Optional[float]
+    error_rate: float  # EWMA of failures (0..1)
+    calls: int
+    errors: int
+    healthy: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "latency_ms": None if self.latency_ms is None else round(self.latency_ms, 1),
+            "p90_ms": None if self.p90_ms is None else round(self.p90_ms, 1),
+            "error_rate": round(self.error_rate, 4),
+            "calls": self.calls,
+            "errors": self.errors,
+            "healthy": self.healthy,
+        }
+
+
+class _Health:
+    """Running numbers for one backend; guarded by the router's lock."""
+
+    def __init__(self, window: int):
+        self.latency_s: Optional[float] = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.last_error_at = 0.0
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+    def p90(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(0.9 * len(ordered)) - 1)]
+
+
+class RoutingLLMClient(LLMClient):
+    """
+    Sends each call to the fastest healthy backend among several
+    OpenAI-compatible ones, failing over to the next on errors.
+
+    Per backend it keeps an EWMA (weight ``alpha``) of the latency of
+    successful calls and of the error rate. A backend whose error rate
+    reaches ``max_error_rate`` is skipped until ``retry_after_s`` has passed
+    since its last error; untried backends go first so every one gets
+    measured. If no backend is healthy, all are tried, best first.
+
+    With ``hedge=True``, a call still running after the primary's p90
+    latency (once ``hedge_min_samples`` calls are known) is also sent to
+    the next backend, and the first answer wins; the slower call finishes
+    in the background and still updates the numbers.
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[Backend],
+        *,
+        alpha: float = 0.3,
+        max_error_rate: float = 0.5,
+        retry_after_s: float = 30.0,
+        hedge: bool = False,
+        hedge_min_samples: int = 20,
+        window: int = 100,
+        max_workers: int = 32,
+    ):
+        if not backends:
+            raise ValueError("RoutingLLMClient needs at least one backend")
+        if len({b.name for b in backends}) != len(backends):
+            raise ValueError("Backend names must be unique")
+        self.backends = list(backends)
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.retry_after_s = retry_after_s
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.temperature = getattr(self.backends[0].client, "temperature", None)
+        self._lock = threading.Lock()
+        self._health: Dict[str, _Health] = {b.name: _Health(window) for b in self.backends}
+        self._hedges = 0
+        # Hedged calls run here so the caller can stop waiting on a slow one.
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-route") if hedge else None
+
+    def ready(self) -> bool:
+        return any(client_ready(b.client) for b in self.backends)
+
+    def _healthy(self, health: _Health, now: float) -> bool:
+        return health.error_rate < self.max_error_rate or now - health.last_error_at >= self.retry_after_s
+
+    def ranked(self) -> List[Backend]:
+        """Ready backends in the order they would be tried."""
+        now = time.monotonic()
+        with self._lock:
+
+            def key(b: Backend) -> tuple:
+                h = self._health[b.name]
+                return (not self._healthy(h, now), h.latency_s is not None, h.latency_s or 0.0, h.error_rate)
+
+            return sorted((b for b in self.backends if client_ready(b.client)), key=key)
+
+    def _record(self, backend: Backend, latency_s: Optional[float]) -> None:
+        """``latency_s`` of a successful call, or None for a failure."""
+        a = self.alpha
+        with self._lock:
+            h = self._health[backend.name]
+            h.calls += 1
+            if latency_s is None:
+                h.errors += 1
+                h.error_rate = (1 - a) * h.error_rate + a
+                h.last_error_at = time.monotonic()
+                return
+            h.error_rate = (1 - a) * h.error_rate
+            h.latency_s = latency_s if h.latency_s is None else (1 - a) * h.latency_s + a * latency_s
+            h.latencies.append(latency_s)
+
+    def _call(self, backend: Backend, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        start = time.monotonic()
+        try:
+            raw = backend.client.generate(model=backend.model or model, messages=messages, timeout_s=timeout_s)
+        except Exception:
+            self._record(backend, None)
+            raise
+        self._record(backend, time.monotonic() - start)
+        return raw
+
+    def _hedge_delay(self, backend: Backend) -> Optional[float]:
+        with self._lock:
+            h = self._health[backend.name]
+            return h.p90() if len(h.latencies) >= self.hedge_min_samples else None
+
+    def generate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        order = self.ranked()
+        if not order:
+            raise LLMError("No LLM backend is ready")
+        if self.hedge and len(order) > 1:
+            return self._generate_hedged(order, model, messages, timeout_s)
+
+        errors: List[str] = []
+        for backend in order:
+            try:
+                return self._call(backend, model, messages, timeout_s)
+            except Exception as e:
+                errors.append(f"{backend.name}: {e}")
+        raise LLMError("All LLM backends failed: " + "; ".join(errors))
+
+    def _generate_hedged(self, order: List[Backend], model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        start = time.monotonic()
+        hedge_after = self._hedge_delay(order[0])
+        queue = list(order)
+        pending: Dict[Future, Backend] = {}
+
+        def submit() -> None:
+            backend = queue.pop(0)
+            pending[self._executor.submit(self._call, backend, model, messages, timeout_s)] = backend
+
+        submit()
+        hedged = False
+        errors: List[str] = []
+        while pending:
+            wait_s = None
+            if not hedged and hedge_after is not None and queue:
+                wait_s = max(0.0, start + hedge_after - time.monotonic())
+            done, _ = wait(list(pending), timeout=wait_s, return_when=FIRST_COMPLETED)
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    errors.append(f"{backend.name}: {e}")
+            if not queue:
+                continue
+            if not done:  # the primary is slower than its p90
+                hedged = True
+                with self._lock:
+                    self._hedges += 1
+                submit()
+            elif not pending:  # everything in flight failed
+                submit()
+        raise LLMError("All LLM backends failed: " + "; ".join(errors))
+
+    def stream(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> Iterator[str]:
+        """Streams from the best backend; fails over only before the first piece arrives."""
+        errors: List[str] = []
+        for backend in self.ranked():
+            start = time.monotonic()
+            pieces = stream_text(backend.client, model=backend.model or model, messages=messages, timeout_s=timeout_s)
+            try:
+                first = next(pieces, None)
+            except Exception as e:
+                self._record(backend, None)
+                errors.append(f"{backend.name}: {e}")
+                continue
+            self._record(backend, time.monotonic() - start)
+            if first is not None:
+                yield first
+            yield from pieces
+            return
+        raise LLMError("All LLM backends failed: " + "; ".join(errors) if errors else "No LLM backend is ready")
+
+    @property
+    def hedges(self) -> int:
+        return self._hedges
+
+    def stats(self) -> List[BackendStats]:
+        now = time.monotonic()
+        with self._lock:
+            out = []
+            for b in self.backends:
+                h = self._health[b.name]
+                p90 = h.p90()
+                out.append(
+                    BackendStats(
+                        name=b.name,
+                        latency_ms=None if h.latency_s is None else h.latency_s * 1000,
+                        p90_ms=None if p90 is None else p90 * 1000,
+                        error_rate=h.error_rate,
+                        calls=h.calls,
+                        errors=h.errors,
+                        healthy=self._healthy(h, now),
+                    )
+                )
+            return out
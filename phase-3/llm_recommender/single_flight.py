@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from .async_client import AsyncLLMClient
+from .cache import cache_key
+from .models import LLMError
+from .xai_client import LLMClient, client_ready
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    calls: int  # calls that ran
+    shared: int  # callers that waited on another caller's call instead
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"calls": self.calls, "shared": self.shared}
+
+
+class SingleFlight:
+    """
+    At most one call per key is in flight; identical concurrent callers
+    wait for it and share its result or exception.
+
+    Waiters may be threads (``do``) or asyncio tasks on any event loop
+    (``ado``), and the two kinds share flights. Nothing is kept once a call
+    finishes; caching results is the job of ``ResponseCache``.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[str, concurrent.futures.Future] = {}
+        self._calls = 0
+        self._shared = 0
+
+    def _join(self, key: str) -> Tuple[concurrent.futures.Future, bool]:
+        """The future for ``key`` and whether the caller must run the call."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self._shared += 1
+                return future, False
+            future = self._flights[key] = concurrent.futures.Future()
+            self._calls += 1
+            return future, True
+
+    def _land(self, key: str, future: concurrent.futures.Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            del self._flights[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], T], timeout_s: Optional[float] = None) -> T:
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(timeout=timeout_s)
+        try:
+            result = fn()
+        except BaseException as e:
+            self._land(key, future, error=e)
+            raise
+        self._land(key, future, result=result)
+        return result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]], timeout_s: Optional[float] = None) -> T:
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=timeout_s)
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Waiters did not ask for the cancellation; give them an ordinary failure.
+            self._land(key, future, error=LLMError("Shared LLM request was cancelled"))
+            raise
+        except BaseException as e:
+            self._land(key, future, error=e)
+            raise
+        self._land(key, future, result=result)
+        return result
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(calls=self._calls, shared=self._shared)
+
+
+class SingleFlightLLMClient(LLMClient, AsyncLLMClient):
+    """
+    LLMClient wrapper that coalesces identical concurrent prompts, keyed
+    like ``CachingLLMClient``. Put it under the cache so that only misses
+    are coalesced. ``agenerate`` needs an async ``inner``.
+
+    Streams are not shared: ``stream`` goes straight to ``inner``.
+    """
+
+    def __init__(self, inner: Any, flight: Optional[SingleFlight] = None):
+        self.inner = inner
+        self.flight = flight or SingleFlight()
+        self.temperature = getattr(inner, "temperature", None)
+
+    def ready(self) -> bool:
+        return client_ready(self.inner)
+
+    def _key(self, model: str, messages: List[Dict[str, str]]) -> str:
+        return cache_key(model, self.temperature, messages)
+
+    def generate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        try:
+            return self.flight.do(
+                self._key(model, messages),
+                lambda: self.inner.generate(model=model, messages=messages, timeout_s=timeout_s),
+                timeout_s=timeout_s,
+            )
+        except concurrent.futures.TimeoutError as e:
+            raise LLMError(f"Shared LLM request did not finish within {timeout_s}s") from e
+
+    async def agenerate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        try:
+            return await self.flight.ado(
+                self._key(model, messages),
+                lambda: self.inner.agenerate(model=model, messages=messages, timeout_s=timeout_s),
+                timeout_s=timeout_s,
+            )
+        except asyncio.TimeoutError as e:
+            raise LLMError(f"Shared LLM request did not finish within {timeout_s}s") from e
+
+    def stream(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> Iterator[str]:
+        stream = getattr(self.inner, "stream", None)
+        if stream is None:
+            yield self.generate(model=model, messages=messages, timeout_s=timeout_s)
+        else:
+            yield from stream(model=model, messages=messages, timeout_s=timeout_s)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .models import CandidateRestaurant, RecommendSettings
+from .parser import IncrementalArrayParser, _candidate_number
+from .prompting import OUTPUT_TOKENS_BASE, build_snippet_messages
+from .recommender import _coerce_candidates, _normalize_name
+from .xai_client import LLMClient
+
+SNIPPETS_FORMAT_VERSION = 1
+DEFAULT_CHUNK_SIZE = 20
+# One sentence of at most 20 words plus the {"i":n,"snippet":...} wrapping.
+SNIPPET_TOKENS_PER_ITEM = 40
+
+
+def snippet_key(candidate: CandidateRestaurant) -> str:
+    """One entry per restaurant: the dataset lists a place once per browse category."""
+    return _normalize_name(candidate.name) + "|" + _normalize_name(candidate.location or "")
+
+
+def snippet_fingerprint(candidate: CandidateRestaurant) -> str:
+    """Hash of the fields a snippet is written from; a changed record makes its snippet stale."""
+    fields = [candidate.name, candidate.location, candidate.cuisines, candidate.rest_type, candidate.dish_liked]
+    payload = json.dumps([f or "" for f in fields], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def snippet_token_budget(chunk_size: int) -> int:
+    """``max_tokens`` for a batch answer covering ``chunk_size`` restaurants."""
+    return OUTPUT_TOKENS_BASE + SNIPPET_TOKENS_PER_ITEM * max(1, chunk_size)
+
+
+class SnippetStore:
+    """
+    Precomputed, user-independent explanation snippets, one per restaurant.
+
+    Saved as a JSON file next to the data snapshot and loaded at startup.
+    ``get`` only returns a snippet written from the candidate's current
+    fields, so a refreshed dataset never shows a blurb for different dishes.
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, candidate: CandidateRestaurant) -> Optional[str]:
+        entry = self._entries.get(snippet_key(candidate))
+        if entry is None or entry["fp"] != snippet_fingerprint(candidate):
+            return None
+        return entry["text"]
+
+    def put(self, candidate: CandidateRestaurant, text: str) -> None:
+        with self._lock:
+            self._entries[snippet_key(candidate)] = {"fp": snippet_fingerprint(candidate), "text": text}
+
+    def missing(self, candidates: Iterable[CandidateRestaurant]) -> List[CandidateRestaurant]:
+        """Distinct restaurants (first record of each) without a current snippet."""
+        out: List[CandidateRestaurant] = []
+        seen: set[str] = set()
+        for c in candidates:
+            key = snippet_key(c)
+            if key in seen:
+                continue
+            seen.add(key)
+            if self.get(c) is None:
+                out.append(c)
+        return out
+
+    @classmethod
+    def load(cls, path: str) -> "SnippetStore":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SNIPPETS_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snippets file version: {data.get('version')!r}")
+        store = cls(model=data.get("model"))
+        store._entries = {k: {"fp": v["fp"], "text": v["text"]} for k, v in data["snippets"].items()}
+        return store
+
+    def save(self, path: str) -> None:
+        """Write atomically, so a server loading the file never sees half of it."""
+        with self._lock:
+            data = {"version": SNIPPETS_FORMAT_VERSION, "model": self.model, "snippets": dict(sorted(self._entries.items()))}
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=0)
+            os.replace(tmp, path)
+
+
+@dataclass(frozen=True)
+class SnippetBatchStats:
+    restaurants: int  # distinct restaurants in the input
+    reused: int  # already had a current snippet
+    generated: int
+    failed: int  # in chunks whose call failed or whose answer left them out
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"restaurants": self.restaurants, "reused": self.reused, "generated": self.generated, "failed": self.failed}
+
+
+def _snippets_for_chunk(
+    chunk: Sequence[CandidateRestaurant],
+    client: LLMClient,
+    settings: RecommendSettings,
+    store: SnippetStore,
+) -> int:
+    """Ask for one chunk and store what came back; returns how many snippets were stored."""
+    raw = client.generate(model=settings.model, messages=build_snippet_messages(chunk), timeout_s=settings.timeout_s)
+    stored: set[int] = set()
+    # The incremental parser tolerates prose around the array and a cut-off tail.
+    for item in IncrementalArrayParser().feed(raw):
+        if not isinstance(item, dict):
+            continue
+        number = _candidate_number(item.get("i"))
+        text = item.get("snippet")
+        if number is None or not 1 <= number <= len(chunk) or not isinstance(text, str) or not text.strip():
+            continue
+        store.put(chunk[number - 1], " ".join(text.split()))
+        stored.add(number)
+    return len(stored)
+
+
+def precompute_snippets(
+    records: Iterable[Any],
+    client: LLMClient,
+    *,
+    store: Optional[SnippetStore] = None,
+    settings: RecommendSettings = RecommendSettings(),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = 4,
+    on_chunk: Optional[Callable[[SnippetStore], None]] = None,
+) -> SnippetBatchStats:
+    """
+    Offline batch job: write a snippet for every distinct restaurant in ``records``.
+
+    Restaurants that already have a current snippet in ``store`` are
+    skipped, so an interrupted run resumes where it stopped. The rest go to
+    the LLM ``chunk_size`` at a time, ``max_workers`` calls in parallel. A
+    failed chunk is counted and left for the next run. ``on_chunk`` is
+    called after each chunk (e.g. to save progress).
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    store = store if store is not None else SnippetStore(model=settings.model)
+    candidates = _coerce_candidates(records)
+    todo = store.missing(candidates)
+    restaurants = len({snippet_key(c) for c in candidates})
+    chunks = [todo[i : i + chunk_size] for i in range(0, len(todo), chunk_size)]
+
+    def run(chunk: Sequence[CandidateRestaurant]) -> int:
+        try:
+            stored = _snippets_for_chunk(chunk, client, settings, store)
+        except Exception:
+            stored = 0
+        if on_chunk is not None:
+            on_chunk(store)
+        return stored
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        generated = sum(pool.map(run, chunks))
+
+    return SnippetBatchStats(
+        restaurants=restaurants,
+        reused=restaurants - len(todo),
+        generated=generated,
+        failed=len(todo) - generated,
+    )
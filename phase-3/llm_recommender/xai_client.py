@@ -5,9 +5,10 @@ import os
 import time
 import urllib.error
 import urllib.request
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from .http_pool import HTTPConnectionPool
 from .models import LLMError
 
 
@@ -15,6 +16,47 @@ class LLMClient:
     def generate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
         raise NotImplementedError
 
+    def ready(self) -> bool:
+        """False when a call is sure to fail (no API key, open circuit), so callers can skip building the prompt."""
+        return True
+
+    def stream(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> Iterator[str]:
+        """Response text in pieces as it is generated; clients without streaming yield it whole."""
+        yield self.generate(model=model, messages=messages, timeout_s=timeout_s)
+
+
+def client_ready(client: Any) -> bool:
+    """``client.ready()``; clients without it are assumed ready."""
+    ready = getattr(client, "ready", None)
+    return True if ready is None else bool(ready())
+
+
+def stream_text(client: Any, **kwargs: Any) -> Iterator[str]:
+    """``client.stream(...)``, or the whole ``generate(...)`` answer for clients without it."""
+    stream = getattr(client, "stream", None)
+    if stream is None:
+        yield client.generate(**kwargs)
+    else:
+        yield from stream(**kwargs)
+
+
+def sse_deltas(lines: Iterable[bytes]) -> Iterator[str]:
+    """Content deltas from a Chat Completions ``stream=true`` (server-sent events) body."""
+    for line in lines:
+        text = line.decode("utf-8").strip()
+        if not text.startswith("data:"):
+            continue
+        data = text[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        try:
+            delta = json.loads(data)["choices"][0].get("delta") or {}
+        except Exception as e:
+            raise LLMError(f"Unexpected XAI stream event: {e}") from e
+        content = delta.get("content")
+        if content:
+            yield content
+
 
 @dataclass(frozen=True)
 class XAIChatCompletionsClient(LLMClient):
@@ -24,35 +66,107 @@ class XAIChatCompletionsClient(LLMClient):
     Env:
     - XAI_API_KEY (required for real calls)
     - XAI_BASE_URL (optional, default https://api.x.ai/v1)
+
+    Any OpenAI-compatible server works: point ``base_url`` at it and name
+    its key variable in ``api_key_env`` (None for a server without keys).
+    ``base_url_env=None`` keeps ``base_url`` from being overridden.
+
+    With a ``pool``, requests reuse keep-alive connections instead of
+    paying a TCP+TLS handshake per call.
     """
 
     api_key: Optional[str] = None
     base_url: str = "https://api.x.ai/v1"
+    temperature: float = 0.2
+    max_tokens: Optional[int] = None  # cap on generated tokens (see prompting.output_token_budget)
+    pool: Optional[HTTPConnectionPool] = field(default=None, compare=False)
+    api_key_env: Optional[str] = "XAI_API_KEY"
+    base_url_env: Optional[str] = "XAI_BASE_URL"
 
-    def generate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
-        api_key = self.api_key or os.environ.get("XAI_API_KEY")
-        if not api_key:
-            raise LLMError("XAI_API_KEY is not set")
+    def _api_key(self) -> Optional[str]:
+        return self.api_key or (os.environ.get(self.api_key_env) if self.api_key_env else None)
+
+    def ready(self) -> bool:
+        return self.api_key_env is None or bool(self._api_key())
+
+    def _url(self) -> str:
+        base_url = os.environ.get(self.base_url_env, self.base_url) if self.base_url_env else self.base_url
+        return f"{base_url.rstrip('/')}/chat/completions"
 
-        base_url = os.environ.get("XAI_BASE_URL", self.base_url).rstrip("/")
-        url = f"{base_url}/chat/completions"
+    def prewarm(self, connections: int = 1) -> int:
+        """Open pooled connections ahead of the first request; returns how many were opened."""
+        if self.pool is None:
+            return 0
+        return self.pool.prewarm(self._url(), connections)
+
+    def _payload(self, model: str, messages: List[Dict[str, str]], stream: bool = False) -> Tuple[bytes, Dict[str, str]]:
+        api_key = self._api_key()
+        if not api_key and self.api_key_env is not None:
+            raise LLMError(f"{self.api_key_env} is not set")
 
         body: Dict[str, Any] = {
             "model": model,
             "messages": messages,
-            "temperature": 0.2,
+            "temperature": self.temperature,
         }
+        if self.max_tokens is not None:
+            body["max_tokens"] = self.max_tokens
+        if stream:
+            body["stream"] = True
+
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        return json.dumps(body).encode("utf-8"), headers
+
+    def generate(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> str:
+        url = self._url()
+        data, headers = self._payload(model, messages)
+        if self.pool is not None:
+            raw = self._send_pooled(url, data, headers, timeout_s)
+        else:
+            raw = self._send(url, data, headers, timeout_s)
+
+        try:
+            payload = json.loads(raw)
+            return payload["choices"][0]["message"]["content"]
+        except Exception as e:
+            raise LLMError(f"Unexpected XAI response shape: {e}") from e
+
+    def stream(self, *, model: str, messages: List[Dict[str, str]], timeout_s: float) -> Iterator[str]:
+        url = self._url()
+        data, headers = self._payload(model, messages, stream=True)
+        try:
+            if self.pool is not None:
+                with self.pool.open_stream("POST", url, body=data, headers=headers, timeout_s=timeout_s) as resp:
+                    if resp.status >= 400:
+                        detail = resp.read().decode("utf-8", errors="replace")
+                        raise LLMError(f"XAI HTTP error {resp.status}: {detail}")
+                    yield from sse_deltas(resp)
+                    resp.read()  # drain the rest so the connection can be reused
+            else:
+                req = urllib.request.Request(url, method="POST", data=data, headers=headers)
+                with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+                    yield from sse_deltas(resp)
+        except LLMError:
+            raise
+        except urllib.error.HTTPError as e:
+            raise LLMError(f"XAI HTTP error {e.code}: {e.reason}") from e
+        except Exception as e:
+            raise LLMError(f"XAI request failed: {e}") from e
 
-        data = json.dumps(body).encode("utf-8")
-        req = urllib.request.Request(
-            url,
-            method="POST",
-            data=data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-        )
+    def _send_pooled(self, url: str, data: bytes, headers: Dict[str, str], timeout_s: float) -> str:
+        try:
+            status, payload = self.pool.request("POST", url, body=data, headers=headers, timeout_s=timeout_s)
+        except Exception as e:
+            raise LLMError(f"XAI request failed: {e}") from e
+        text = payload.decode("utf-8", errors="replace")
+        if status >= 400:
+            raise LLMError(f"XAI HTTP error {status}: {text}")
+        return text
+
+    def _send(self, url: str, data: bytes, headers: Dict[str, str], timeout_s: float) -> str:
+        req = urllib.request.Request(url, method="POST", data=data, headers=headers)
 
         start = time.time()
         try:
@@ -69,10 +183,5 @@ class XAIChatCompletionsClient(LLMClient):
             raise LLMError(f"XAI request failed: {e}") from e
         finally:
             _ = time.time() - start
-
-        try:
-            payload = json.loads(raw)
-            return payload["choices"][0]["message"]["content"]
-        except Exception as e:
-            raise LLMError(f"Unexpected XAI response shape: {e}") from e
+        return raw
 
@@ -1,7 +1,101 @@
+import json
 import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
+import pytest
+
 # Ensure `llm_recommender` is importable when running tests directly in phase-3.
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    OpenAI-compatible /chat/completions stub. Answers with the server's name
+    (or, for an unnamed server, echoes the last message) after its delay;
+    streams when asked. Paths under /fail/ and servers with ``fail`` set
+    return errors.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with server.lock:
+            server.calls += 1
+            server.models.append(request.get("model"))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            delay = server.delays.pop(0) if server.delays else server.delay_s
+        time.sleep(delay)
+        with server.lock:
+            server.in_flight -= 1
+        if self.path.startswith("/fail/"):
+            payload, status = b'{"error": "nope"}', 500
+        elif server.fail:
+            payload, status = b'{"error": "overloaded"}', 503
+        elif request.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for piece in ("str", "eam", "ed"):
+                event = json.dumps({"choices": [{"delta": {"content": piece}}]})
+                data = f"data: {event}\n\n".encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            data = b"data: [DONE]\n\n"
+            self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(data), data))
+            return
+        else:
+            content = server.name if server.name is not None else request.get("messages", [{}])[-1].get("content", "ok")
+            payload, status = json.dumps({"choices": [{"message": {"content": content}}]}).encode(), 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        if server.close_after_response:
+            # Drop the socket without announcing it, like an idle timeout on the server.
+            self.close_connection = True
+
+
+@pytest.fixture
+def stubs():
+    """Factory for stub LLM servers: ``stubs(name=None, delay_s=0.0, fail=False)``."""
+    servers = []
+
+    def start(name=None, delay_s=0.0, fail=False):
+        srv = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        srv.daemon_threads = True
+        srv.name, srv.delay_s, srv.fail = name, delay_s, fail
+        srv.delays, srv.models, srv.calls, srv.lock = [], [], 0, threading.Lock()
+        srv.in_flight = srv.max_in_flight = srv.connections = 0
+        srv.close_after_response = False
+        original = srv.process_request
+
+        def counting(request, client_address):
+            with srv.lock:
+                srv.connections += 1
+            original(request, client_address)
+
+        srv.process_request = counting
+        threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        servers.append(srv)
+        return srv
+
+    yield start
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
+
+
+@pytest.fixture
+def server(stubs):
+    return stubs()
@@ -0,0 +1,153 @@
+import asyncio
+import json
+
+import pytest
+
+from llm_recommender.async_client import AsyncLLMClient, AsyncXAIChatCompletionsClient, ThreadedAsyncLLMClient
+from llm_recommender.cache import ResponseCache
+from llm_recommender.models import CandidateRestaurant, LLMError, RecommendSettings
+from llm_recommender.recommender import recommend_with_explanations, recommend_with_explanations_async
+
+CANDIDATES = [
+    CandidateRestaurant(name="Onesta", cuisines="Italian", rate="4.6/5", location="Banashankari"),
+    CandidateRestaurant(name="Jalsa", cuisines="North Indian", rate="4.1/5", location="Banashankari"),
+]
+LLM_JSON = json.dumps([{"rank": 1, "restaurant_name": "Jalsa", "explanation": "Great."}])
+SETTINGS = RecommendSettings(max_results=1, timeout_s=2)
+
+
+class SlowAsyncClient(AsyncLLMClient):
+    def __init__(self, response=LLM_JSON, delay_s=0.05, limit=None):
+        self.response = response
+        self.delay_s = delay_s
+        self.sem = asyncio.Semaphore(limit) if limit else None
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def agenerate(self, *, model, messages, timeout_s):
+        if self.sem is not None:
+            async with self.sem:
+                return await self._call()
+        return await self._call()
+
+    async def _call(self):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay_s)
+        finally:
+            self.in_flight -= 1
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+class SyncClient:
+    def __init__(self, response):
+        self.response = response
+
+    def generate(self, *, model, messages, timeout_s):
+        return self.response
+
+
+def _run(client, **kwargs):
+    return recommend_with_explanations_async(
+        preference={"max_results": 1}, candidates=CANDIDATES, client=client, settings=SETTINGS, **kwargs
+    )
+
+
+def test_async_matches_sync_result():
+    sync_out = recommend_with_explanations(
+        preference={"max_results": 1}, candidates=CANDIDATES, client=SyncClient(LLM_JSON), settings=SETTINGS
+    )
+    async_out = asyncio.run(_run(SlowAsyncClient()))
+    assert async_out == sync_out
+    assert async_out[0].restaurant_name == "Jalsa"
+
+
+@pytest.mark.parametrize("client", [SlowAsyncClient(LLMError("boom")), SlowAsyncClient(delay_s=5), SlowAsyncClient("not json")])
+def test_failures_and_timeouts_fall_back_to_retrieval_order(client):
+    settings = RecommendSettings(max_results=1, timeout_s=0.1)
+    out = asyncio.run(
+        recommend_with_explanations_async(
+            preference={"max_results": 1}, candidates=CANDIDATES, client=client, settings=settings
+        )
+    )
+    assert [r.restaurant_name for r in out] == ["Onesta"]
+
+
+def test_many_calls_in_flight_under_limit():
+    client = SlowAsyncClient(limit=50)
+
+    async def main():
+        return await asyncio.gather(*(_run(client) for _ in range(200)))
+
+    results = asyncio.run(main())
+    assert all(r[0].restaurant_name == "Jalsa" for r in results)
+    assert client.peak == 50
+    assert client.calls == 200
+
+
+def test_ranking_cache_is_shared_with_async_path():
+    cache = ResponseCache()
+    client = SlowAsyncClient()
+    asyncio.run(_run(client, ranking_cache=cache))
+    asyncio.run(_run(client, ranking_cache=cache))
+    assert client.calls == 1
+
+
+def test_threaded_adapter_wraps_sync_client():
+    out = asyncio.run(_run(ThreadedAsyncLLMClient(SyncClient(LLM_JSON))))
+    assert out[0].explanation == "Great."
+
+
+async def _stub_server(state):
+    """Minimal chat-completions endpoint answering with a chunked body after a short delay."""
+
+    async def handle(reader, writer):
+        headers = {}
+        await reader.readline()
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = json.loads(await reader.readexactly(int(headers["content-length"])))
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.02)
+        state["in_flight"] -= 1
+        payload = json.dumps({"choices": [{"message": {"content": body["messages"][-1]["content"]}}]}).encode()
+        half = len(payload) // 2
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nTransfer-Encoding: chunked\r\n\r\n")
+        for chunk in (payload[:half], payload[half:]):
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def test_xai_async_client_against_stub_server(monkeypatch):
+    monkeypatch.delenv("XAI_BASE_URL", raising=False)
+    state = {"in_flight": 0, "peak": 0}
+
+    async def main():
+        server = await _stub_server(state)
+        port = server.sockets[0].getsockname()[1]
+        client = AsyncXAIChatCompletionsClient(api_key="k", base_url=f"http://127.0.0.1:{port}/v1", max_concurrency=4)
+        async with server:
+            return await asyncio.gather(
+                *(
+                    client.agenerate(model="m", messages=[{"role": "user", "content": f"msg {i}"}], timeout_s=2)
+                    for i in range(20)
+                )
+            )
+
+    out = asyncio.run(main())
+    assert out == [f"msg {i}" for i in range(20)]
+    assert state["peak"] <= 4
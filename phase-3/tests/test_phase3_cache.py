@@ -0,0 +1,175 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from llm_recommender.cache import CachingLLMClient, ResponseCache, cache_key
+from llm_recommender.models import CandidateRestaurant, LLMError, RecommendSettings
+from llm_recommender.recommender import recommend_with_explanations
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class CountingClient:
+    def __init__(self, response: str = "[]", temperature: float = 0.2):
+        self.response = response
+        self.temperature = temperature
+        self.calls = 0
+
+    def generate(self, *, model: str, messages, timeout_s: float) -> str:
+        self.calls += 1
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+def test_repeat_prompt_is_served_from_memory():
+    inner = CountingClient("answer")
+    client = CachingLLMClient(inner, ResponseCache(), validate=None)
+    assert client.generate(model="m", messages=MESSAGES, timeout_s=1) == "answer"
+    assert client.generate(model="m", messages=MESSAGES, timeout_s=1) == "answer"
+    assert inner.calls == 1
+    stats = client.cache.stats()
+    assert (stats.memory_hits, stats.misses, stats.hit_rate) == (1, 1, 0.5)
+
+
+def test_key_covers_model_temperature_and_messages():
+    base = cache_key("m", 0.2, MESSAGES)
+    assert base == cache_key("m", 0.2, [dict(MESSAGES[0])])
+    assert base != cache_key("other", 0.2, MESSAGES)
+    assert base != cache_key("m", 0.7, MESSAGES)
+    assert base != cache_key("m", 0.2, [{"role": "user", "content": "hi!"}])
+
+
+KEY_SCRIPT = """
+from llm_recommender.cache import cache_key
+from llm_recommender.models import CandidateRestaurant
+from llm_recommender.prompting import build_messages
+
+pref = {"city": "Banashankari", "cuisine": "Chinese", "price_max": 800, "min_rating": 4.0, "online_order": True}
+cands = [CandidateRestaurant(name="A", cuisines="Chinese", rate="4.1/5")]
+for compact in (False, True):
+    print(cache_key("m", 0.2, build_messages(pref, cands, 1, compact=compact, index_output=True)))
+"""
+
+
+def test_key_is_the_same_across_processes():
+    # The disk tier is only useful if a restarted process builds the same keys.
+    root = str(Path(__file__).resolve().parents[1])
+    keys = set()
+    for seed in ("1", "2", "3"):
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=root)
+        out = subprocess.run([sys.executable, "-c", KEY_SCRIPT], env=env, capture_output=True, text=True, check=True)
+        keys.add(out.stdout)
+    assert len(keys) == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    first = ResponseCache(path=path)
+    first.put("k", "v")
+    first.close()
+
+    second = ResponseCache(path=path)
+    assert second.get("k") == "v"
+    assert second.get("k") == "v"
+    stats = second.stats()
+    assert (stats.disk_hits, stats.memory_hits) == (1, 1)
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    now = [1000.0]
+    cache = ResponseCache(
+        path=str(tmp_path / "llm.sqlite3"),
+        max_memory_entries=1,
+        max_disk_entries=2,
+        ttl_s=60,
+        clock=lambda: now[0],
+    )
+    for key in ("a", "b", "c"):
+        cache.put(key, key.upper())
+        now[0] += 1
+    assert cache.stats().disk_entries == 2
+    assert cache.get("a") is None  # least recently used, evicted
+    assert cache.get("b") == "B"   # from disk; memory only holds "c"
+
+    now[0] += 120
+    assert cache.get("c") is None
+
+
+def test_errors_are_not_cached():
+    inner = CountingClient(LLMError("boom"))
+    client = CachingLLMClient(inner, ResponseCache())
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            client.generate(model="m", messages=MESSAGES, timeout_s=1)
+    assert inner.calls == 2
+
+
+@pytest.mark.parametrize("bad", ["I cannot help with that.", '[{"i": 1, "why": "Cut o', "[]"])
+def test_answers_that_do_not_parse_are_not_cached(bad):
+    inner = CountingClient(bad)
+    client = CachingLLMClient(inner, ResponseCache())
+    for _ in range(3):
+        assert client.generate(model="m", messages=MESSAGES, timeout_s=1) == bad
+    assert inner.calls == 3
+    assert client.cache.stats().memory_entries == 0
+
+
+def test_streamed_answer_is_validated_before_caching():
+    class StreamingClient(CountingClient):
+        def stream(self, *, model, messages, timeout_s):
+            self.calls += 1
+            yield from (self.response[:5], self.response[5:])
+
+    good = json.dumps([{"i": 1, "why": "Great."}])
+    for answer, calls in ((good, 1), ("Sorry, no.", 2)):
+        inner = StreamingClient(answer)
+        client = CachingLLMClient(inner, ResponseCache())
+        for _ in range(2):
+            assert "".join(client.stream(model="m", messages=MESSAGES, timeout_s=1)) == answer
+        assert inner.calls == calls
+
+
+def test_recommender_reuses_cached_response():
+    candidates = [
+        CandidateRestaurant(name="Onesta", cuisines="Italian", rate="4.6/5"),
+        CandidateRestaurant(name="Jalsa", cuisines="North Indian", rate="4.1/5"),
+    ]
+    inner = CountingClient(json.dumps([{"rank": 1, "restaurant_name": "Jalsa", "explanation": "Great."}]))
+    client = CachingLLMClient(inner)
+    settings = RecommendSettings(max_results=1)
+    for _ in range(3):
+        out = recommend_with_explanations(
+            preference={"max_results": 1}, candidates=candidates, client=client, settings=settings
+        )
+        assert out[0].restaurant_name == "Jalsa"
+    assert inner.calls == 1
+
+
+def test_ranking_cache_ignores_small_preference_changes():
+    candidates = [
+        CandidateRestaurant(name="Onesta", cuisines="Italian", rate="4.6/5", location="Banashankari"),
+        CandidateRestaurant(name="Jalsa", cuisines="North Indian", rate="4.1/5", location="Banashankari"),
+    ]
+    inner = CountingClient(json.dumps([{"rank": 1, "restaurant_name": "Jalsa", "explanation": "Great."}]))
+    ranking_cache = ResponseCache()
+    settings = RecommendSettings(max_results=1)
+
+    def run(preference, cands=candidates):
+        return recommend_with_explanations(
+            preference=preference, candidates=cands, client=inner, settings=settings, ranking_cache=ranking_cache
+        )
+
+    assert run({"price_max": 800, "max_results": 1})[0].explanation == "Great."
+    # Same price band (800-1200) and same candidates: no second LLM call.
+    assert run({"price_max": 900, "max_results": 1})[0].restaurant_name == "Jalsa"
+    assert inner.calls == 1
+
+    run({"price_max": 400, "max_results": 1})  # different band
+    run({"price_max": 900, "max_results": 1}, cands=list(reversed(candidates)))  # different order
+    assert inner.calls == 3
+    assert ranking_cache.stats().memory_hits == 1
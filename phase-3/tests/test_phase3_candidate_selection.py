@@ -0,0 +1,83 @@
+import json
+
+from llm_recommender.diversity import select_diverse, similarity_matrix
+from llm_recommender.models import CandidateRestaurant, RecommendSettings
+from llm_recommender.recommender import recommend_with_explanations
+
+
+def _chain_heavy_candidates():
+    return [
+        CandidateRestaurant(name="Chai Point", cuisines="Cafe, Beverages", rate="4.4/5", approx_cost="200", location="Indiranagar", rest_type="Quick Bites"),
+        CandidateRestaurant(name="Chai Point", cuisines="Cafe, Beverages", rate="4.3/5", approx_cost="200", location="Koramangala", rest_type="Quick Bites"),
+        CandidateRestaurant(name="Chai Point", cuisines="Cafe, Beverages", rate="4.3/5", approx_cost="200", location="HSR", rest_type="Quick Bites"),
+        CandidateRestaurant(name="Onesta", cuisines="Pizza, Italian", rate="4.2/5", approx_cost="600", location="Indiranagar", rest_type="Casual Dining"),
+        CandidateRestaurant(name="Chai Point", cuisines="Cafe, Beverages", rate="4.2/5", approx_cost="200", location="BTM", rest_type="Quick Bites"),
+        CandidateRestaurant(name="Meghana Foods", cuisines="Biryani, Andhra", rate="4.1/5", approx_cost="600", location="Koramangala", rest_type="Casual Dining"),
+    ]
+
+
+def test_similarity_is_highest_between_chain_branches():
+    sims = similarity_matrix(_chain_heavy_candidates())
+    assert sims[0, 1] > sims[0, 3]
+    assert abs(sims[0, 0] - 1.0) < 1e-9
+
+
+def test_select_diverse_skips_chain_branches_and_keeps_order():
+    picked = select_diverse(_chain_heavy_candidates(), k=3)
+    assert [c.name for c in picked] == ["Chai Point", "Onesta", "Meghana Foods"]
+
+
+def test_select_diverse_returns_all_when_k_covers_pool():
+    cands = _chain_heavy_candidates()
+    assert select_diverse(cands, k=10) == cands
+
+
+class CapturingClient:
+    def __init__(self):
+        self.messages = None
+
+    def generate(self, *, model: str, messages, timeout_s: float) -> str:
+        self.messages = messages
+        return "not json"
+
+
+def test_recommender_sends_only_diverse_subset_to_llm():
+    client = CapturingClient()
+    out = recommend_with_explanations(
+        preference={"max_results": 3},
+        candidates=_chain_heavy_candidates(),
+        client=client,
+        settings=RecommendSettings(max_results=3, top_k_candidates=10, prompt_candidates=3, compact_prompt=False),
+    )
+    payload = json.loads(client.messages[1]["content"])
+    assert len(payload["candidates"]) == 3
+    # Fallback keeps retrieval order within the diverse subset.
+    assert [r.restaurant_name for r in out] == ["Chai Point", "Onesta", "Meghana Foods"]
+
+
+def test_diversity_stage_can_be_disabled():
+    client = CapturingClient()
+    recommend_with_explanations(
+        preference={},
+        candidates=_chain_heavy_candidates(),
+        client=client,
+        settings=RecommendSettings(top_k_candidates=10, prompt_candidates=None, compact_prompt=False),
+    )
+    assert len(json.loads(client.messages[1]["content"])["candidates"]) == 6
+
+
+def test_more_results_than_prompt_candidates():
+    cands = [
+        CandidateRestaurant(name=f"Place {i}", cuisines=f"Cuisine {i}", rate="4.0/5", location=f"Area {i}")
+        for i in range(12)
+    ]
+    settings = RecommendSettings(max_results=10, top_k_candidates=12, prompt_candidates=8, compact_prompt=False)
+
+    client = CapturingClient()
+    out = recommend_with_explanations(preference={}, candidates=cands, client=client, settings=settings)
+    assert len(json.loads(client.messages[1]["content"])["candidates"]) == 10
+    assert [r.restaurant_name for r in out] == [f"Place {i}" for i in range(10)]
+
+    off = RecommendSettings(max_results=10, top_k_candidates=12, prompt_candidates=8, llm_mode="off")
+    out = recommend_with_explanations(preference={}, candidates=cands, client=None, settings=off)
+    assert len(out) == 10
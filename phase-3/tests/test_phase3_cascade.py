@@ -0,0 +1,164 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from llm_recommender.cache import ResponseCache
+from llm_recommender.cascade import CascadeTracker
+from llm_recommender.distill import RankingLog
+from llm_recommender.models import CandidateRestaurant, LLMError, RecommendSettings
+from llm_recommender.recommender import (
+    recommend_with_explanations,
+    recommend_with_explanations_async,
+    stream_recommendations,
+)
+
+CANDS = [
+    CandidateRestaurant(name="A", cuisines="Italian", rate="4.0/5", approx_cost="500", location="X"),
+    CandidateRestaurant(name="B", cuisines="Chinese", rate="4.5/5", approx_cost="600", location="X"),
+]
+PREF = SimpleNamespace(max_results=2)
+SETTINGS = RecommendSettings(model="large", fast_model="fast")
+GOOD = json.dumps([{"i": 2, "why": "Best rated."}, {"i": 1, "why": "Also good."}])
+LARGE = json.dumps([{"i": 1, "why": "Large says A."}, {"i": 2, "why": "Large says B."}])
+
+
+class ModelClient:
+    """Answers per model name; an exception instance is raised instead."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.models = []
+
+    def _answer(self, model):
+        self.models.append(model)
+        answer = self.answers[model]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    def generate(self, *, model, messages, timeout_s):
+        return self._answer(model)
+
+    async def agenerate(self, *, model, messages, timeout_s):
+        return self._answer(model)
+
+    def stream(self, *, model, messages, timeout_s):
+        yield self._answer(model)
+
+
+def _run(client, settings=SETTINGS, stats=None):
+    recs = recommend_with_explanations(
+        preference=PREF, candidates=CANDS, client=client, settings=settings, cascade_stats=stats
+    )
+    return [(r.restaurant_name, r.explanation) for r in recs]
+
+
+def test_good_fast_answer_is_served_without_the_large_model():
+    client = ModelClient({"fast": GOOD, "large": LARGE})
+    stats = CascadeTracker()
+    assert _run(client, stats=stats) == [("B", "Best rated."), ("A", "Also good.")]
+    assert client.models == ["fast"]
+    s = stats.stats()
+    assert (s.requests, s.fast_served, s.fast_share) == (1, 1, 1.0)
+    assert s.latency_saved_ms is None  # no large-model latency observed yet
+
+
+@pytest.mark.parametrize(
+    "fast, reason",
+    [
+        (LLMError("down"), "error"),
+        ("Sorry, I cannot help with that.", "unparseable"),
+        (json.dumps([{"i": 2, "why": "Best rated."}, {"i": 9, "why": "Not a candidate."}]), "too_few"),
+        (json.dumps([{"i": 2, "why": "Best rated."}, {"i": 2, "why": "Again."}]), "too_few"),
+        (json.dumps([{"i": 2, "why": ""}, {"i": 1, "why": "Also good."}]), "invalid"),
+        (json.dumps([{"i": 2, "why": "word " * 41}, {"i": 1, "why": "Also good."}]), "invalid"),
+    ],
+)
+def test_failed_fast_answer_escalates_to_the_large_model(fast, reason):
+    client = ModelClient({"fast": fast, "large": LARGE})
+    stats = CascadeTracker()
+    assert _run(client, stats=stats) == [("A", "Large says A."), ("B", "Large says B.")]
+    assert client.models == ["fast", "large"]
+    s = stats.stats()
+    assert (s.requests, s.fast_served) == (1, 0)
+    assert s.escalated[reason] == 1
+    assert s.avg_large_ms is not None
+
+
+def test_rank_mode_does_not_require_explanations():
+    client = ModelClient({"fast": json.dumps([{"i": 2}, {"i": 1}]), "large": LARGE})
+    settings = RecommendSettings(model="large", fast_model="fast", llm_mode="rank")
+    assert [name for name, _ in _run(client, settings)] == ["B", "A"]
+    assert client.models == ["fast"]
+
+
+def test_both_tiers_failing_serves_the_fallback():
+    client = ModelClient({"fast": LLMError("down"), "large": LLMError("down too")})
+    stats = CascadeTracker()
+    assert [name for name, _ in _run(client, stats=stats)] == ["A", "B"]
+    s = stats.stats()
+    assert s.escalated["error"] == 1
+    assert s.avg_large_ms is None
+
+
+def test_without_fast_model_only_the_large_model_is_called():
+    client = ModelClient({"large": LARGE})
+    assert [name for name, _ in _run(client, RecommendSettings(model="large"))] == ["A", "B"]
+    assert client.models == ["large"]
+
+
+def test_async_cascade_escalates():
+    client = ModelClient({"fast": "not json", "large": LARGE})
+    stats = CascadeTracker()
+    recs = asyncio.run(
+        recommend_with_explanations_async(
+            preference=PREF, candidates=CANDS, client=client, settings=SETTINGS, cascade_stats=stats
+        )
+    )
+    assert [r.restaurant_name for r in recs] == ["A", "B"]
+    assert client.models == ["fast", "large"]
+    assert stats.stats().escalated["unparseable"] == 1
+
+
+def test_streams_use_the_large_model():
+    client = ModelClient({"fast": GOOD, "large": LARGE})
+    recs = list(stream_recommendations(preference=PREF, candidates=CANDS, client=client, settings=SETTINGS))
+    assert [r.restaurant_name for r in recs] == ["A", "B"]
+    assert client.models == ["large"]
+
+
+def test_latency_saved_counts_time_lost_on_escalations():
+    tracker = CascadeTracker()
+    tracker.record_fast(0.2)
+    tracker.record_fast(0.2)
+    tracker.record_escalation("too_few", 0.2, 1.0)
+    s = tracker.stats().to_dict()
+    # Two requests saved 1.0 - 0.2 each; the escalated one lost 0.2.
+    assert s["latency_saved_ms"] == pytest.approx(1400.0)
+    assert s["fast_share"] == pytest.approx(2 / 3, abs=1e-4)
+    assert s["avg_fast_ms"] == pytest.approx(200.0)
+    assert s["avg_large_ms"] == pytest.approx(1000.0)
+
+
+def test_answers_carry_and_are_cached_under_the_model_that_gave_them(tmp_path):
+    cache = ResponseCache()
+    log = RankingLog(str(tmp_path / "rankings.jsonl"))
+
+    def run(client):
+        return recommend_with_explanations(
+            preference=PREF, candidates=CANDS, client=client, settings=SETTINGS, ranking_cache=cache, ranking_log=log
+        )
+
+    fast = run(ModelClient({"fast": GOOD, "large": LARGE}))
+    assert [r.model for r in fast] == ["fast", "fast"]
+    assert not (tmp_path / "rankings.jsonl").exists()  # only the large model teaches the distilled ranker
+
+    cached = run(ModelClient({}))
+    assert [(r.restaurant_name, r.model) for r in cached] == [("B", "fast"), ("A", "fast")]
+
+    cache = ResponseCache()
+    large = run(ModelClient({"fast": "not json", "large": LARGE}))
+    assert [r.model for r in large] == ["large", "large"]
+    assert len(RankingLog.read(log.path)) == 1
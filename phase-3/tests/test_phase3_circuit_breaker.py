@@ -0,0 +1,150 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from llm_recommender.circuit_breaker import CircuitBreaker, CircuitBreakerLLMClient, CircuitOpenError
+from llm_recommender.models import CandidateRestaurant, LLMError
+from llm_recommender.recommender import recommend_with_explanations
+from llm_recommender.xai_client import XAIChatCompletionsClient
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyClient:
+    def __init__(self):
+        self.fail = True
+        self.calls = 0
+
+    def generate(self, *, model, messages, timeout_s):
+        self.calls += 1
+        if self.fail:
+            raise LLMError("503")
+        return '[{"i": 1, "why": "Back up."}]'
+
+    async def agenerate(self, *, model, messages, timeout_s):
+        return self.generate(model=model, messages=messages, timeout_s=timeout_s)
+
+
+def _client(clock, **kw):
+    inner = FlakyClient()
+    breaker = CircuitBreaker(min_calls=3, window=5, open_s=30, clock=clock, **kw)
+    return inner, CircuitBreakerLLMClient(inner, breaker)
+
+
+def _call(client):
+    try:
+        return client.generate(model="m", messages=MESSAGES, timeout_s=1)
+    except LLMError as e:
+        return e
+
+
+def test_opens_after_failure_rate_and_rejects_without_calling():
+    clock = Clock()
+    inner, client = _client(clock)
+    for _ in range(3):
+        assert isinstance(_call(client), LLMError)
+    assert client.breaker.state == "open"
+    assert not client.ready()
+
+    assert isinstance(_call(client), CircuitOpenError)
+    assert inner.calls == 3
+    stats = client.breaker.stats().to_dict()
+    assert stats["state"] == "open" and stats["rejected"] == 1 and stats["opened"] == 1
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = Clock()
+    inner, client = _client(clock)
+    for _ in range(3):
+        _call(client)
+
+    clock.now = 31
+    assert client.breaker.state == "half_open" and client.ready()
+    assert isinstance(_call(client), LLMError)  # probe fails
+    assert client.breaker.state == "open"
+    assert client.breaker.stats().opened == 2
+
+    clock.now = 62
+    inner.fail = False
+    assert _call(client) == '[{"i": 1, "why": "Back up."}]'
+    assert client.breaker.state == "closed"
+
+
+def test_only_one_probe_at_a_time():
+    clock = Clock()
+    breaker = CircuitBreaker(min_calls=1, window=1, clock=clock)
+    assert breaker.allow()
+    breaker.record(False, 0.1)
+    clock.now = 31
+    probe = breaker.allow()
+    assert probe.probe
+    assert not breaker.allow()
+    assert not breaker.ready()
+    breaker.release(probe)
+    assert breaker.ready()
+
+
+def test_calls_from_before_the_circuit_opened_do_not_decide_the_probe():
+    clock = Clock()
+    breaker = CircuitBreaker(min_calls=1, window=1, clock=clock)
+    old_ok, old_failing, old_cancelled = breaker.allow(), breaker.allow(), breaker.allow()
+    breaker.record(False, 0.1, breaker.allow())
+    clock.now = 31
+    probe = breaker.allow()
+
+    breaker.record(True, 0.1, old_ok)
+    breaker.record(False, 0.1, old_failing)
+    breaker.release(old_cancelled)
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # the probe is still in flight
+
+    breaker.record(True, 0.1, probe)
+    assert breaker.state == "closed"
+    breaker.record(False, 0.1, old_failing)  # from the previous closed period
+    assert breaker.state == "closed"
+    assert breaker.stats().window_calls == 0
+
+
+def test_slow_successes_count_as_failures():
+    breaker = CircuitBreaker(min_calls=2, window=4, slow_call_s=1.0)
+    breaker.record(True, 0.2)
+    breaker.record(True, 5.0)
+    assert breaker.state == "open"
+
+
+def test_async_calls_are_guarded():
+    clock = Clock()
+    inner, client = _client(clock)
+    for _ in range(3):
+        _call(client)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(client.agenerate(model="m", messages=MESSAGES, timeout_s=1))
+
+
+def test_open_circuit_skips_the_prompt(monkeypatch):
+    clock = Clock()
+    inner, client = _client(clock)
+    for _ in range(3):
+        _call(client)
+
+    built = []
+    monkeypatch.setattr("llm_recommender.recommender._messages", lambda *a: built.append(a) or [])
+    cands = [CandidateRestaurant(name="A", rate="4.0/5"), CandidateRestaurant(name="B", rate="4.2/5")]
+    recs = recommend_with_explanations(preference=SimpleNamespace(max_results=2), candidates=cands, client=client)
+    assert [r.restaurant_name for r in recs] == ["A", "B"]
+    assert built == [] and inner.calls == 3
+
+
+def test_client_without_api_key_is_not_ready(monkeypatch):
+    monkeypatch.delenv("XAI_API_KEY", raising=False)
+    assert not XAIChatCompletionsClient().ready()
+    assert XAIChatCompletionsClient(api_key="k").ready()
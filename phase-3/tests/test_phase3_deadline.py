@@ -0,0 +1,239 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+from llm_recommender import background
+from llm_recommender.background import MAX_BACKGROUND_CALLS, call_with_deadline, deadline_after
+from llm_recommender.cache import ResponseCache
+from llm_recommender.models import CandidateRestaurant, LLMError, RecommendSettings
+from llm_recommender.recommender import (
+    recommend_with_explanations,
+    recommend_with_explanations_async,
+    stream_recommendations,
+)
+
+CANDS = [
+    CandidateRestaurant(name="A", cuisines="Italian", rate="4.0/5", approx_cost="500", location="X"),
+    CandidateRestaurant(name="B", cuisines="Chinese", rate="4.5/5", approx_cost="600", location="X"),
+]
+PREF = SimpleNamespace(max_results=2)
+ANSWER = json.dumps([{"i": 2, "why": "Best rated."}, {"i": 1, "why": "Also good."}])
+
+
+class SlowClient:
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+        self.finished = threading.Event()
+        self.calls = 0
+
+    def generate(self, *, model, messages, timeout_s):
+        self.calls += 1
+        time.sleep(self.delay_s)
+        self.finished.set()
+        return ANSWER
+
+    def stream(self, *, model, messages, timeout_s):
+        self.calls += 1
+        first = ANSWER.index("},") + 2  # the first item, complete
+        yield ANSWER[:first]
+        time.sleep(self.delay_s)
+        yield ANSWER[first:]
+        self.finished.set()
+
+    async def agenerate(self, *, model, messages, timeout_s):
+        self.calls += 1
+        await asyncio.sleep(self.delay_s)
+        self.finished.set()
+        return ANSWER
+
+
+class DownClient:
+    def generate(self, *, model, messages, timeout_s):
+        raise LLMError("down")
+
+
+def _cached_order(cache):
+    """Order served when only the ranking cache can answer."""
+    recs = recommend_with_explanations(preference=PREF, candidates=CANDS, client=DownClient(), ranking_cache=cache)
+    return [r.restaurant_name for r in recs]
+
+
+def _wait_for(predicate, timeout_s=2.0):
+    end = time.monotonic() + timeout_s
+    while not predicate() and time.monotonic() < end:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_deadline_serves_fallback_and_fills_cache_in_background():
+    client = SlowClient(delay_s=0.3)
+    cache = ResponseCache()
+    kwargs = dict(preference=PREF, candidates=CANDS, client=client, settings=RecommendSettings(deadline_s=0.1), ranking_cache=cache)
+
+    start = time.monotonic()
+    recs = recommend_with_explanations(**kwargs)
+    assert time.monotonic() - start < 0.25
+    assert [r.restaurant_name for r in recs] == ["A", "B"]  # retrieval order
+
+    assert _wait_for(lambda: _cached_order(cache) == ["B", "A"])
+    assert [r.restaurant_name for r in recommend_with_explanations(**kwargs)] == ["B", "A"]
+    assert client.calls == 1
+
+
+def test_answer_within_deadline_is_used():
+    recs = recommend_with_explanations(
+        preference=PREF, candidates=CANDS, client=SlowClient(delay_s=0), deadline=deadline_after(1.0)
+    )
+    assert [r.explanation for r in recs] == ["Best rated.", "Also good."]
+
+
+def test_stream_deadline_fills_and_completes_in_background():
+    client = SlowClient(delay_s=0.3)
+    cache = ResponseCache()
+    start = time.monotonic()
+    recs = list(
+        stream_recommendations(
+            preference=PREF, candidates=CANDS, client=client, ranking_cache=cache, deadline=deadline_after(0.1)
+        )
+    )
+    assert time.monotonic() - start < 0.25
+    assert [(r.restaurant_name, r.explanation) for r in recs][0] == ("B", "Best rated.")
+    assert recs[1].restaurant_name == "A" and recs[1].explanation != "Also good."
+    assert _wait_for(lambda: _cached_order(cache) == ["B", "A"])
+    assert client.calls == 1
+
+
+def test_async_deadline_keeps_the_call_running():
+    client = SlowClient(delay_s=0.2)
+    cache = ResponseCache()
+
+    async def main():
+        recs = await recommend_with_explanations_async(
+            preference=PREF, candidates=CANDS, client=client, ranking_cache=cache, deadline=deadline_after(0.05)
+        )
+        await asyncio.sleep(0.3)
+        return recs
+
+    recs = asyncio.run(main())
+    assert [r.restaurant_name for r in recs] == ["A", "B"]
+    assert client.finished.is_set()
+    assert _cached_order(cache) == ["B", "A"]
+
+
+def test_concurrent_requests_within_the_deadline_all_get_the_llm_answer():
+    # More requests than late slots: none of them may queue behind another's LLM call.
+    client = SlowClient(delay_s=0.3)
+    n = 2 * MAX_BACKGROUND_CALLS + 8
+
+    def one(_):
+        recs = recommend_with_explanations(
+            preference=PREF, candidates=CANDS, client=client, settings=RecommendSettings(deadline_s=0.6)
+        )
+        return [r.explanation for r in recs]
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        answers = list(pool.map(one, range(n)))
+    assert answers == [["Best rated.", "Also good."]] * n
+
+
+def test_late_calls_beyond_the_limit_are_dropped():
+    followed = []
+    release = threading.Event()
+
+    def slow():
+        release.wait(2.0)
+        return "answer"
+
+    def one(_):
+        try:
+            call_with_deadline(slow, deadline_after(0.06), on_late=lambda f: followed.append(f.result()))
+        except TimeoutError:
+            return "fallback"
+
+    n = MAX_BACKGROUND_CALLS + 4
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        assert list(pool.map(one, range(n))) == ["fallback"] * n
+    release.set()
+    assert _wait_for(lambda: len(followed) == MAX_BACKGROUND_CALLS)
+    time.sleep(0.05)
+    assert len(followed) == MAX_BACKGROUND_CALLS
+
+    # The slots are free again once the late calls are done.
+    assert _wait_for(lambda: background.claim_late_slot())
+    background.release_late_slot()
+
+
+def test_late_stream_is_dropped_when_no_slot_is_free():
+    held = 0
+    while background.claim_late_slot():
+        held += 1
+    try:
+        client = SlowClient(delay_s=0.2)
+        cache = ResponseCache()
+        recs = list(
+            stream_recommendations(
+                preference=PREF, candidates=CANDS, client=client, ranking_cache=cache, deadline=deadline_after(0.1)
+            )
+        )
+        assert [r.restaurant_name for r in recs] == ["B", "A"]
+        time.sleep(0.3)
+        assert _cached_order(cache) == ["A", "B"]  # not completed in the background
+        assert not client.finished.is_set()
+    finally:
+        for _ in range(held):
+            background.release_late_slot()
+
+
+RESTART_SCRIPT = """
+import json, sys, time
+from llm_recommender.cache import CachingLLMClient, ResponseCache
+from llm_recommender.models import CandidateRestaurant, RecommendSettings
+from llm_recommender.recommender import recommend_with_explanations
+
+class Client:
+    def __init__(self, answer, delay_s):
+        self.answer, self.delay_s = answer, delay_s
+
+    def generate(self, *, model, messages, timeout_s):
+        time.sleep(self.delay_s)
+        if self.answer is None:
+            raise RuntimeError("down")
+        return self.answer
+
+answer = json.dumps([{"i": 2, "why": "Best rated."}, {"i": 1, "why": "Also good."}])
+path, phase = sys.argv[1], sys.argv[2]
+cache = ResponseCache(path=path)
+client = CachingLLMClient(Client(answer if phase == "fill" else None, 0.4 if phase == "fill" else 0), cache)
+recs = recommend_with_explanations(
+    preference={"city": "X", "cuisine": "Chinese", "price_max": 800, "max_results": 2},
+    candidates=[
+        CandidateRestaurant(name="A", cuisines="Italian", rate="4.0/5", location="X"),
+        CandidateRestaurant(name="B", cuisines="Chinese", rate="4.5/5", location="X"),
+    ],
+    client=client,
+    settings=RecommendSettings(deadline_s=0.2),
+)
+if phase == "fill":
+    time.sleep(0.6)  # let the late answer reach the disk tier
+print([r.restaurant_name for r in recs])
+"""
+
+
+def test_late_answer_is_served_after_a_restart(tmp_path):
+    root = str(Path(__file__).resolve().parents[1])
+    path = str(tmp_path / "llm.sqlite3")
+
+    def run(phase, seed):
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=root)
+        cmd = [sys.executable, "-c", RESTART_SCRIPT, path, phase]
+        return subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout.strip()
+
+    assert run("fill", "1") == "['A', 'B']"  # the fallback; the answer arrives late
+    assert run("serve", "2") == "['B', 'A']"  # a new process with another hash seed hits the disk entry
@@ -0,0 +1,133 @@
+import json
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from llm_recommender.distill import (
+    RANKING_FEATURES,
+    DistilledRanker,
+    RankingExample,
+    RankingLog,
+    evaluate_ranker,
+    split_examples,
+    train_ranker,
+)
+from llm_recommender.models import CandidateRestaurant, RecommendSettings
+from llm_recommender.recommender import recommend_with_explanations
+
+CUISINES = ["Chinese", "Italian", "North Indian", "Thai", "Cafe"]
+
+
+def _teacher_examples(n, seed=0):
+    """Rankings from a hidden rule standing in for the LLM: the requested cuisine first, then rating."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        wanted = rng.choice(CUISINES)
+        cands = [
+            CandidateRestaurant(
+                name=f"R{i}",
+                cuisines=", ".join(rng.sample(CUISINES, 2)),
+                rate=f"{rng.uniform(3.0, 4.9):.1f}/5",
+                votes=rng.randint(50, 3000),
+            )
+            for i in range(8)
+        ]
+        score = [2.0 * (wanted in c.cuisines) + c.rating_numeric for c in cands]
+        ranking = sorted(range(len(cands)), key=lambda i: -score[i])[:3]
+        out.append(RankingExample(preference={"cuisine": wanted}, candidates=cands, ranking=ranking))
+    return out
+
+
+def test_distilled_ranker_agrees_with_its_teacher():
+    train, holdout = split_examples(_teacher_examples(200), holdout=0.25)
+    assert (len(train), len(holdout)) == (150, 50)
+    ranker = train_ranker(train)
+    assert ranker.weights[RANKING_FEATURES.index("cuisine")] > 0
+    assert ranker.weights[RANKING_FEATURES.index("rating")] > 0
+
+    report = evaluate_ranker(ranker, holdout)
+    assert report.examples == 50
+    assert report.pairwise_accuracy > 0.9
+    assert report.top1_agreement > report.retrieval_top1_agreement
+    assert 0 < report.coverage <= 1
+    assert report.confident_top1_agreement >= report.top1_agreement
+    assert report.confident_overlap_at_k >= report.overlap_at_k
+    assert set(report.to_dict()) >= {"top1_agreement", "pairwise_accuracy", "coverage"}
+
+
+def test_untrained_ranker_is_never_confident():
+    ranker = DistilledRanker(np.zeros(len(RANKING_FEATURES)))
+    example = _teacher_examples(1)[0]
+    assert ranker.rank(example.preference, example.candidates, 3)[1] == pytest.approx(0.5)
+    assert ranker.decide(example.preference, example.candidates, 3) is None
+    assert ranker.stats().to_dict() == {"served": 0, "deferred": 1, "served_share": 0.0}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    ranker = train_ranker(_teacher_examples(30), min_confidence=0.7)
+    path = str(tmp_path / "ranker.json")
+    ranker.save(path)
+    loaded = DistilledRanker.load(path)
+    assert np.allclose(loaded.weights, ranker.weights, atol=1e-6)
+    assert (loaded.min_confidence, loaded.trained_on) == (0.7, 30)
+
+    data = json.loads(open(path).read())
+    data["features"] = ["rating"]
+    open(path, "w").write(json.dumps(data))
+    with pytest.raises(ValueError):
+        DistilledRanker.load(path)
+
+
+class AnswerClient:
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = 0
+
+    def generate(self, *, model, messages, timeout_s):
+        self.calls += 1
+        return self.answer
+
+
+CANDS = [
+    CandidateRestaurant(name="A", cuisines="Italian", rate="4.0/5", votes=100),
+    CandidateRestaurant(name="B", cuisines="Chinese", rate="4.5/5", votes=900),
+    CandidateRestaurant(name="C", cuisines="Thai", rate="3.0/5", votes=500),
+]
+PREF = SimpleNamespace(cuisine="Chinese", max_results=2)
+
+
+def test_llm_answers_are_logged_for_training(tmp_path):
+    path = str(tmp_path / "rankings.jsonl")
+    log = RankingLog(path)
+    client = AnswerClient(json.dumps([{"i": 2, "why": "Chinese."}, {"i": 1, "why": "Close."}]))
+    settings = RecommendSettings(prompt_candidates=None)
+    recommend_with_explanations(preference=PREF, candidates=CANDS, client=client, settings=settings, ranking_log=log)
+    with open(path, "a") as f:
+        f.write('{"torn": \n')
+
+    [example] = RankingLog.read(path)
+    assert example.ranking == [1, 0]
+    assert example.preference["cuisine"] == "Chinese"
+    assert [c.name for c in example.candidates] == ["A", "B", "C"]
+    assert example.candidates[1].votes == 900
+
+
+def test_confident_ranker_answers_without_the_llm():
+    weights = np.zeros(len(RANKING_FEATURES))
+    weights[RANKING_FEATURES.index("cuisine")] = 20.0
+    weights[RANKING_FEATURES.index("rating")] = 20.0
+    client = AnswerClient("[]")
+    settings = RecommendSettings(prompt_candidates=None)
+
+    confident = DistilledRanker(weights, min_confidence=0.8)
+    recs = recommend_with_explanations(preference=PREF, candidates=CANDS, client=client, settings=settings, ranker=confident)
+    assert [r.restaurant_name for r in recs] == ["B", "A"]
+    assert client.calls == 0
+
+    unsure = DistilledRanker(weights, min_confidence=0.9999)
+    recommend_with_explanations(preference=PREF, candidates=CANDS, client=client, settings=settings, ranker=unsure)
+    assert client.calls == 1
+    assert unsure.stats().deferred == 1
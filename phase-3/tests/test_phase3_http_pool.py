@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from llm_recommender.http_pool import HTTPConnectionPool
+from llm_recommender.models import LLMError
+from llm_recommender.xai_client import XAIChatCompletionsClient
+
+
+def _url(srv, path="/v1/chat/completions"):
+    return f"http://127.0.0.1:{srv.server_address[1]}{path}"
+
+
+def test_sequential_requests_reuse_one_connection(server):
+    pool = HTTPConnectionPool()
+    for _ in range(5):
+        status, _ = pool.request("POST", _url(server), body=b"{}")
+        assert status == 200
+    assert server.connections == 1
+    assert (pool.stats.created, pool.stats.reused) == (1, 4)
+    assert pool.idle_count(_url(server)) == 1
+    pool.close()
+
+
+def test_concurrent_requests_respect_per_host_limit(server):
+    server.delay_s = 0.05
+    pool = HTTPConnectionPool(max_per_host=2)
+    threads = [threading.Thread(target=pool.request, args=("POST", _url(server), b"{}")) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert server.max_in_flight <= 2
+    assert pool.stats.created <= 2
+    assert pool.idle_count(_url(server)) == pool.stats.created
+    pool.close()
+
+
+def test_connection_closed_by_server_is_replaced(server):
+    server.close_after_response = True
+    pool = HTTPConnectionPool()
+    assert pool.request("POST", _url(server), body=b"{}")[0] == 200
+    time.sleep(0.05)  # let the server's close reach the idle socket
+    assert pool.request("POST", _url(server), body=b"{}")[0] == 200
+    assert pool.stats.created == 2
+    assert pool.stats.discarded == 1
+    pool.close()
+
+
+def test_prewarm_opens_idle_connections(server):
+    pool = HTTPConnectionPool(max_per_host=2)
+    assert pool.prewarm(_url(server), connections=3) == 2
+    assert pool.prewarm(_url(server), connections=2) == 0
+    pool.request("POST", _url(server), body=b"{}")
+    assert (pool.stats.created, pool.stats.reused) == (2, 1)
+    pool.close()
+
+
+def test_xai_client_over_pool(server, monkeypatch):
+    monkeypatch.delenv("XAI_BASE_URL", raising=False)
+    pool = HTTPConnectionPool()
+    client = XAIChatCompletionsClient(api_key="k", base_url=_url(server, "/v1"), pool=pool)
+    assert client.prewarm() == 1
+    for text in ("one", "two"):
+        out = client.generate(model="m", messages=[{"role": "user", "content": text}], timeout_s=2)
+        assert out == text
+    assert (pool.stats.created, pool.stats.reused) == (1, 2)
+
+    failing = XAIChatCompletionsClient(api_key="k", base_url=_url(server, "/fail"), pool=pool)
+    with pytest.raises(LLMError, match="XAI HTTP error 500"):
+        failing.generate(model="m", messages=[], timeout_s=2)
+    pool.close()
+
+
+def test_xai_client_streams_over_pool_and_reuses_connection(server, monkeypatch):
+    monkeypatch.delenv("XAI_BASE_URL", raising=False)
+    pool = HTTPConnectionPool()
+    client = XAIChatCompletionsClient(api_key="k", base_url=_url(server, "/v1"), pool=pool)
+    pieces = list(client.stream(model="m", messages=[{"role": "user", "content": "x"}], timeout_s=2))
+    assert pieces == ["str", "eam", "ed"]
+    assert client.generate(model="m", messages=[{"role": "user", "content": "y"}], timeout_s=2) == "y"
+    assert (pool.stats.created, pool.stats.reused) == (1, 1)
+
+    # Abandoning a stream part-way drops that connection instead of reusing it.
+    stream = client.stream(model="m", messages=[], timeout_s=2)
+    next(stream)
+    stream.close()
+    assert pool.stats.discarded == 1
+    pool.close()
@@ -0,0 +1,131 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from llm_recommender.local_ranker import FEATURES, ScoringWeights, candidate_features, rank_locally, score_candidates
+from llm_recommender.models import CandidateRestaurant, RecommendSettings
+from llm_recommender.recommender import recommend_with_explanations
+
+
+def _cand(name, **kw):
+    return CandidateRestaurant(name=name, **kw)
+
+
+def _pref(**kw):
+    return SimpleNamespace(**kw)
+
+
+def test_rating_is_smoothed_by_votes():
+    few = _cand("Few", rate="4.9/5", votes=2)
+    many = _cand("Many", rate="4.5/5", votes=2000)
+    weights = ScoringWeights(price=0, cuisine=0, locality=0, prior_rating=3.5)
+    assert [c.name for c in rank_locally(_pref(), [few, many], weights)] == ["Many", "Few"]
+    # Without smoothing the raw rating wins.
+    unsmoothed = ScoringWeights(price=0, cuisine=0, locality=0, prior_votes=0)
+    assert [c.name for c in rank_locally(_pref(), [many, few], unsmoothed)] == ["Few", "Many"]
+
+
+def test_price_fit():
+    cands = [_cand("In", approx_cost="500"), _cand("Near", approx_cost="900"), _cand("Far", approx_cost="3000"), _cand("Unknown")]
+    prices = candidate_features(_pref(price_min=300, price_max=800), cands)[:, FEATURES.index("price")]
+    assert prices[0] == 1.0
+    assert 0 < prices[1] < 1
+    assert prices[2] == 0.0
+    assert prices[3] == 0.5
+    # No budget: the feature does not tell candidates apart.
+    assert not candidate_features(_pref(), cands)[:, FEATURES.index("price")].any()
+
+
+def test_cuisine_match_strength():
+    cands = [
+        _cand("Primary", cuisines="Chinese, Thai"),
+        _cand("Secondary", cuisines="North Indian, Chinese"),
+        _cand("None", cuisines="Italian"),
+    ]
+    strength = candidate_features(_pref(cuisine="Chinese"), cands)[:, FEATURES.index("cuisine")]
+    assert strength[0] > strength[1] > strength[2] == 0.0
+    both = candidate_features(_pref(cuisine="Chinese, Thai"), cands)[:, FEATURES.index("cuisine")]
+    assert both[0] == pytest.approx((1.0 + 0.7) / 2)
+
+
+def test_locality_match():
+    cands = [
+        _cand("Area", location="Koramangala 5th Block", listed_in_city="Koramangala"),
+        _cand("City", location="Koramangala 7th Block", listed_in_city="Koramangala"),
+        _cand("Elsewhere", location="Indiranagar", listed_in_city="Indiranagar"),
+    ]
+    pref = _pref(location="koramangala 5th block", city="Koramangala")
+    assert candidate_features(pref, cands)[:, FEATURES.index("locality")].tolist() == [1.0, 0.5, 0.0]
+
+
+def test_scores_are_the_weighted_feature_sum_and_ties_keep_retrieval_order():
+    cands = [_cand("A", rate="4.0/5", votes=100), _cand("B", rate="4.0/5", votes=100), _cand("C", rate="4.4/5", votes=100)]
+    weights = ScoringWeights()
+    features = candidate_features(_pref(), cands)
+    assert np.allclose(score_candidates(_pref(), cands, weights), features @ weights.vector())
+    assert [c.name for c in rank_locally(_pref(), cands)] == ["C", "A", "B"]
+    assert rank_locally(_pref(), []) == []
+
+
+class RecordingClient:
+    def __init__(self, answer):
+        self.answer = answer
+        self.messages = None
+
+    def generate(self, *, model, messages, timeout_s):
+        self.messages = messages
+        return self.answer
+
+
+CANDS = [
+    _cand("Pizza Place", cuisines="Italian", rate="3.6/5", votes=40, approx_cost="400"),
+    _cand("Noodle Bar", cuisines="Chinese", rate="4.3/5", votes=900, approx_cost="600"),
+    _cand("Wok House", cuisines="Thai, Chinese", rate="4.1/5", votes=300, approx_cost="2500"),
+]
+
+
+def test_local_mode_ranks_without_the_llm():
+    client = RecordingClient("[]")
+    recs = recommend_with_explanations(
+        preference=_pref(cuisine="Chinese", price_max=800, max_results=2),
+        candidates=CANDS,
+        client=client,
+        settings=RecommendSettings(llm_mode="local"),
+    )
+    assert [r.restaurant_name for r in recs] == ["Noodle Bar", "Wok House"]
+    assert all(r.explanation for r in recs)
+    assert client.messages is None
+
+
+def test_prerank_decides_which_candidates_reach_the_llm():
+    client = RecordingClient(json.dumps([{"i": 1, "why": "Best match."}]))
+    recs = recommend_with_explanations(
+        preference=_pref(cuisine="Chinese", max_results=1),
+        candidates=CANDS,
+        client=client,
+        settings=RecommendSettings(local_prerank=True, top_k_candidates=2, prompt_candidates=None),
+    )
+    prompt = client.messages[-1]["content"]
+    assert "Noodle Bar" in prompt and "Wok House" in prompt and "Pizza Place" not in prompt
+    assert [r.restaurant_name for r in recs] == ["Noodle Bar"]
+
+
+def test_local_mode_ranks_the_whole_top_k():
+    # The diversity stage would drop a chain branch here, but it only applies to prompts.
+    branches = [
+        _cand(f"Chai Point {n}", cuisines="Cafe, Beverages", rate=f"4.{5 - i}/5", votes=500, location="Indiranagar", rest_type="Quick Bites")
+        for i, n in enumerate(["I", "II", "III", "IV"])
+    ]
+    others = [
+        _cand(name, cuisines=cuisine, rate="3.5/5", votes=500, location=area, rest_type="Casual Dining")
+        for name, cuisine, area in [("Onesta", "Pizza", "HSR"), ("Meghana", "Biryani", "BTM"), ("Truffles", "Burger", "Koramangala")]
+    ]
+    recs = recommend_with_explanations(
+        preference=_pref(max_results=4),
+        candidates=others + branches,
+        client=RecordingClient("[]"),
+        settings=RecommendSettings(llm_mode="local", prompt_candidates=2),
+    )
+    assert [r.restaurant_name for r in recs] == [c.name for c in branches]
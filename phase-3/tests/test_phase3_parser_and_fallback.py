@@ -92,3 +92,36 @@ def test_recommender_ignores_unknown_restaurant_and_fills_remaining():
     assert len(out) == 2
     assert out[1].restaurant_name in {"Addhuri Udupi Bhojana", "Spice Elephant"}
 
+
+
+def test_parser_maps_indices_to_candidates():
+    candidates = [CandidateRestaurant(name="Onesta"), CandidateRestaurant(name="Jalsa ")]
+    parsed = parse_recommendations('[{"i": 2, "why": "Curry."}, {"i": "1", "why": "Pizza."}, {"i": 7}]', candidates)
+    assert [(r.rank, r.restaurant_name, r.explanation) for r in parsed.recommendations] == [
+        (1, "Jalsa", "Curry."),
+        (2, "Onesta", "Pizza."),
+    ]
+    assert parsed.parse_warnings == ["Item 3 refers to unknown candidate 7; skipped"]
+
+
+def test_recommender_uses_index_answers():
+    candidates = [
+        CandidateRestaurant(name="Onesta", cuisines="Italian", rate="4.6/5"),
+        CandidateRestaurant(name="Addhuri Udupi Bhojana", cuisines="South Indian", rate="3.9/5"),
+    ]
+    out = recommend_with_explanations(
+        preference={"max_results": 2},
+        candidates=candidates,
+        client=FakeClient('[{"i":2,"why":"Cheap and tasty."},{"i":1,"why":"Higher rating."}]'),
+        settings=RecommendSettings(max_results=2),
+    )
+    assert [(r.restaurant_name, r.explanation) for r in out] == [
+        ("Addhuri Udupi Bhojana", "Cheap and tasty."),
+        ("Onesta", "Higher rating."),
+    ]
+
+
+def test_parser_keeps_complete_items_of_truncated_output():
+    parsed = parse_recommendations('[{"restaurant_name": "A", "explanation": "X"}, {"restaurant_name": "B", "expl')
+    assert [r.restaurant_name for r in parsed.recommendations] == ["A"]
+    assert parsed.parse_warnings == ["Output was truncated; kept the complete items"]
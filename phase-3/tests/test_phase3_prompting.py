@@ -0,0 +1,113 @@
+import json
+
+from llm_recommender.models import RecommendSettings
+from llm_recommender.prompt_benchmark import run, sample_candidates
+from llm_recommender.prompting import (
+    build_messages,
+    estimate_tokens,
+    messages_tokens,
+    output_token_budget,
+)
+from llm_recommender.recommender import recommend_with_explanations
+from llm_recommender.xai_client import XAIChatCompletionsClient
+
+PREF = {"location": "Banashankari", "max_results": 3}
+
+
+def test_estimate_tokens_counts_words_digits_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Pasta") == 1
+    assert estimate_tokens('{"a": 1}') == 7
+    assert estimate_tokens("North Indian, Chinese") < estimate_tokens("North Indian, Chinese, Thai")
+
+
+def test_default_encoding_is_unchanged_json():
+    cands = sample_candidates(2)
+    payload = json.loads(build_messages(PREF, cands, 2)[1]["content"])
+    assert payload["candidates"] == [c.to_prompt_dict() for c in cands]
+    assert payload["desired_results"] == 2
+
+
+def test_compact_table_has_one_row_per_candidate():
+    cands = sample_candidates(5)
+    lines = build_messages(PREF, cands, 3, compact=True)[1]["content"].splitlines()
+    table = lines[lines.index("candidates:") + 1:]
+    assert table[0].startswith("#|name|")
+    assert [row.split("|")[1] for row in table[1:]] == [c.name for c in cands]
+    assert table[1].split("|")[8:10] == ["Y", "Y"]
+
+
+def test_budget_trims_fields_before_dropping_candidates():
+    cands = sample_candidates(8)
+    full = build_messages(PREF, cands, 3, compact=True)
+    trimmed = build_messages(PREF, cands, 3, compact=True, max_prompt_tokens=messages_tokens(full) - 50)
+    rows = trimmed[1]["content"].splitlines()[4:]
+    assert len(rows) == 8
+    assert all(len(row.split("|")[10].split(",")) <= 3 for row in rows)
+    assert messages_tokens(trimmed) <= messages_tokens(full) - 50
+
+
+def test_tiny_budget_keeps_desired_candidates():
+    cands = sample_candidates(8)
+    messages = build_messages(PREF, cands, 3, compact=True, max_prompt_tokens=50)
+    assert len(messages[1]["content"].splitlines()) == 4 + 3
+
+
+def test_benchmark_reports_savings():
+    result = run(candidates=8, budget=600)
+    assert result["compact"] < result["json"] * 0.6
+    assert result["compact_budget"] <= 600
+
+
+def test_client_sends_max_tokens():
+    client = XAIChatCompletionsClient(api_key="k", max_tokens=output_token_budget(3))
+    body = json.loads(client._payload("m", [])[0])
+    assert body["max_tokens"] == output_token_budget(3)
+    assert "max_tokens" not in json.loads(XAIChatCompletionsClient(api_key="k")._payload("m", [])[0])
+
+
+def test_index_prompt_numbers_candidates():
+    cands = sample_candidates(3)
+    payload = json.loads(build_messages(PREF, cands, 2, index_output=True)[1]["content"])
+    assert [c["i"] for c in payload["candidates"]] == [1, 2, 3]
+    system = build_messages(PREF, cands, 2, compact=True, index_output=True)[0]["content"]
+    assert '"i"' in system and "restaurant_name" not in system
+
+
+def test_index_answer_is_shorter_than_echoed_names():
+    result = run(candidates=8, desired=5)
+    assert result["output_index"] < result["output_names"] * 0.8
+
+
+class _CapturingClient:
+    def __init__(self):
+        self.messages = None
+
+    def generate(self, *, model, messages, timeout_s):
+        self.messages = messages
+        return "[]"
+
+
+def test_recommender_sends_the_compact_prompt_only_when_asked():
+    cands = sample_candidates(4)
+    client = _CapturingClient()
+    recommend_with_explanations(preference=PREF, candidates=cands, client=client, settings=RecommendSettings())
+    assert len(json.loads(client.messages[1]["content"])["candidates"]) == 4
+
+    settings = RecommendSettings(compact_prompt=True, max_prompt_tokens=600)
+    recommend_with_explanations(preference=PREF, candidates=cands, client=client, settings=settings)
+    assert "candidates:\n#|name|" in client.messages[1]["content"]
+    assert messages_tokens(client.messages) <= 600
+
+
+def test_recommender_asks_for_candidate_numbers_only_when_asked():
+    cands = sample_candidates(2)
+    client = _CapturingClient()
+    recommend_with_explanations(preference=PREF, candidates=cands, client=client, settings=RecommendSettings())
+    assert '"i"' not in client.messages[0]["content"]
+    assert "i" not in json.loads(client.messages[1]["content"])["candidates"][0]
+
+    recommend_with_explanations(
+        preference=PREF, candidates=cands, client=client, settings=RecommendSettings(index_output=True)
+    )
+    assert json.loads(client.messages[1]["content"])["candidates"][0]["i"] == 1
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from llm_recommender.models import LLMError
+from llm_recommender.routing import Backend, RoutingLLMClient
+from llm_recommender.xai_client import XAIChatCompletionsClient
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def _backend(srv, model=None):
+    client = XAIChatCompletionsClient(base_url=f"http://127.0.0.1:{srv.server_port}/v1", api_key_env=None, base_url_env=None)
+    return Backend(srv.name, client, model=model)
+
+
+def _generate(router):
+    return router.generate(model="m", messages=MESSAGES, timeout_s=5)
+
+
+def test_routes_to_the_fastest_backend_after_measuring_each(stubs):
+    slow, fast = stubs("slow", delay_s=0.08), stubs("fast", delay_s=0.01)
+    router = RoutingLLMClient([_backend(slow), _backend(fast)])
+    assert {_generate(router), _generate(router)} == {"slow", "fast"}  # both measured once
+    assert [_generate(router) for _ in range(5)] == ["fast"] * 5
+    stats = {s.name: s for s in router.stats()}
+    assert stats["fast"].latency_ms < stats["slow"].latency_ms
+    assert slow.calls == 1
+
+
+def test_fails_over_and_skips_an_unhealthy_backend(stubs):
+    broken, ok = stubs("broken", fail=True), stubs("ok", delay_s=0.02)
+    router = RoutingLLMClient([_backend(broken), _backend(ok)], alpha=0.5)
+    assert [_generate(router) for _ in range(4)] == ["ok"] * 4
+    assert broken.calls == 1  # error rate 0.5: skipped afterwards
+    assert not {s.name: s for s in router.stats()}["broken"].healthy
+
+
+def test_all_failing_raises(stubs):
+    router = RoutingLLMClient([_backend(stubs("a", fail=True)), _backend(stubs("b", fail=True))])
+    with pytest.raises(LLMError, match="All LLM backends failed"):
+        _generate(router)
+
+
+def test_per_backend_model_names(stubs):
+    local = stubs("local")
+    router = RoutingLLMClient([_backend(local, model="llama3")])
+    _generate(router)
+    assert local.models == ["llama3"]
+
+
+def test_hedges_after_the_primary_p90(stubs):
+    primary, second = stubs("primary", delay_s=0.01), stubs("second", delay_s=0.04)
+    router = RoutingLLMClient([_backend(primary), _backend(second)], hedge=True, hedge_min_samples=3)
+    for _ in range(5):
+        _generate(router)  # both get measured, then "primary" builds a history
+    time.sleep(0.1)  # let calls that lost a warm-up hedge finish
+    assert router.ranked()[0].name == "primary"
+
+    primary.delays = [0.5]  # one slow call on the preferred backend
+    hedges = router.hedges  # warm-up jitter may already have hedged
+    start = time.monotonic()
+    assert _generate(router) == "second"
+    assert time.monotonic() - start < 0.3
+    assert router.hedges == hedges + 1
+
+
+def test_stream_fails_over_before_the_first_piece(stubs):
+    broken, ok = stubs("broken", fail=True), stubs("ok")
+
+    class NoStream:
+        """Wraps a client so streaming falls back to generate."""
+
+        def __init__(self, inner):
+            self.inner = inner
+
+        def generate(self, **kw):
+            return self.inner.generate(**kw)
+
+    router = RoutingLLMClient([Backend("broken", NoStream(_backend(broken).client)), Backend("ok", NoStream(_backend(ok).client))])
+    assert "".join(router.stream(model="m", messages=MESSAGES, timeout_s=5)) == "ok"
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm_recommender.cache import CachingLLMClient
+from llm_recommender.models import LLMError
+from llm_recommender.single_flight import SingleFlight, SingleFlightLLMClient
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class SlowClient:
+    temperature = 0.2
+
+    def __init__(self, response="answer", delay_s=0.1):
+        self.response = response
+        self.delay_s = delay_s
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate(self, *, model, messages, timeout_s):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay_s)
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response + ":" + messages[-1]["content"]
+
+    async def agenerate(self, *, model, messages, timeout_s):
+        with self.lock:
+            self.calls += 1
+        await asyncio.sleep(self.delay_s)
+        return self.response + ":" + messages[-1]["content"]
+
+
+def _in_threads(n, fn):
+    results = [None] * n
+
+    def run(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_threads_share_one_call():
+    inner = SlowClient()
+    client = SingleFlightLLMClient(inner)
+    results = _in_threads(10, lambda: client.generate(model="m", messages=MESSAGES, timeout_s=2))
+    assert results == ["answer:hi"] * 10
+    assert inner.calls == 1
+    assert client.flight.stats().to_dict() == {"calls": 1, "shared": 9}
+
+
+def test_different_prompts_are_not_coalesced():
+    inner = SlowClient(delay_s=0.05)
+    client = SingleFlightLLMClient(inner)
+    results = _in_threads(
+        4, lambda: client.generate(model="m", messages=[{"role": "user", "content": threading.current_thread().name}], timeout_s=2)
+    )
+    assert len(set(results)) == 4
+    assert inner.calls == 4
+
+
+def test_errors_are_shared_and_not_remembered():
+    inner = SlowClient(LLMError("rate limited"))
+    client = SingleFlightLLMClient(inner)
+    results = _in_threads(5, lambda: client.generate(model="m", messages=MESSAGES, timeout_s=2))
+    assert all(isinstance(r, LLMError) for r in results)
+    assert inner.calls == 1
+
+    inner.response = "ok"
+    assert client.generate(model="m", messages=MESSAGES, timeout_s=2) == "ok:hi"
+    assert inner.calls == 2
+
+
+def test_asyncio_tasks_share_one_call():
+    inner = SlowClient()
+    client = SingleFlightLLMClient(inner)
+
+    async def main():
+        return await asyncio.gather(*(client.agenerate(model="m", messages=MESSAGES, timeout_s=2) for _ in range(20)))
+
+    assert asyncio.run(main()) == ["answer:hi"] * 20
+    assert inner.calls == 1
+
+
+def test_threads_and_tasks_share_a_flight():
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return 42
+
+    async def waiter():
+        await asyncio.sleep(0.05)  # let the thread start the call first
+        return await flight.ado("k", lambda: asyncio.sleep(0, result=-1))
+
+    leader = threading.Thread(target=flight.do, args=("k", work))
+    leader.start()
+    assert asyncio.run(waiter()) == 42
+    leader.join()
+    assert len(calls) == 1
+
+
+def test_waiter_timeout_becomes_llm_error():
+    inner = SlowClient(delay_s=0.3)
+    client = SingleFlightLLMClient(inner)
+    results = _in_threads(2, lambda: client.generate(model="m", messages=MESSAGES, timeout_s=0.1))
+    assert sorted(type(r).__name__ for r in results) == ["LLMError", "str"]
+
+
+def test_cache_in_front_only_coalesces_misses():
+    inner = SlowClient()
+    client = CachingLLMClient(SingleFlightLLMClient(inner), validate=None)
+    _in_threads(8, lambda: client.generate(model="m", messages=MESSAGES, timeout_s=2))
+    assert client.generate(model="m", messages=MESSAGES, timeout_s=2) == "answer:hi"
+    assert inner.calls == 1
+    assert client.cache.stats().memory_hits >= 1
+
+
+def test_cancelled_async_leader_fails_waiters_cleanly():
+    flight = SingleFlight()
+
+    async def main():
+        leader = asyncio.create_task(flight.ado("k", lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(flight.ado("k", lambda: asyncio.sleep(0)))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(LLMError):
+            await waiter
+
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from llm_recommender.models import CandidateRestaurant, RecommendSettings
+from llm_recommender.prompt_benchmark import sample_candidates
+from llm_recommender.prompting import build_messages, messages_tokens, output_token_budget
+from llm_recommender.recommender import recommend_with_explanations, stream_recommendations
+from llm_recommender.snippets import SnippetStore, precompute_snippets
+
+
+class SnippetClient:
+    """Answers a snippet batch with one blurb per table row; optionally fails one chunk."""
+
+    def __init__(self, fail_first=None):
+        self.fail_first = fail_first
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def generate(self, *, model, messages, timeout_s):
+        rows = messages[-1]["content"].splitlines()[2:]
+        names = [row.split("|")[1] for row in rows]
+        with self.lock:
+            self.calls.append(names)
+        if self.fail_first is not None and names[0] == self.fail_first:
+            raise RuntimeError("boom")
+        items = [{"i": i, "snippet": f"{name} is known for its food."} for i, name in enumerate(names, start=1)]
+        return "Here you go: " + json.dumps(items)
+
+
+class RecordingClient:
+    def __init__(self, response):
+        self.response = response
+        self.messages = None
+
+    def generate(self, *, model, messages, timeout_s):
+        self.messages = messages
+        return self.response
+
+
+def test_batch_covers_every_restaurant_once_in_chunks():
+    cands = sample_candidates(12)
+    client = SnippetClient()
+    stats = precompute_snippets(cands + cands[:3], client, chunk_size=5, max_workers=3)
+    assert stats.to_dict() == {"restaurants": 12, "reused": 0, "generated": 12, "failed": 0}
+    assert sorted(len(c) for c in client.calls) == [2, 5, 5]
+
+
+def test_batch_resumes_and_skips_stale_entries(tmp_path):
+    cands = sample_candidates(6)
+    path = str(tmp_path / "snippets.json")
+    client = SnippetClient(fail_first=cands[3].name)
+    first = precompute_snippets(cands, client, chunk_size=3, on_chunk=lambda s: s.save(path))
+    assert (first.generated, first.failed) == (3, 3)
+
+    store = SnippetStore.load(path)
+    assert store.get(cands[0]) == "Jalsa is known for its food."
+    changed = CandidateRestaurant(**{**cands[0].__dict__, "dish_liked": "Something new"})
+    assert store.get(changed) is None
+
+    second = precompute_snippets([changed] + cands[1:], SnippetClient(), store=store, chunk_size=3)
+    assert second.to_dict() == {"restaurants": 6, "reused": 2, "generated": 4, "failed": 0}
+
+
+def test_rank_mode_asks_only_for_order_and_explains_from_snippets():
+    cands = sample_candidates(4)
+    store = SnippetStore()
+    store.put(cands[2], "Known for churros and pasta.")
+    client = RecordingClient('[{"i":3},{"i":1}]')
+    recs = recommend_with_explanations(
+        preference=SimpleNamespace(max_results=2),
+        candidates=cands,
+        client=client,
+        settings=RecommendSettings(llm_mode="rank"),
+        snippets=store,
+    )
+    assert [r.restaurant_name for r in recs] == ["San Churro Cafe", "Jalsa"]
+    assert recs[0].explanation == "Known for churros and pasta. Rated 3.8, approx. ₹800 for two."
+    assert recs[1].explanation.startswith("Rated 4.1")  # no snippet: template
+    assert '"why"' not in client.messages[0]["content"]
+
+
+def test_rank_prompt_and_budget_are_smaller():
+    cands = sample_candidates(8)
+    explain = build_messages({}, cands, 5, compact=True, index_output=True)
+    rank = build_messages({}, cands, 5, compact=True, index_output=True, explain=False)
+    assert messages_tokens(rank) < messages_tokens(explain)
+    assert output_token_budget(5, explain=False) < output_token_budget(5, index_output=True) / 4
+
+
+def test_off_mode_makes_no_call():
+    cands = sample_candidates(3)
+    store = SnippetStore()
+    store.put(cands[0], "Buffet favourite.")
+
+    class NoCall:
+        def generate(self, **kw):
+            raise AssertionError("LLM called")
+
+    settings = RecommendSettings(llm_mode="off")
+    recs = recommend_with_explanations(preference=SimpleNamespace(max_results=2), candidates=cands, client=NoCall(), settings=settings, snippets=store)
+    assert [r.restaurant_name for r in recs] == ["Jalsa", "Spice Elephant"]
+    assert recs[0].explanation.startswith("Buffet favourite. Rated 4.1")
+    streamed = list(stream_recommendations(preference=SimpleNamespace(max_results=2), candidates=cands, client=NoCall(), settings=settings, snippets=store))
+    assert streamed == recs
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="llm_mode"):
+        recommend_with_explanations(preference={}, candidates=sample_candidates(1), settings=RecommendSettings(llm_mode="fast"))
@@ -0,0 +1,113 @@
+import json
+
+from llm_recommender.cache import ResponseCache
+from llm_recommender.models import CandidateRestaurant, LLMError, RecommendSettings
+from llm_recommender.parser import IncrementalArrayParser, StreamingRecommendationParser
+from llm_recommender.recommender import recommend_with_explanations, stream_recommendations
+from llm_recommender.xai_client import sse_deltas
+
+CANDIDATES = [
+    CandidateRestaurant(name="Onesta", cuisines="Italian", rate="4.6/5"),
+    CandidateRestaurant(name="Jalsa", cuisines="North Indian", rate="4.1/5"),
+    CandidateRestaurant(name="Truffles", cuisines="Cafe", rate="4.4/5"),
+]
+ITEMS = [
+    {"rank": 1, "restaurant_name": "Jalsa", "explanation": "Curry {rich} and \"hearty\"."},
+    {"rank": 2, "restaurant_name": "Truffles", "explanation": "Burgers]", "attributes": {"tags": ["a", "b"]}},
+    {"rank": 3, "restaurant_name": "Onesta", "explanation": "Pizza."},
+]
+RAW = "Here you go:\n" + json.dumps(ITEMS) + "\nEnjoy!"
+
+
+class StreamingClient:
+    def __init__(self, text=RAW, piece=7, fail_after=None):
+        self.text = text
+        self.piece = piece
+        self.fail_after = fail_after
+        self.sent = 0
+
+    def generate(self, *, model, messages, timeout_s):
+        return self.text
+
+    def stream(self, *, model, messages, timeout_s):
+        for start in range(0, len(self.text), self.piece):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise LLMError("connection reset")
+            self.sent = start + self.piece
+            yield self.text[start:start + self.piece]
+
+
+class BlockingClient:
+    def generate(self, *, model, messages, timeout_s):
+        return RAW
+
+
+def test_items_are_emitted_when_they_close():
+    parser = IncrementalArrayParser()
+    emitted = []
+    for i, ch in enumerate(RAW):
+        for item in parser.feed(ch):
+            emitted.append((i, item))
+    assert [item for _, item in emitted] == ITEMS
+    first_close = RAW.index(json.dumps(ITEMS[0])) + len(json.dumps(ITEMS[0])) - 1
+    assert emitted[0][0] == first_close
+    assert parser.done
+
+
+def test_invalid_items_are_skipped_with_warning():
+    parser = StreamingRecommendationParser()
+    recs = parser.feed('[{"restaurant_name": "A"}, {"bad": tru}, {"explanation": "no name"}, {"name": "B"}]')
+    assert [r.restaurant_name for r in recs] == ["A", "B"]
+    assert len(parser.warnings) == 2
+
+
+def test_stream_matches_blocking_result():
+    settings = RecommendSettings(max_results=3)
+    streamed = list(
+        stream_recommendations(preference={}, candidates=CANDIDATES, client=StreamingClient(), settings=settings)
+    )
+    blocking = recommend_with_explanations(preference={}, candidates=CANDIDATES, client=BlockingClient(), settings=settings)
+    assert streamed == blocking
+
+
+def test_first_recommendation_arrives_before_the_rest_is_generated():
+    client = StreamingClient(piece=4)
+    stream = stream_recommendations(
+        preference={}, candidates=CANDIDATES, client=client, settings=RecommendSettings(max_results=3)
+    )
+    first = next(stream)
+    assert first.restaurant_name == "Jalsa"
+    assert client.sent < len(RAW) / 2
+    stream.close()
+
+
+def test_failure_mid_stream_keeps_items_and_fills_the_rest():
+    client = StreamingClient(fail_after=RAW.index("Truffles"))
+    out = list(
+        stream_recommendations(preference={}, candidates=CANDIDATES, client=client, settings=RecommendSettings(max_results=3))
+    )
+    assert [r.restaurant_name for r in out] == ["Jalsa", "Onesta", "Truffles"]
+    assert out[0].explanation.startswith("Curry")
+    assert out[1].explanation.startswith("Rated")  # template fallback
+
+
+def test_clients_without_streaming_still_work_and_cache_is_filled():
+    cache = ResponseCache()
+    settings = RecommendSettings(max_results=2)
+    first = list(stream_recommendations(preference={}, candidates=CANDIDATES, client=BlockingClient(), settings=settings, ranking_cache=cache))
+    again = list(stream_recommendations(preference={}, candidates=CANDIDATES, client=None, settings=settings, ranking_cache=cache))
+    assert first == again
+    assert [r.restaurant_name for r in again] == ["Jalsa", "Truffles"]
+
+
+def test_sse_deltas():
+    lines = [
+        b": keep-alive\n",
+        b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n',
+        b"\n",
+        b'data: {"choices": [{"delta": {"content": "[{\\"a\\""}}]}\n',
+        b'data: {"choices": [{"delta": {"content": ": 1}]"}}]}\n',
+        b"data: [DONE]\n",
+        b'data: {"choices": [{"delta": {"content": "ignored"}}]}\n',
+    ]
+    assert "".join(sse_deltas(lines)) == '[{"a": 1}]'
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import json
 import os
 import sys
+import threading
 import uuid
-from typing import Any, Dict, Optional
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 
 # ---------------------------------------------------------------------------
 # Path setup: ensure phase-1, phase-2, phase-3 packages are importable.
@@ -21,19 +24,42 @@ for _phase in ("phase-1", "phase-2", "phase-3"):
         sys.path.insert(0, _p)
 
 # Phase 1 imports
-from restaurant_recommender import Preference, RestaurantDataStore, retrieve
+from restaurant_recommender import Preference, RestaurantDataStore, ResultHandleCache, retrieve, retrieve_refined
+from restaurant_recommender.autocomplete import AUTOCOMPLETE_FIELDS
 from restaurant_recommender.loader import load_dataset_from_hf
 
 # Phase 2 imports
 from preference_validation.validator import validate_preference
 from preference_validation.models import PreferenceValidationError, ValidatedPreference
+from preference_validation.gazetteer import Gazetteer
+from preference_validation.vocabulary import PreferenceVocabulary
+from preference_validation.text_parser import parse_preference_text
 
 # Phase 3 imports
-from llm_recommender.recommender import recommend_with_explanations
+from llm_recommender.recommender import recommend_with_explanations, stream_recommendations
+from llm_recommender.background import deadline_after
+from llm_recommender.cascade import CascadeTracker
+from llm_recommender.distill import DistilledRanker, RankingLog
 from llm_recommender.models import RecommendSettings
+from llm_recommender.prompting import output_token_budget
+from llm_recommender.cache import CachingLLMClient, ResponseCache
+from llm_recommender.http_pool import HTTPConnectionPool
+from llm_recommender.single_flight import SingleFlightLLMClient
+from llm_recommender.circuit_breaker import CircuitBreaker, CircuitBreakerLLMClient
+from llm_recommender.routing import Backend, RoutingLLMClient
+from llm_recommender.snippets import SnippetStore
+from llm_recommender.xai_client import LLMClient, XAIChatCompletionsClient
 
 # Local imports
-from .schemas import ErrorResponse, RecommendationItem, RecommendationResponse
+from .schemas import (
+    AutocompleteResponse,
+    ErrorResponse,
+    FacetsResponse,
+    RecommendationItem,
+    RecommendationResponse,
+    SimilarRestaurantItem,
+    SimilarResponse,
+)
 from .errors import register_error_handlers
 
 
@@ -46,6 +72,10 @@ def _validated_to_phase1_preference(vp: ValidatedPreference) -> Preference:
         price_max=vp.price_max,
         min_rating=vp.min_rating,
         cuisine=vp.cuisine,
+        online_order=vp.online_order,
+        book_table=vp.book_table,
+        rest_type=vp.rest_type,
+        min_votes=vp.min_votes,
     )
 
 
@@ -64,17 +94,117 @@ def _filters_applied(vp: ValidatedPreference) -> Dict[str, Any]:
         d["min_rating"] = vp.min_rating
     if vp.cuisine is not None:
         d["cuisine"] = vp.cuisine
+    if vp.online_order is not None:
+        d["online_order"] = vp.online_order
+    if vp.book_table is not None:
+        d["book_table"] = vp.book_table
+    if vp.rest_type is not None:
+        d["rest_type"] = vp.rest_type
+    if vp.min_votes is not None:
+        d["min_votes"] = vp.min_votes
     if vp.max_results is not None:
         d["max_results"] = vp.max_results
     return d
 
 
+def _corrections(vp: ValidatedPreference) -> Optional[Dict[str, Any]]:
+    """Spelling fixes and suggestions made while validating, or None if there were none."""
+    if not vp.corrections and not vp.suggestions:
+        return None
+    d: Dict[str, Any] = {}
+    for name, original in vp.corrections.items():
+        d[name] = {"input": original, "corrected": getattr(vp, name)}
+    for name, names in vp.suggestions.items():
+        d[name] = {"input": getattr(vp, name), "suggestions": names}
+    return d
+
+
+def _record_attributes(rec: Any) -> Dict[str, Any]:
+    """Key attributes shown alongside a restaurant in API responses."""
+    return {
+        "cuisines": rec.cuisines,
+        "rating": rec.rating_numeric if rec.rating_numeric is not None else rec.rate,
+        "approx_cost": rec.approx_cost,
+        "location": rec.location,
+    }
+
+
+SIMILAR_DEFAULT_LIMIT = 5
+SIMILAR_MAX_LIMIT = 20
+AUTOCOMPLETE_DEFAULT_LIMIT = 8
+AUTOCOMPLETE_MAX_LIMIT = 20
+# Preference fields the relaxation ladder may loosen.
+_RELAXABLE_FIELDS = ("min_rating", "price_min", "price_max", "cuisine", "location", "city")
+SESSION_HEADER = "X-Session-Id"
+SESSION_ID_MAX_LENGTH = 128
+# Client's end-to-end budget in milliseconds; past it the LLM is not waited for.
+DEADLINE_HEADER = "X-Deadline-Ms"
+DEADLINE_MAX_MS = 120_000
+
+
+def _parse_limit(raw: Any, maximum: int) -> Optional[int]:
+    """Parse a ``limit`` query parameter; None if it is not an int in [1, maximum]."""
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        return None
+    return limit if 1 <= limit <= maximum else None
+
+
+def _parse_deadline_ms(raw: Optional[str]) -> Optional[int]:
+    """``X-Deadline-Ms`` as an int in [1, DEADLINE_MAX_MS]; None (ignored) otherwise."""
+    return _parse_limit(raw, DEADLINE_MAX_MS) if raw else None
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """One server-sent event; JSON never contains a raw newline, so one data line suffices."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _prewarm(clients: List[XAIChatCompletionsClient]) -> None:
+    for client in clients:
+        try:
+            client.prewarm()
+        except Exception:
+            pass  # the first request connects instead
+
+
+def _router_from_env(max_tokens: int) -> Optional[RoutingLLMClient]:
+    """
+    Router over ``$LLM_BACKENDS``, a JSON list of OpenAI-compatible backends:
+    ``[{"name": "xai", "base_url": "https://api.x.ai/v1", "api_key_env": "XAI_API_KEY"},
+    {"name": "local", "base_url": "http://localhost:8000/v1", "model": "llama3"}]``
+    (no ``api_key_env`` = no key). ``$LLM_HEDGE=1`` turns on hedging.
+    """
+    raw = os.environ.get("LLM_BACKENDS")
+    if not raw:
+        return None
+    backends = [
+        Backend(
+            name=b["name"],
+            client=XAIChatCompletionsClient(
+                base_url=b["base_url"],
+                api_key_env=b.get("api_key_env"),
+                base_url_env=None,
+                pool=HTTPConnectionPool(),
+                max_tokens=max_tokens,
+            ),
+            model=b.get("model"),
+        )
+        for b in json.loads(raw)
+    ]
+    return RoutingLLMClient(backends, hedge=os.environ.get("LLM_HEDGE") == "1")
+
+
 # ── App factory ────────────────────────────────────────────────────────────
 
 
 def create_app(
     store: Optional[RestaurantDataStore] = None,
     settings: Optional[RecommendSettings] = None,
+    client: Optional[LLMClient] = None,
+    snippets: Optional[SnippetStore] = None,
+    ranker: Optional[DistilledRanker] = None,
 ) -> Flask:
     """
     Create and configure the Flask application.
@@ -86,6 +216,31 @@ def create_app(
         on first request (useful for production; tests always pass a store).
     settings : RecommendSettings, optional
         LLM configuration. Defaults to ``RecommendSettings()``.
+    client : LLMClient, optional
+        LLM client. Defaults to the xAI client on a keep-alive connection
+        pool behind a response cache (in memory, plus SQLite at
+        ``$LLM_CACHE_PATH`` when set); concurrent cache misses for the same
+        prompt share one call, and a circuit breaker stops calling xAI
+        while it fails or is slow. With ``$LLM_BACKENDS`` set, calls are
+        routed across those endpoints instead (see ``_router_from_env``).
+        With ``XAI_API_KEY`` set, the pool
+        is prewarmed in the background so the first request skips the
+        TCP+TLS handshake.
+    snippets : SnippetStore, optional
+        Precomputed explanation snippets (see ``precompute_snippets``).
+        Defaults to the file at ``$LLM_SNIPPETS_PATH`` when set. Used for
+        explanations the LLM did not write: ``settings.llm_mode`` "rank",
+        "off" or "local" (``$LLM_MODE`` when no settings are given), and
+        fallbacks. ``$LLM_LOCAL_PRERANK=1`` sets ``settings.local_prerank``.
+    ranker : DistilledRanker, optional
+        Learned ranker (see ``train_ranker``) that answers instead of the
+        LLM when confident. Defaults to the file at ``$LLM_RANKER_PATH``
+        when set. With ``$LLM_RANKING_LOG`` set, every LLM ranking is
+        appended to that file as training data.
+
+    ``$LLM_FAST_MODEL`` (when no settings are given) sets
+    ``settings.fast_model``: that model answers first and the default one
+    only when its answer fails validation; /health reports the outcomes.
     """
     app = Flask(__name__)
     app.config["JSON_SORT_KEYS"] = False
@@ -97,10 +252,49 @@ def create_app(
     def add_cors_headers(response):
         response.headers["Access-Control-Allow-Origin"] = "*"
         response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type"
+        response.headers["Access-Control-Allow-Headers"] = f"Content-Type, {SESSION_HEADER}, {DEADLINE_HEADER}"
         return response
 
-    _settings = settings or RecommendSettings()
+    _settings = settings or RecommendSettings(
+        llm_mode=os.environ.get("LLM_MODE") or "explain",
+        fast_model=os.environ.get("LLM_FAST_MODEL") or None,
+        local_prerank=os.environ.get("LLM_LOCAL_PRERANK") == "1",
+        compact_prompt=os.environ.get("LLM_COMPACT_PROMPT") == "1",
+        index_output=os.environ.get("LLM_INDEX_OUTPUT") == "1",
+        max_prompt_tokens=int(os.environ["LLM_MAX_PROMPT_TOKENS"]) if os.environ.get("LLM_MAX_PROMPT_TOKENS") else None,
+    )
+    breaker: Optional[CircuitBreaker] = None
+    router: Optional[RoutingLLMClient] = None
+    if snippets is None and os.environ.get("LLM_SNIPPETS_PATH"):
+        snippets = SnippetStore.load(os.environ["LLM_SNIPPETS_PATH"])
+    _snippets = snippets
+    if ranker is None and os.environ.get("LLM_RANKER_PATH"):
+        ranker = DistilledRanker.load(os.environ["LLM_RANKER_PATH"])
+    _ranker = ranker
+    _ranking_log = RankingLog(os.environ["LLM_RANKING_LOG"]) if os.environ.get("LLM_RANKING_LOG") else None
+    if client is None:
+        # Answers never hold more items than the candidates in the prompt, which grows to
+        # a request's max_results but never past the top-K.
+        max_tokens = output_token_budget(_settings.top_k_candidates, _settings.index_output, explain=_settings.llm_mode != "rank")
+        router = _router_from_env(max_tokens)
+        if router is not None:
+            provider: LLMClient = router
+            endpoints = [b.client for b in router.backends]
+        else:
+            provider = XAIChatCompletionsClient(pool=HTTPConnectionPool(), max_tokens=max_tokens)
+            endpoints = [provider]
+        breaker = CircuitBreaker()
+        client = CachingLLMClient(
+            SingleFlightLLMClient(CircuitBreakerLLMClient(provider, breaker)),
+            ResponseCache(path=os.environ.get("LLM_CACHE_PATH") or None),
+        )
+        ready = [c for c in endpoints if c.ready()]
+        if ready:
+            threading.Thread(target=_prewarm, args=(ready,), daemon=True).start()
+    _client = client
+    # Reuses LLM rankings across requests that retrieved the same candidates.
+    _ranking_cache = ResponseCache()
+    _cascade = CascadeTracker() if _settings.fast_model else None
     _store: Dict[str, Optional[RestaurantDataStore]] = {"instance": store}
 
     def _get_store() -> RestaurantDataStore:
@@ -109,17 +303,82 @@ def create_app(
             _store["instance"] = RestaurantDataStore(records)
         return _store["instance"]  # type: ignore[return-value]
 
+    _vocab: Dict[str, Any] = {"generation": None, "gazetteer": None, "vocabulary": None}
+
+    def _refresh_vocab() -> Dict[str, Any]:
+        """Gazetteer and fuzzy vocabulary over the store, rebuilt when the store generation changes."""
+        data_store = _get_store()
+        if _vocab["generation"] != data_store.generation:
+            index = data_store.column_index()
+            areas = [v for v, _ in index.vocabulary("area")]
+            cities = [v for v, _ in index.vocabulary("city")]
+            cuisines = [v for v, _ in index.vocabulary("cuisine")]
+            _vocab["gazetteer"] = Gazetteer.from_vocabulary(
+                locations=areas,
+                cities=cities,
+                cuisines=cuisines,
+                rest_types=[v for v, _ in index.vocabulary("rest_type")],
+            )
+            _vocab["vocabulary"] = PreferenceVocabulary.from_values(
+                cities=cities,
+                locations=areas,
+                cuisines=cuisines,
+            )
+            _vocab["generation"] = data_store.generation
+        return _vocab
+
+    def _get_gazetteer() -> Gazetteer:
+        return _refresh_vocab()["gazetteer"]
+
+    def _get_vocabulary() -> PreferenceVocabulary:
+        return _refresh_vocab()["vocabulary"]
+
+    _result_handles = ResultHandleCache()
+
+    def _session_id() -> Optional[str]:
+        """Client-chosen session id; refinements within a session reuse the last result set."""
+        value = request.headers.get(SESSION_HEADER, "").strip()
+        return value if 0 < len(value) <= SESSION_ID_MAX_LENGTH else None
+
+    def _deadline() -> Optional[float]:
+        """When this request must be answered: ``X-Deadline-Ms`` from now, else ``settings.deadline_s``."""
+        ms = _parse_deadline_ms(request.headers.get(DEADLINE_HEADER))
+        return deadline_after(ms / 1000 if ms is not None else _settings.deadline_s)
+
     # ── Health check ───────────────────────────────────────────────────
 
     @app.route("/health", methods=["GET"])
     def health():
-        return jsonify({"status": "ok"}), 200
+        body: Dict[str, Any] = {"status": "ok"}
+        if isinstance(_client, CachingLLMClient):
+            body["llm_cache"] = _client.cache.stats().to_dict()
+            if isinstance(_client.inner, SingleFlightLLMClient):
+                body["llm_single_flight"] = _client.inner.flight.stats().to_dict()
+        body["ranking_cache"] = _ranking_cache.stats().to_dict()
+        if breaker is not None:
+            body["llm_circuit"] = breaker.stats().to_dict()
+        if router is not None:
+            body["llm_backends"] = [s.to_dict() for s in router.stats()]
+            body["llm_hedges"] = router.hedges
+        if _cascade is not None:
+            body["llm_cascade"] = _cascade.stats().to_dict()
+        if _ranker is not None:
+            body["distilled_ranker"] = _ranker.stats().to_dict()
+        body["llm_mode"] = _settings.llm_mode
+        body["snippets"] = len(_snippets) if _snippets is not None else 0
+        return jsonify(body), 200
 
     # ── Metadata endpoint (areas + cuisines for frontend dropdowns) ────
 
     @app.route("/metadata", methods=["GET"])
     def metadata():
         data_store = _get_store()
+        if request.args.get("summary", "").lower() in ("1", "true", "yes"):
+            # Counts only: dropdowns use /autocomplete instead of the full lists.
+            return jsonify({
+                "area_count": len(data_store.prefix_index("area")),
+                "cuisine_count": len(data_store.prefix_index("cuisine")),
+            }), 200
         areas: set[str] = set()
         cuisines: set[str] = set()
         for rec in data_store._records:
@@ -135,25 +394,40 @@ def create_app(
             "cuisines": sorted(cuisines, key=str.lower),
         }), 200
 
-    # ── Recommendation endpoint ────────────────────────────────────────
+    # ── Prefix autocomplete for areas / cities / cuisines ─────────────
 
-    @app.route("/recommend", methods=["POST"])
-    def recommend():
+    @app.route("/autocomplete", methods=["GET"])
+    def autocomplete():
         request_id = str(uuid.uuid4())
 
-        # 1. Parse JSON body
-        body = request.get_json(silent=True)
-        if body is None:
-            err = ErrorResponse(
-                error="Bad request",
-                details=["Request body must be valid JSON with Content-Type: application/json"],
-                request_id=request_id,
-            )
-            return jsonify(err.to_dict()), 400
+        field = request.args.get("field", "")
+        prefix = request.args.get("prefix", "")
+        errors = []
+        if field not in AUTOCOMPLETE_FIELDS:
+            errors.append(f"field must be one of: {', '.join(AUTOCOMPLETE_FIELDS)}")
+        limit = _parse_limit(request.args.get("limit", AUTOCOMPLETE_DEFAULT_LIMIT), AUTOCOMPLETE_MAX_LIMIT)
+        if limit is None:
+            errors.append(f"limit must be an integer between 1 and {AUTOCOMPLETE_MAX_LIMIT}")
+        if errors:
+            err = ErrorResponse(error="Validation error", details=errors, request_id=request_id)
+            return jsonify(err.to_dict()), 422
+
+        response = AutocompleteResponse(
+            request_id=request_id,
+            field=field,
+            prefix=prefix,
+            completions=_get_store().autocomplete(field, prefix, limit=limit),
+        )
+        return jsonify(response.to_dict()), 200
+
+    # ── Facet counts for the current (partial) filter selection ──────
+
+    @app.route("/facets", methods=["GET"])
+    def facets():
+        request_id = str(uuid.uuid4())
 
-        # 2. Validate preferences (Phase 2)
         try:
-            validated: ValidatedPreference = validate_preference(body)
+            validated = validate_preference(request.args.to_dict(), vocabulary=_get_vocabulary())
         except PreferenceValidationError as exc:
             err = ErrorResponse(
                 error="Validation error",
@@ -162,15 +436,98 @@ def create_app(
             )
             return jsonify(err.to_dict()), 422
 
-        # 3. Convert to Phase 1 Preference and retrieve candidates
-        pref = _validated_to_phase1_preference(validated)
+        counts = _get_store().facets(_validated_to_phase1_preference(validated))
+        response = FacetsResponse(
+            request_id=request_id,
+            filters_applied=_filters_applied(validated),
+            total=counts.total,
+            facets={
+                "location": counts.location,
+                "cuisine": counts.cuisine,
+                "price": counts.price,
+                "rating": counts.rating,
+            },
+        )
+        return jsonify(response.to_dict()), 200
+
+    # ── Similar restaurants (precomputed content index, no LLM) ───────
+
+    @app.route("/similar/<path:restaurant>", methods=["GET"])
+    def similar(restaurant: str):
+        request_id = str(uuid.uuid4())
+
+        limit = _parse_limit(request.args.get("limit", SIMILAR_DEFAULT_LIMIT), SIMILAR_MAX_LIMIT)
+        if limit is None:
+            err = ErrorResponse(
+                error="Validation error",
+                details=[f"limit must be an integer between 1 and {SIMILAR_MAX_LIMIT}"],
+                request_id=request_id,
+            )
+            return jsonify(err.to_dict()), 422
+
         data_store = _get_store()
-        candidates = retrieve(
-            data_store,
-            pref,
-            sort_by_rating=True,
-            top_k=_settings.top_k_candidates,
+        try:
+            neighbours = data_store.similar(restaurant, top_n=limit)
+        except KeyError:
+            err = ErrorResponse(
+                error="Not found",
+                details=[f"Unknown restaurant: {restaurant}"],
+                request_id=request_id,
+            )
+            return jsonify(err.to_dict()), 404
+
+        response = SimilarResponse(
+            request_id=request_id,
+            restaurant_name=restaurant,
+            similar=[
+                SimilarRestaurantItem(
+                    restaurant_name=rec.name,
+                    score=score,
+                    attributes=_record_attributes(rec),
+                )
+                for rec, score in neighbours
+            ],
         )
+        return jsonify(response.to_dict()), 200
+
+    def _candidates(
+        validated: ValidatedPreference,
+    ) -> Tuple[ValidatedPreference, List[Any], Optional[Dict[str, Any]]]:
+        """Step 3 of the pipeline: retrieve, relax if nothing matched, deduplicate."""
+        pref = _validated_to_phase1_preference(validated)
+        data_store = _get_store()
+        session_id = _session_id()
+        if session_id is None:
+            candidates = retrieve(
+                data_store,
+                pref,
+                sort_by_rating=True,
+                top_k=_settings.top_k_candidates,
+            )
+        else:
+            candidates, handle = retrieve_refined(
+                data_store,
+                pref,
+                previous=_result_handles.get(session_id),
+                sort_by_rating=True,
+                top_k=_settings.top_k_candidates,
+            )
+            _result_handles.put(session_id, handle)
+
+        # 3a. Nothing matched: serve the least relaxed version that does,
+        #     from one pass over the filter bitmaps instead of client retries.
+        relaxation = None
+        if not candidates:
+            relaxed = data_store.relax(pref)
+            if relaxed is not None and relaxed.relaxed:
+                relaxation = {"relaxed": relaxed.relaxed, "requested": _filters_applied(validated)}
+                validated = replace(validated, **{k: getattr(relaxed.preference, k) for k in _RELAXABLE_FIELDS})
+                candidates = retrieve(
+                    data_store,
+                    relaxed.preference,
+                    sort_by_rating=True,
+                    top_k=_settings.top_k_candidates,
+                )
 
         # 3b. Deduplicate by restaurant name (dataset has dupes under
         #     different listing categories).  Keep the first occurrence
@@ -182,14 +539,31 @@ def create_app(
             if key not in seen_names:
                 seen_names.add(key)
                 unique_candidates.append(c)
-        candidates = unique_candidates
+        return validated, unique_candidates, relaxation
+
+    def _recommendation_response(
+        validated: ValidatedPreference,
+        request_id: str,
+        interpretation: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None,
+    ) -> RecommendationResponse:
+        """Steps 3-5 of the pipeline: retrieve, rank with the LLM, build the response."""
+        # 3. Convert to Phase 1 Preference and retrieve candidates
+        validated, candidates, relaxation = _candidates(validated)
 
         # 4. Get LLM-ranked recommendations (Phase 3)
         #    recommend_with_explanations handles its own fallback.
         recommendations = recommend_with_explanations(
             preference=validated,
             candidates=candidates,
+            client=_client,
             settings=_settings,
+            ranking_cache=_ranking_cache,
+            snippets=_snippets,
+            deadline=deadline,
+            ranker=_ranker,
+            ranking_log=_ranking_log,
+            cascade_stats=_cascade,
         )
 
         # 5. Build response
@@ -203,13 +577,160 @@ def create_app(
             for rec in recommendations
         ]
 
-        response = RecommendationResponse(
+        # The fast model, when the cascade served its answer.
+        model_used = next((rec.model for rec in recommendations if rec.model), _settings.model)
+        return RecommendationResponse(
             request_id=request_id,
-            model_used=_settings.model,
+            model_used=model_used,
             filters_applied=_filters_applied(validated),
             recommendations=items,
+            interpretation=interpretation,
+            relaxation=relaxation,
+            corrections=_corrections(validated),
         )
 
+    def _validate_body(request_id: str):
+        """Parse and validate a JSON preference body; returns (validated, None) or (None, error response)."""
+        body = request.get_json(silent=True)
+        if body is None:
+            err = ErrorResponse(
+                error="Bad request",
+                details=["Request body must be valid JSON with Content-Type: application/json"],
+                request_id=request_id,
+            )
+            return None, (jsonify(err.to_dict()), 400)
+
+        try:
+            return validate_preference(body, vocabulary=_get_vocabulary()), None
+        except PreferenceValidationError as exc:
+            err = ErrorResponse(
+                error="Validation error",
+                details=list(exc.errors),
+                request_id=request_id,
+            )
+            return None, (jsonify(err.to_dict()), 422)
+
+    # ── Recommendation endpoint ────────────────────────────────────────
+
+    @app.route("/recommend", methods=["POST"])
+    def recommend():
+        request_id = str(uuid.uuid4())
+        deadline = _deadline()
+
+        # 1-2. Parse JSON body and validate preferences (Phase 2)
+        validated, error = _validate_body(request_id)
+        if error is not None:
+            return error
+
+        response = _recommendation_response(validated, request_id, deadline=deadline)
+        return jsonify(response.to_dict()), 200
+
+    # ── Streaming recommendations (server-sent events) ─────────────────
+
+    @app.route("/recommend/stream", methods=["POST"])
+    def recommend_stream():
+        """
+        Same input as /recommend. Validation errors are plain JSON; otherwise
+        the reply is an event stream: ``meta`` (the /recommend response with
+        an empty list), one ``recommendation`` per item as soon as the LLM
+        has written it, then ``done``.
+        """
+        request_id = str(uuid.uuid4())
+        deadline = _deadline()
+
+        validated, error = _validate_body(request_id)
+        if error is not None:
+            return error
+
+        # Retrieval needs the request (session header), so it runs before streaming starts.
+        validated, candidates, relaxation = _candidates(validated)
+        meta = RecommendationResponse(
+            request_id=request_id,
+            model_used=_settings.model,
+            filters_applied=_filters_applied(validated),
+            relaxation=relaxation,
+            corrections=_corrections(validated),
+        )
+
+        def events():
+            yield _sse("meta", meta.to_dict())
+            count = 0
+            for rec in stream_recommendations(
+                preference=validated,
+                candidates=candidates,
+                client=_client,
+                settings=_settings,
+                ranking_cache=_ranking_cache,
+                snippets=_snippets,
+                deadline=deadline,
+                ranker=_ranker,
+                ranking_log=_ranking_log,
+            ):
+                item = RecommendationItem(
+                    rank=rec.rank,
+                    restaurant_name=rec.restaurant_name,
+                    explanation=rec.explanation,
+                    attributes=rec.attributes,
+                )
+                count += 1
+                yield _sse("recommendation", item.to_dict())
+            yield _sse("done", {"request_id": request_id, "count": count})
+
+        return Response(
+            events(),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    # ── Free-text recommendation (local rule-based parsing, no extra LLM call) ──
+
+    @app.route("/recommend/text", methods=["POST"])
+    def recommend_text():
+        request_id = str(uuid.uuid4())
+        deadline = _deadline()
+
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            err = ErrorResponse(
+                error="Bad request",
+                details=["Request body must be valid JSON with Content-Type: application/json"],
+                request_id=request_id,
+            )
+            return jsonify(err.to_dict()), 400
+
+        overrides = dict(body)
+        query = overrides.pop("query", None)
+        if not isinstance(query, str) or not query.strip():
+            err = ErrorResponse(
+                error="Validation error",
+                details=["query must be a non-empty string"],
+                request_id=request_id,
+            )
+            return jsonify(err.to_dict()), 422
+
+        try:
+            parsed = parse_preference_text(
+                query, _get_gazetteer(), overrides=overrides, vocabulary=_get_vocabulary()
+            )
+        except PreferenceValidationError as exc:
+            err = ErrorResponse(
+                error="Validation error",
+                details=list(exc.errors),
+                request_id=request_id,
+            )
+            return jsonify(err.to_dict()), 422
+
+        response = _recommendation_response(
+            parsed.preference,
+            request_id,
+            interpretation={
+                "query": query,
+                "extracted": parsed.extracted,
+                "leftover": parsed.leftover,
+                "ambiguous": parsed.ambiguous,
+            },
+            deadline=deadline,
+        )
         return jsonify(response.to_dict()), 200
 
     return app
@@ -18,6 +18,14 @@ def register_error_handlers(app: Flask) -> None:
         )
         return jsonify(body.to_dict()), 400
 
+    @app.errorhandler(404)
+    def not_found(exc: Exception):
+        body = ErrorResponse(
+            error="Not found",
+            details=[str(exc)],
+        )
+        return jsonify(body.to_dict()), 404
+
     @app.errorhandler(422)
     def validation_error(exc: Exception):
         body = ErrorResponse(
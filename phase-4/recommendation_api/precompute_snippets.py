@@ -0,0 +1,58 @@
+"""
+Offline batch job: precompute an explanation snippet for every restaurant.
+
+    python -m recommendation_api.precompute_snippets [--out snippets.json] [--chunk-size 20] [--workers 4]
+
+Writes the file the API loads from ``$LLM_SNIPPETS_PATH``. An existing file
+is reused, so a rerun only asks for new, changed or previously failed
+restaurants. Needs ``XAI_API_KEY``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import List, Optional
+
+from . import app as _app  # noqa: F401  (puts phase-1..3 on sys.path)
+
+from restaurant_recommender.loader import load_dataset_from_hf
+
+from llm_recommender.http_pool import HTTPConnectionPool
+from llm_recommender.models import RecommendSettings
+from llm_recommender.snippets import DEFAULT_CHUNK_SIZE, SnippetStore, precompute_snippets, snippet_token_budget
+from llm_recommender.xai_client import XAIChatCompletionsClient
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default=os.environ.get("LLM_SNIPPETS_PATH") or "snippets.json")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=None, help="only the first N records (for a trial run)")
+    args = parser.parse_args(argv)
+
+    settings = RecommendSettings(timeout_s=60.0)
+    store = SnippetStore.load(args.out) if os.path.exists(args.out) else SnippetStore(model=settings.model)
+    records = load_dataset_from_hf()[: args.limit]
+    client = XAIChatCompletionsClient(
+        pool=HTTPConnectionPool(max_per_host=args.workers),
+        max_tokens=snippet_token_budget(args.chunk_size),
+    )
+
+    stats = precompute_snippets(
+        records,
+        client,
+        store=store,
+        settings=settings,
+        chunk_size=args.chunk_size,
+        max_workers=args.workers,
+        on_chunk=lambda s: s.save(args.out),
+    )
+    store.save(args.out)
+    print(json.dumps({"out": args.out, **stats.to_dict()}))
+
+
+if __name__ == "__main__":
+    main()
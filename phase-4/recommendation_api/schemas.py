@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -32,14 +32,95 @@ class RecommendationResponse:
     model_used: str
     filters_applied: Dict[str, Any]
     recommendations: List[RecommendationItem] = field(default_factory=list)
+    interpretation: Optional[Dict[str, Any]] = None  # how a free-text query was parsed
+    relaxation: Optional[Dict[str, Any]] = None  # set when no exact match and filters were loosened
+    corrections: Optional[Dict[str, Any]] = None  # misspelt city/location/cuisine: fix or suggestions
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        d: Dict[str, Any] = {
             "request_id": self.request_id,
             "model_used": self.model_used,
             "filters_applied": self.filters_applied,
             "recommendations": [r.to_dict() for r in self.recommendations],
         }
+        if self.interpretation is not None:
+            d["interpretation"] = self.interpretation
+        if self.relaxation is not None:
+            d["relaxation"] = self.relaxation
+        if self.corrections is not None:
+            d["corrections"] = self.corrections
+        return d
+
+
+@dataclass
+class SimilarRestaurantItem:
+    """A single neighbour in the GET /similar response."""
+
+    restaurant_name: str
+    score: float
+    attributes: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "restaurant_name": self.restaurant_name,
+            "score": round(self.score, 4),
+            "attributes": self.attributes or {},
+        }
+
+
+@dataclass
+class SimilarResponse:
+    """Full API response for GET /similar/<restaurant>."""
+
+    request_id: str
+    restaurant_name: str
+    similar: List[SimilarRestaurantItem] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "request_id": self.request_id,
+            "restaurant_name": self.restaurant_name,
+            "similar": [s.to_dict() for s in self.similar],
+        }
+
+
+@dataclass
+class FacetsResponse:
+    """Full API response for GET /facets."""
+
+    request_id: str
+    filters_applied: Dict[str, Any]
+    total: int
+    facets: Dict[str, List[Tuple[str, int]]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "request_id": self.request_id,
+            "filters_applied": self.filters_applied,
+            "total": self.total,
+            "facets": {
+                name: [{"value": value, "count": count} for value, count in pairs]
+                for name, pairs in self.facets.items()
+            },
+        }
+
+
+@dataclass
+class AutocompleteResponse:
+    """Full API response for GET /autocomplete."""
+
+    request_id: str
+    field: str
+    prefix: str
+    completions: List[Tuple[str, int]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "request_id": self.request_id,
+            "field": self.field,
+            "prefix": self.prefix,
+            "completions": [{"value": value, "count": count} for value, count in self.completions],
+        }
 
 
 @dataclass
@@ -0,0 +1,40 @@
+"""
+Offline job: train the distilled ranker on logged LLM rankings.
+
+    python -m recommendation_api.train_ranker [--log rankings.jsonl] [--out ranker.json] [--holdout 0.2]
+
+Reads the log the API appends to at ``$LLM_RANKING_LOG``, trains on all but
+the most recent ``--holdout`` share, reports agreement with the LLM on that
+share and writes the model the API loads from ``$LLM_RANKER_PATH``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import List, Optional
+
+from . import app as _app  # noqa: F401  (puts phase-1..3 on sys.path)
+
+from llm_recommender.distill import DEFAULT_MIN_CONFIDENCE, RankingLog, evaluate_ranker, split_examples, train_ranker
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--log", default=os.environ.get("LLM_RANKING_LOG") or "rankings.jsonl")
+    parser.add_argument("--out", default=os.environ.get("LLM_RANKER_PATH") or "ranker.json")
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of the latest examples kept for evaluation")
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE)
+    args = parser.parse_args(argv)
+
+    train, holdout = split_examples(RankingLog.read(args.log), args.holdout)
+    ranker = train_ranker(train, min_confidence=args.min_confidence)
+    report = evaluate_ranker(ranker, holdout).to_dict()
+    ranker.metrics = report
+    ranker.save(args.out)
+    print(json.dumps({"out": args.out, "trained_on": len(train), "holdout": report}))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,12 @@
 from __future__ import annotations
 
 import json
+import time
+
+from llm_recommender.distill import RANKING_FEATURES, DistilledRanker
+from llm_recommender.models import CandidateRestaurant, RecommendSettings
+from llm_recommender.snippets import SnippetStore
+from recommendation_api.app import create_app
 
 
 class TestHealthEndpoint:
@@ -12,6 +18,70 @@ class TestHealthEndpoint:
         data = resp.get_json()
         assert data["status"] == "ok"
 
+    def test_health_reports_llm_cache_stats(self, client, monkeypatch):
+        monkeypatch.setenv("XAI_API_KEY", "test-key")
+        monkeypatch.setenv("XAI_BASE_URL", "http://127.0.0.1:9")  # refuses connections
+        client.post("/recommend", json={"city": "Banashankari"})
+        health = client.get("/health").get_json()
+        stats = health["llm_cache"]
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.0
+        assert health["llm_single_flight"] == {"calls": 1, "shared": 0}
+        assert health["llm_circuit"]["state"] == "closed"
+        assert health["llm_circuit"]["window_calls"] == 1
+
+    def test_health_reports_routed_backends(self, fake_store, monkeypatch):
+        backends = [
+            {"name": "primary", "base_url": "http://127.0.0.1:9/v1"},  # refuses connections
+            {"name": "local", "base_url": "http://127.0.0.1:9/v2", "model": "llama3"},
+        ]
+        monkeypatch.setenv("LLM_BACKENDS", json.dumps(backends))
+        client = create_app(store=fake_store, settings=RecommendSettings(model="test-model")).test_client()
+        resp = client.post("/recommend", json={"city": "Banashankari", "max_results": 1})
+        assert len(resp.get_json()["recommendations"]) == 1
+        health = client.get("/health").get_json()
+        assert [(b["name"], b["errors"]) for b in health["llm_backends"]] == [("primary", 1), ("local", 1)]
+        assert health["llm_circuit"]["window_calls"] == 1
+
+    def test_health_reports_cascade(self, fake_store):
+        class ModelClient:
+            def __init__(self):
+                self.models = []
+
+            def generate(self, *, model, messages, timeout_s):
+                self.models.append(model)
+                if model == "fast":
+                    return "Sorry, no idea."
+                raise RuntimeError("large model down")
+
+        llm = ModelClient()
+        settings = RecommendSettings(model="large", fast_model="fast")
+        client = create_app(store=fake_store, settings=settings, client=llm).test_client()
+        resp = client.post("/recommend", json={"city": "Banashankari", "max_results": 1})
+        assert len(resp.get_json()["recommendations"]) == 1
+        assert llm.models == ["fast", "large"]
+        cascade = client.get("/health").get_json()["llm_cascade"]
+        assert (cascade["requests"], cascade["fast_served"]) == (1, 0)
+        assert cascade["escalated"]["unparseable"] == 1
+
+    def test_model_used_names_the_fast_model_when_it_answers(self, fake_store):
+        class FastClient:
+            def generate(self, *, model, messages, timeout_s):
+                return json.dumps([{"i": 1, "why": "Good match."}])
+
+        settings = RecommendSettings(model="large", fast_model="fast")
+        client = create_app(store=fake_store, settings=settings, client=FastClient()).test_client()
+        resp = client.post("/recommend", json={"city": "Banashankari", "max_results": 1})
+        assert resp.get_json()["model_used"] == "fast"
+
+    def test_no_api_key_skips_the_llm(self, client, monkeypatch):
+        monkeypatch.delenv("XAI_API_KEY", raising=False)
+        resp = client.post("/recommend", json={"city": "Banashankari", "max_results": 1})
+        assert len(resp.get_json()["recommendations"]) == 1
+        health = client.get("/health").get_json()
+        assert health["llm_cache"]["misses"] == 0
+        assert health["llm_circuit"]["window_calls"] == 0
+
 
 # ═══════════════════════════════════════════════════════════════════
 # Metadata endpoint
@@ -60,6 +130,112 @@ class TestMetadataEndpoint:
         assert resp.headers.get("Access-Control-Allow-Origin") == "*"
 
 
+# ═══════════════════════════════════════════════════════════════════
+# Autocomplete endpoint
+# ═══════════════════════════════════════════════════════════════════
+
+class TestAutocompleteEndpoint:
+    def test_autocomplete_area_prefix(self, client):
+        resp = client.get("/autocomplete?field=area&prefix=ban")
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["completions"] == [{"value": "Banashankari", "count": 3}]
+
+    def test_autocomplete_cuisine_ranked_by_count(self, client):
+        data = client.get("/autocomplete?field=cuisine&prefix=&limit=2").get_json()
+        assert [c["value"] for c in data["completions"]] == ["North Indian", "Chinese"]
+
+    def test_autocomplete_matches_inner_words(self, client):
+        data = client.get("/autocomplete?field=cuisine&prefix=food").get_json()
+        assert [c["value"] for c in data["completions"]] == ["Street Food"]
+
+    def test_autocomplete_unknown_field_returns_422(self, client):
+        resp = client.get("/autocomplete?field=dish&prefix=pa")
+        assert resp.status_code == 422
+
+    def test_autocomplete_invalid_limit_returns_422(self, client):
+        resp = client.get("/autocomplete?field=area&limit=100")
+        assert resp.status_code == 422
+
+    def test_metadata_summary_returns_counts_only(self, client):
+        data = client.get("/metadata?summary=1").get_json()
+        assert data == {"area_count": 3, "cuisine_count": 6}
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Facets endpoint
+# ═══════════════════════════════════════════════════════════════════
+
+class TestFacetsEndpoint:
+    def _counts(self, data, facet):
+        return {f["value"]: f["count"] for f in data["facets"][facet]}
+
+    def test_facets_without_filters_counts_every_record(self, client):
+        resp = client.get("/facets")
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["total"] == 6
+        assert self._counts(data, "location") == {"Banashankari": 3, "Koramangala": 2, "Jayanagar": 1}
+        assert self._counts(data, "cuisine")["North Indian"] == 3
+        assert sum(self._counts(data, "price").values()) == 6
+
+    def test_facets_apply_other_filters(self, client):
+        data = client.get("/facets?location=Banashankari").get_json()
+        assert data["total"] == 3
+        assert data["filters_applied"] == {"location": "Banashankari"}
+        # Cuisine counts are restricted to the selected location...
+        assert self._counts(data, "cuisine") == {"North Indian": 3, "Chinese": 2}
+        # ...while the location facet ignores its own filter.
+        assert self._counts(data, "location")["Koramangala"] == 2
+
+    def test_facets_rating_buckets(self, client):
+        data = client.get("/facets?min_rating=4.4").get_json()
+        assert data["total"] == 1
+        rating = self._counts(data, "rating")
+        assert rating["4.0-4.5"] == 3
+        assert rating["4.5+"] == 1
+
+    def test_facets_flag_filters_from_query_string(self, client):
+        data = client.get("/facets?online_order=false").get_json()
+        assert data["total"] == 1
+        assert data["filters_applied"] == {"online_order": False}
+
+    def test_facets_invalid_filter_returns_422(self, client):
+        resp = client.get("/facets?min_rating=abc")
+        assert resp.status_code == 422
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Similar restaurants endpoint
+# ═══════════════════════════════════════════════════════════════════
+
+class TestSimilarEndpoint:
+    def test_similar_returns_neighbours(self, client):
+        resp = client.get("/similar/Spice Garden")
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["restaurant_name"] == "Spice Garden"
+        names = [s["restaurant_name"] for s in data["similar"]]
+        assert names[0] == "Tandoori Nights"
+        assert "Spice Garden" not in names
+        for item in data["similar"]:
+            assert 0 < item["score"] <= 1
+            assert "attributes" in item
+
+    def test_similar_respects_limit(self, client):
+        data = client.get("/similar/Spice Garden?limit=1").get_json()
+        assert len(data["similar"]) == 1
+
+    def test_similar_unknown_restaurant_returns_404(self, client):
+        resp = client.get("/similar/Nowhere Diner")
+        assert resp.status_code == 404
+        assert resp.get_json()["error"] == "Not found"
+
+    def test_similar_invalid_limit_returns_422(self, client):
+        resp = client.get("/similar/Spice Garden?limit=0")
+        assert resp.status_code == 422
+
+
 # ═══════════════════════════════════════════════════════════════════
 # Recommendation happy path
 # ═══════════════════════════════════════════════════════════════════
@@ -131,10 +307,217 @@ class TestRecommendHappyPath:
         assert any("Budget" in n or "Spice" in n for n in names)
 
 
+class TestSessionRefinement:
+    def test_narrower_request_refilters_previous_results(self, client, fake_store, monkeypatch):
+        index = fake_store.column_index()
+        seen = []
+        original = index.filter_rows
+
+        def spy(rows, **filters):
+            seen.append(len(rows))
+            return original(rows, **filters)
+
+        monkeypatch.setattr(index, "filter_rows", spy)
+        headers = {"X-Session-Id": "s1"}
+
+        first = client.post("/recommend", json={"city": "Banashankari"}, headers=headers)
+        assert first.status_code == 200
+        assert seen == []
+
+        body = {"city": "Banashankari", "min_rating": 4.0}
+        refined = client.post("/recommend", json=body, headers=headers)
+        assert seen == [3]
+        fresh = client.post("/recommend", json=body)
+        names = lambda r: [x["restaurant_name"] for x in r.get_json()["recommendations"]]
+        assert names(refined) == names(fresh)
+
+    def test_wider_request_runs_full_query(self, client, fake_store, monkeypatch):
+        index = fake_store.column_index()
+        seen = []
+        monkeypatch.setattr(index, "filter_rows", lambda rows, **filters: seen.append(len(rows)))
+        headers = {"X-Session-Id": "s2"}
+
+        client.post("/recommend", json={"city": "Banashankari", "min_rating": 4.0}, headers=headers)
+        resp = client.post("/recommend", json={"city": "Banashankari"}, headers=headers)
+        assert resp.status_code == 200
+        assert seen == []
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Free-text recommendation
+# ═══════════════════════════════════════════════════════════════════
+
+class TestRecommendText:
+    def test_query_is_parsed_into_filters(self, client):
+        resp = client.post("/recommend/text", json={"query": "north indian in banashankari above 4 stars under 550"})
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["filters_applied"] == {
+            "location": "Banashankari",
+            "cuisine": "North Indian",
+            "min_rating": 4.0,
+            "price_max": 550,
+        }
+        assert [r["restaurant_name"] for r in data["recommendations"]] == ["Spice Garden"]
+        assert data["interpretation"]["leftover"] is None
+
+    def test_unparsed_words_are_reported(self, client):
+        data = client.post("/recommend/text", json={"query": "italian with rooftop seating"}).get_json()
+        assert data["filters_applied"]["cuisine"] == "Italian"
+        assert data["interpretation"]["leftover"] == "rooftop seating"
+
+    def test_structured_fields_override_query(self, client):
+        data = client.post("/recommend/text", json={"query": "cheap north indian", "max_results": 1}).get_json()
+        assert data["filters_applied"]["max_results"] == 1
+        assert len(data["recommendations"]) == 1
+
+    def test_missing_query_returns_422(self, client):
+        resp = client.post("/recommend/text", json={"city": "Banashankari"})
+        assert resp.status_code == 422
+
+    def test_non_json_body_returns_400(self, client):
+        resp = client.post("/recommend/text", data="hello", content_type="text/plain")
+        assert resp.status_code == 400
+
+
 # ═══════════════════════════════════════════════════════════════════
 # Deduplication
 # ═══════════════════════════════════════════════════════════════════
 
+def _sse_events(resp):
+    events = []
+    for block in resp.get_data(as_text=True).strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestRecommendStream:
+    def test_stream_sends_meta_items_and_done(self, client):
+        resp = client.post("/recommend/stream", json={"city": "Banashankari", "max_results": 2})
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/event-stream"
+        events = _sse_events(resp)
+        names = [name for name, _ in events]
+        assert names == ["meta", "recommendation", "recommendation", "done"]
+        meta = events[0][1]
+        assert meta["filters_applied"]["city"] == "Banashankari"
+        assert meta["recommendations"] == []
+        assert [data["rank"] for name, data in events if name == "recommendation"] == [1, 2]
+        assert events[-1][1] == {"request_id": meta["request_id"], "count": 2}
+
+    def test_stream_matches_recommend(self, client):
+        body = {"cuisine": "North Indian", "max_results": 3}
+        streamed = [data for name, data in _sse_events(client.post("/recommend/stream", json=body)) if name == "recommendation"]
+        assert streamed == client.post("/recommend", json=body).get_json()["recommendations"]
+
+    def test_stream_validation_error_is_plain_json(self, client):
+        resp = client.post("/recommend/stream", json={"min_rating": 9})
+        assert resp.status_code == 422
+        assert resp.get_json()["error"] == "Validation error"
+
+
+class TestOfflineExplanations:
+    def test_llm_off_explains_from_snippets(self, fake_store):
+        snippets = SnippetStore()
+        snippets.put(
+            CandidateRestaurant(name="Spice Garden", location="Banashankari", cuisines="North Indian, Chinese", rest_type="Casual Dining"),
+            "A family favourite for North Indian curries.",
+        )
+        client = create_app(store=fake_store, settings=RecommendSettings(llm_mode="off"), snippets=snippets).test_client()
+
+        data = client.post("/recommend", json={"location": "Banashankari", "max_results": 1}).get_json()
+        assert data["recommendations"][0]["restaurant_name"] == "Spice Garden"
+        assert data["recommendations"][0]["explanation"] == "A family favourite for North Indian curries. Rated 4.3, approx. ₹500 for two."
+        health = client.get("/health").get_json()
+        assert health["llm_mode"] == "off"
+        assert health["snippets"] == 1
+        assert health["llm_cache"]["misses"] == 0
+
+    def test_prompt_format_from_env(self, fake_store, monkeypatch):
+        class CapturingClient:
+            def generate(self, *, model, messages, timeout_s):
+                self.messages = messages
+                return "[]"
+
+        body = {"location": "Banashankari", "max_results": 2}
+        llm = CapturingClient()
+        create_app(store=fake_store, client=llm).test_client().post("/recommend", json=body)
+        assert json.loads(llm.messages[1]["content"])["candidates"]
+
+        monkeypatch.setenv("LLM_COMPACT_PROMPT", "1")
+        monkeypatch.setenv("LLM_MAX_PROMPT_TOKENS", "400")
+        create_app(store=fake_store, client=llm).test_client().post("/recommend", json=body)
+        assert "candidates:\n#|name|" in llm.messages[1]["content"]
+        assert '"i"' not in llm.messages[0]["content"]
+
+        monkeypatch.setenv("LLM_INDEX_OUTPUT", "1")
+        create_app(store=fake_store, client=llm).test_client().post("/recommend", json=body)
+        assert '"i"' in llm.messages[0]["content"]
+
+    def test_llm_mode_local_from_env(self, fake_store, monkeypatch):
+        monkeypatch.setenv("LLM_MODE", "local")
+        client = create_app(store=fake_store).test_client()
+
+        data = client.post("/recommend", json={"location": "Banashankari", "max_results": 2}).get_json()
+        assert len(data["recommendations"]) == 2
+        assert all(r["explanation"] for r in data["recommendations"])
+        health = client.get("/health").get_json()
+        assert health["llm_mode"] == "local"
+        assert health["llm_cache"]["misses"] == 0
+
+    def test_llm_rankings_are_logged_and_a_distilled_ranker_answers(self, fake_store, tmp_path, monkeypatch):
+        log = tmp_path / "rankings.jsonl"
+        monkeypatch.setenv("LLM_RANKING_LOG", str(log))
+        llm = _SlowClient(delay_s=0)
+        body = {"location": "Banashankari", "max_results": 1}
+        create_app(store=fake_store, settings=RecommendSettings(model="test-model"), client=llm).test_client().post("/recommend", json=body)
+        [entry] = [json.loads(line) for line in log.read_text().splitlines()]
+        assert entry["ranking"] == [1]
+
+        confident = DistilledRanker([0.0] * len(RANKING_FEATURES), min_confidence=0.0)
+        client = create_app(store=fake_store, settings=RecommendSettings(model="test-model"), client=llm, ranker=confident).test_client()
+        client.post("/recommend", json=body)
+        assert llm.calls == 1
+        assert client.get("/health").get_json()["distilled_ranker"] == {"served": 1, "deferred": 0, "served_share": 1.0}
+
+
+
+class _SlowClient:
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+        self.calls = 0
+
+    def generate(self, *, model, messages, timeout_s):
+        self.calls += 1
+        time.sleep(self.delay_s)
+        return '[{"i": 2, "why": "Worth the wait."}]'
+
+
+class TestDeadline:
+    def test_deadline_header_serves_fallback_then_cached_answer(self, fake_store):
+        llm = _SlowClient(delay_s=0.3)
+        client = create_app(store=fake_store, settings=RecommendSettings(model="test-model"), client=llm).test_client()
+        body = {"location": "Banashankari", "max_results": 1}
+
+        start = time.monotonic()
+        first = client.post("/recommend", json=body, headers={"X-Deadline-Ms": "100"}).get_json()
+        assert time.monotonic() - start < 0.25
+        assert first["recommendations"][0]["explanation"] != "Worth the wait."
+
+        time.sleep(0.4)  # the call finishes in the background
+        second = client.post("/recommend", json=body, headers={"X-Deadline-Ms": "100"}).get_json()
+        assert second["recommendations"][0]["explanation"] == "Worth the wait."
+        assert llm.calls == 1
+
+    def test_invalid_deadline_header_is_ignored(self, fake_store):
+        llm = _SlowClient(delay_s=0)
+        client = create_app(store=fake_store, settings=RecommendSettings(model="test-model"), client=llm).test_client()
+        resp = client.post("/recommend", json={"max_results": 1}, headers={"X-Deadline-Ms": "soon"})
+        assert resp.status_code == 200
+        assert resp.get_json()["recommendations"][0]["explanation"] == "Worth the wait."
+
+
 class TestDeduplication:
     def test_duplicate_restaurants_are_removed(self, client):
         """Two records with name='Spice Garden' should produce only one recommendation."""
@@ -194,6 +577,8 @@ class TestCORSHeaders:
     def test_cors_allows_content_type_header(self, client):
         resp = client.post("/recommend", json={})
         assert "Content-Type" in resp.headers.get("Access-Control-Allow-Headers", "")
+        assert "X-Session-Id" in resp.headers.get("Access-Control-Allow-Headers", "")
+        assert "X-Deadline-Ms" in resp.headers.get("Access-Control-Allow-Headers", "")
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -275,16 +660,42 @@ class TestRecommendBadRequest:
 
 class TestRecommendEdgeCases:
     def test_very_specific_filters_returns_empty_list(self, client):
-        """Filters that match nothing should return 200 with empty recs."""
+        """Filters that match nothing, even relaxed, should return 200 with empty recs."""
         resp = client.post(
             "/recommend",
-            json={"city": "NonExistentCity", "min_rating": 5.0},
+            json={"city": "NonExistentCity", "min_rating": 5.0, "rest_type": "Microbrewery"},
         )
         assert resp.status_code == 200
         data = resp.get_json()
         assert data["recommendations"] == []
+        assert "relaxation" not in data
         assert "request_id" in data
 
+    def test_no_match_serves_least_relaxed_filters(self, client):
+        resp = client.post(
+            "/recommend",
+            json={"location": "Koramangala", "min_rating": 4.8, "price_max": 700},
+        )
+        assert resp.status_code == 200
+        data = resp.get_json()
+        # Dropping the rating floor alone is not enough; widening 700 -> 840 is.
+        assert data["relaxation"] == {
+            "relaxed": ["min_rating", "price"],
+            "requested": {"location": "Koramangala", "min_rating": 4.8, "price_max": 700},
+        }
+        assert data["filters_applied"] == {"location": "Koramangala", "price_max": 840}
+        assert [r["restaurant_name"] for r in data["recommendations"]] == ["Pasta Palace"]
+
+    def test_misspelt_location_is_corrected(self, client):
+        data = client.post("/recommend", json={"location": "Banashankri"}).get_json()
+        assert data["filters_applied"]["location"] == "Banashankari"
+        assert data["corrections"] == {"location": {"input": "Banashankri", "corrected": "Banashankari"}}
+        assert data["recommendations"]
+
+    def test_exact_match_is_not_relaxed(self, client):
+        data = client.post("/recommend", json={"location": "Koramangala"}).get_json()
+        assert "relaxation" not in data
+
     def test_max_results_one(self, client):
         """Only one result when max_results=1."""
         resp = client.post("/recommend", json={"max_results": 1})
@@ -22,6 +22,7 @@
     const resultsGrid = document.getElementById('results-grid');
     const skeletonGrid = document.getElementById('skeleton-grid');
     const emptyState = document.getElementById('empty-state');
+    const relaxationNote = document.getElementById('relaxation-note');
     const footerModel = document.getElementById('footer-model');
 
     const ratingInput = document.getElementById('min-rating');
@@ -46,40 +47,66 @@
     const priceLabelMax = document.getElementById('price-label-max');
     const rangeFill = document.getElementById('range-fill');
 
+    // Live match count
+    const matchHint = document.getElementById('match-hint');
+
     // Stats
     const statAreas = document.getElementById('stat-areas');
     const statCuisines = document.getElementById('stat-cuisines');
 
+    const RELAXATION_LABELS = {
+        min_rating: 'minimum rating',
+        price: 'price range (±20%)',
+        cuisine: 'cuisine',
+        location: 'area',
+    };
+
     // ── State ───────────────────────────────────────────────
-    let allAreas = [];
-    let allCuisines = [];
+    // Lets the API refine the previous result set instead of searching from scratch
+    const sessionId = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : String(Date.now()) + Math.random().toString(16).slice(2);
+    let areaSeq = 0;
+    let cuisineSeq = 0;
     let selectedArea = '';
     let selectedCuisines = [];
     let areaHighlightIdx = -1;
     let cuisineHighlightIdx = -1;
+    let matchTimer = null;
+    let matchSeq = 0;
 
     // ══════════════════════════════════════════════════════════
     // 1. Fetch metadata on load
     // ══════════════════════════════════════════════════════════
     async function fetchMetadata() {
         try {
-            const res = await fetch(`${API_URL}/metadata`);
+            const res = await fetch(`${API_URL}/metadata?summary=1`);
             if (!res.ok) return;
             const data = await res.json();
-            allAreas = data.areas || [];
-            allCuisines = data.cuisines || [];
-            statAreas.textContent = allAreas.length;
-            statCuisines.textContent = allCuisines.length;
-        } catch { /* silently fail — dropdowns will stay empty */ }
+            statAreas.textContent = data.area_count;
+            statCuisines.textContent = data.cuisine_count;
+        } catch { /* silently fail — stats stay as placeholders */ }
     }
     fetchMetadata();
 
+    // Top completions by restaurant count, matched server-side on word prefixes
+    async function fetchCompletions(field, prefix) {
+        try {
+            const params = new URLSearchParams({ field, prefix, limit: 20 });
+            const res = await fetch(`${API_URL}/autocomplete?${params}`);
+            if (!res.ok) return [];
+            const data = await res.json();
+            return (data.completions || []).map(c => c.value);
+        } catch {
+            return [];
+        }
+    }
+
     // ══════════════════════════════════════════════════════════
     // 2. Searchable Area Dropdown
     // ══════════════════════════════════════════════════════════
-    function renderAreaList(filter = '') {
-        const f = filter.toLowerCase();
-        const items = f ? allAreas.filter(a => a.toLowerCase().includes(f)) : allAreas;
+    async function renderAreaList(filter = '') {
+        const seq = ++areaSeq;
+        const items = await fetchCompletions('area', filter);
+        if (seq !== areaSeq) return;  // a newer keystroke already rendered
         areaList.innerHTML = items.map(a =>
             `<li role="option" data-value="${escapeAttr(a)}" class="${a === selectedArea ? 'selected' : ''}">${escapeHtml(a)}</li>`
         ).join('');
@@ -125,6 +152,7 @@
         selectedArea = val;
         areaInput.value = val;
         closeAreaDropdown();
+        scheduleMatchCount();
     }
 
     function closeAreaDropdown() {
@@ -140,9 +168,10 @@
     // ══════════════════════════════════════════════════════════
     // 3. Multi-Select Cuisine with Chips
     // ══════════════════════════════════════════════════════════
-    function renderCuisineList(filter = '') {
-        const f = filter.toLowerCase();
-        const items = f ? allCuisines.filter(c => c.toLowerCase().includes(f)) : allCuisines;
+    async function renderCuisineList(filter = '') {
+        const seq = ++cuisineSeq;
+        const items = await fetchCompletions('cuisine', filter);
+        if (seq !== cuisineSeq) return;  // a newer keystroke already rendered
         cuisineList.innerHTML = items.map(c =>
             `<li role="option" data-value="${escapeAttr(c)}" class="${selectedCuisines.includes(c) ? 'selected' : ''}">${escapeHtml(c)}</li>`
         ).join('');
@@ -172,6 +201,7 @@
             selectedCuisines = selectedCuisines.filter(c => c !== val);
             renderChips();
             renderCuisineList(cuisineInput.value);
+            scheduleMatchCount();
             return;
         }
         // Focus input if clicking the chips area
@@ -207,6 +237,7 @@
             selectedCuisines.pop();
             renderChips();
             renderCuisineList();
+            scheduleMatchCount();
         } else if (e.key === 'Escape') {
             closeCuisineDropdown();
         }
@@ -227,6 +258,7 @@
         renderChips();
         renderCuisineList('');
         cuisineInput.focus();
+        scheduleMatchCount();
     }
 
     function closeCuisineDropdown() {
@@ -267,6 +299,7 @@
         const rightPct = ((maxVal - min) / (max - min)) * 100;
         rangeFill.style.left = leftPct + '%';
         rangeFill.style.width = (rightPct - leftPct) + '%';
+        scheduleMatchCount();
     }
 
     priceMinInput.addEventListener('input', updateSlider);
@@ -277,13 +310,44 @@
     ratingMinus.addEventListener('click', () => {
         const val = parseFloat(ratingInput.value) || 0;
         ratingInput.value = Math.max(0, val - 0.5);
+        scheduleMatchCount();
     });
 
     ratingPlus.addEventListener('click', () => {
         const val = parseFloat(ratingInput.value) || 0;
         ratingInput.value = Math.min(5, val + 0.5);
+        scheduleMatchCount();
     });
 
+    ratingInput.addEventListener('input', scheduleMatchCount);
+
+    // ══════════════════════════════════════════════════════════
+    // 4b. Live match count (GET /facets)
+    // ══════════════════════════════════════════════════════════
+    function scheduleMatchCount() {
+        clearTimeout(matchTimer);
+        matchTimer = setTimeout(fetchMatchCount, 150);
+    }
+
+    async function fetchMatchCount() {
+        const seq = ++matchSeq;
+        const { max_results, ...filters } = buildPayload();
+        const params = new URLSearchParams();
+        Object.entries(filters).forEach(([k, v]) => {
+            if (v !== undefined && !Number.isNaN(v)) params.set(k, v);
+        });
+        try {
+            const res = await fetch(`${API_URL}/facets?${params}`);
+            if (!res.ok || seq !== matchSeq) return;
+            const data = await res.json();
+            if (seq !== matchSeq) return;
+            matchHint.classList.toggle('match-hint--empty', data.total === 0);
+            matchHint.textContent = data.total === 0
+                ? 'No restaurants match these filters — try broadening your search.'
+                : `${data.total} matching listings`;
+        } catch { matchHint.textContent = ''; }
+    }
+
     // ── Error close ─────────────────────────────────────────
     errorClose.addEventListener('click', () => { errorBanner.hidden = true; });
 
@@ -298,22 +362,30 @@
         const payload = buildPayload();
 
         try {
-            const response = await fetch(`${API_URL}/recommend`, {
+            // Streamed: each card appears as soon as the LLM has written it.
+            const response = await fetch(`${API_URL}/recommend/stream`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', 'X-Session-Id': sessionId },
                 body: JSON.stringify(payload),
             });
 
-            const data = await response.json();
-
             if (!response.ok) {
+                const data = await response.json();
                 const msg = data.details ? data.details.join('; ') : data.error || 'Something went wrong';
                 showError(msg);
-                hideLoading();
                 return;
             }
 
-            renderResults(data);
+            await readEvents(response, (event, data) => {
+                if (event === 'meta') {
+                    renderMeta(data);
+                } else if (event === 'recommendation') {
+                    skeletonGrid.hidden = true;
+                    resultsGrid.insertAdjacentHTML('beforeend', createCard(data));
+                } else if (event === 'done') {
+                    emptyState.hidden = data.count > 0;
+                }
+            });
         } catch {
             showError('Could not reach the API server. Is the backend running on port 5000?');
         } finally {
@@ -321,6 +393,30 @@
         }
     });
 
+    // ── Server-sent events over fetch (EventSource cannot POST) ─────
+    async function readEvents(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let end;
+            while ((end = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, end);
+                buffer = buffer.slice(end + 2);
+                let event = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+
     // ── Build payload ───────────────────────────────────────
     function buildPayload() {
         const payload = {};
@@ -380,22 +476,18 @@
     function hideError() { errorBanner.hidden = true; }
 
     // ── Render results ──────────────────────────────────────
-    function renderResults(data) {
-        const recs = data.recommendations || [];
-
+    function renderMeta(data) {
         // Update footer with model name
         if (data.model_used) {
             footerModel.textContent = data.model_used;
         }
 
-        if (recs.length === 0) {
-            resultsGrid.innerHTML = '';
-            emptyState.hidden = false;
-            return;
-        }
-
-        emptyState.hidden = true;
-        resultsGrid.innerHTML = recs.map(rec => createCard(rec)).join('');
+        // The API loosens filters itself when nothing matches exactly
+        const relaxed = data.relaxation ? data.relaxation.relaxed : [];
+        relaxationNote.hidden = relaxed.length === 0;
+        relaxationNote.textContent = relaxed.length
+            ? `No exact matches, so we relaxed: ${relaxed.map(r => RELAXATION_LABELS[r] || r).join(', ')}.`
+            : '';
     }
 
     function createCard(rec) {
@@ -20,11 +20,11 @@ for _phase in ("phase-1", "phase-2", "phase-3"):
 
 # Phase imports
 try:
-    from restaurant_recommender import Preference, RestaurantDataStore, retrieve
+    from restaurant_recommender import Preference, RestaurantDataStore, retrieve, retrieve_refined
     from restaurant_recommender.loader import load_dataset_from_hf
     from preference_validation.validator import validate_preference
     from preference_validation.models import PreferenceValidationError
-    from llm_recommender.recommender import recommend_with_explanations
+    from llm_recommender.recommender import stream_recommendations
     from llm_recommender.models import RecommendSettings
 except ImportError as e:
     st.error(f"Failed to import project modules. Error: {e}")
@@ -130,6 +130,16 @@ with st.container():
     min_rating = col3.number_input("⭐ Minimum Rating", 0.0, 5.0, 0.0, step=0.5)
     max_results = col4.number_input("📊 Max Results", 1, 10, 5)
 
+    # Live match count (index popcount, no retrieval or LLM call)
+    match_count = data_store.facets(Preference(
+        location=selected_area if selected_area != "Any" else None,
+        cuisine=selected_cuisines[0] if selected_cuisines else None,
+        price_min=price_range[0] if price_range[0] > 100 else None,
+        price_max=price_range[1] if price_range[1] < 5000 else None,
+        min_rating=min_rating if min_rating > 0.0 else None,
+    )).total
+    st.caption(f"{match_count} matching listings" if match_count else "No restaurants match these filters — try broadening your search.")
+
     submit = st.button("Get Recommendations ✨")
 
 # ── Results Logic ──────────────────────────────────────────────
@@ -161,8 +171,19 @@ if submit:
             cuisine=validated.cuisine
         )
         
-        candidates = retrieve(data_store, pref, sort_by_rating=True, top_k=10)
+        # Refining the previous search only re-filters its result set
+        candidates, st.session_state.result_handle = retrieve_refined(
+            data_store, pref,
+            previous=st.session_state.get("result_handle"),
+            sort_by_rating=True, top_k=10,
+        )
         
+        # Nothing matched: fall back to the least relaxed filters that do
+        relaxed = data_store.relax(pref) if not candidates else None
+        if relaxed is not None and relaxed.relaxed:
+            st.info(f"No exact matches — relaxed: {', '.join(relaxed.relaxed)}.")
+            candidates = retrieve(data_store, relaxed.preference, sort_by_rating=True, top_k=10)
+
         # Deduplicate
         seen = set()
         unique_candidates = []
@@ -175,16 +196,16 @@ if submit:
     if not candidates:
         st.warning("No restaurants found matching your filters. Try broadening your search!")
     else:
-        with st.spinner("AI is personalizing your results..."):
-            settings = RecommendSettings()
-            recommendations = recommend_with_explanations(
-                preference=validated,
-                candidates=candidates,
-                settings=settings
-            )
-
         st.markdown("<br><h3>🎯 Your Recommendations</h3>", unsafe_allow_html=True)
-        for rec in recommendations:
+        # Each card is drawn as soon as the LLM has written it.
+        status = st.empty()
+        status.caption("AI is personalizing your results...")
+        for rec in stream_recommendations(
+            preference=validated,
+            candidates=candidates,
+            settings=RecommendSettings(),
+        ):
+            status.empty()
             attrs = rec.attributes or {}
             tags_html = ""
             if attrs.get("cuisines"): tags_html += f'<span class="tag">🍴 {attrs["cuisines"]}</span>'